@@ -0,0 +1,181 @@
+# ajuste.py
+# Búsqueda de hiperparámetros del modelo TF-IDF + Regresión Logística con validación cruzada.
+#
+# Para no repetir trabajo entre experimentos, se guardan en disco (carpeta de caché):
+#   - el corpus limpio, identificado por una huella (hash) de los datos;
+#   - las matrices TF-IDF de cada pliegue, identificadas por la huella de los datos,
+#     los parámetros del vectorizador y el pliegue.
+# Así, probar otros valores de C (regularización) o repetir la búsqueda no vuelve a limpiar
+# ni a vectorizar. Los pliegues se evalúan en paralelo.
+#
+# Uso:
+#     python ajuste.py --max_features 2000 5000 20000 --ngramas 1 2 --C 0.1 1 10 --n_jobs -1
+#     python ajuste.py --muestra 200000 --estratificado --salida ajuste_200k
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+from modelo import RUTA_CSV, cargar_datos, guardar_modelo
+from preprocesado import preprocesar_lote
+
+# Carpetas por defecto: caché de la búsqueda y resultados (tabla, mejores parámetros y modelo)
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_ajuste')
+RUTA_AJUSTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ajuste')
+
+
+def huella_datos(df):
+    # Hash de las etiquetas y los textos: identifica el conjunto de datos en la caché
+    h = hashlib.sha256()
+    h.update("\n".join(df['sentimiento'].astype(str)).encode("utf-8"))
+    h.update("\0".join(df['tweet'].fillna("").astype(str)).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _clave(*partes):
+    # Nombre de archivo de la caché a partir de cualquier conjunto de parámetros serializables en JSON
+    return hashlib.sha256(json.dumps(partes, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def corpus_limpio(df, carpeta, huella, n_jobs=1):
+    """
+    Devuelve la ruta del corpus limpio (textos limpios y etiquetas) en la caché, creándolo si no existe.
+    """
+    ruta = os.path.join(carpeta, f'corpus_{huella}.joblib')
+    if not os.path.exists(ruta):
+        limpios = preprocesar_lote(df['tweet'].tolist(), n_jobs=n_jobs)
+        joblib.dump((limpios, df['sentimiento'].to_numpy()), ruta)
+    return ruta
+
+
+def _matrices_pliegue(ruta_corpus, carpeta, huella, parametros, entrenamiento, validacion):
+    """
+    Matrices TF-IDF de un pliegue: el vectorizador se ajusta solo con la parte de entrenamiento
+    (para no filtrar información de la validación). Se leen de la caché si ya existen.
+    """
+    # El pliegue se identifica por sus filas de entrenamiento (cambian con el número de pliegues y la semilla)
+    filas = hashlib.sha256(np.asarray(entrenamiento, dtype=np.int64).tobytes()).hexdigest()
+    ruta = os.path.join(carpeta, f'matrices_{huella}_{_clave(parametros, filas)}.joblib')
+    if os.path.exists(ruta):
+        return joblib.load(ruta)
+    limpios, etiquetas = joblib.load(ruta_corpus)
+    limpios = np.asarray(limpios, dtype=object)
+    vectorizador = TfidfVectorizer(**parametros)
+    X_train = vectorizador.fit_transform(limpios[entrenamiento])
+    X_val = vectorizador.transform(limpios[validacion])
+    resultado = (X_train, etiquetas[entrenamiento], X_val, etiquetas[validacion])
+    joblib.dump(resultado, ruta)
+    return resultado
+
+
+def _evaluar_pliegue(ruta_corpus, carpeta, huella, parametros, entrenamiento, validacion, valores_C):
+    # Evalúa todos los valores de C sobre las mismas matrices del pliegue
+    X_train, y_train, X_val, y_val = _matrices_pliegue(
+        ruta_corpus, carpeta, huella, parametros, entrenamiento, validacion
+    )
+    resultados = []
+    for C in valores_C:
+        inicio = time.perf_counter()
+        modelo = LogisticRegression(C=C, max_iter=1000)
+        modelo.fit(X_train, y_train)
+        resultados.append((C, accuracy_score(y_val, modelo.predict(X_val)), time.perf_counter() - inicio))
+    return parametros, resultados
+
+
+def buscar(df, rejilla_vectorizador, valores_C, n_pliegues=5, carpeta=RUTA_CACHE, n_jobs=-1, random_state=42):
+    """
+    Validación cruzada estratificada de cada combinación (parámetros del vectorizador, C).
+    rejilla_vectorizador es una lista de diccionarios con 'max_features' y 'ngram_range' (1, n).
+    Retorna un DataFrame con la precisión media y su desviación, ordenado de mejor a peor.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    huella = huella_datos(df)
+    ruta_corpus = corpus_limpio(df, carpeta, huella, n_jobs)
+
+    pliegues = list(StratifiedKFold(n_pliegues, shuffle=True, random_state=random_state)
+                    .split(np.zeros(len(df)), df['sentimiento']))
+    # Una tarea por (parámetros del vectorizador, pliegue); cada una prueba todos los valores de C
+    tareas = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluar_pliegue)(ruta_corpus, carpeta, huella, parametros, entrenamiento, validacion, valores_C)
+        for parametros in rejilla_vectorizador
+        for entrenamiento, validacion in pliegues
+    )
+
+    filas = []
+    for parametros, resultados in tareas:
+        for C, precision, segundos in resultados:
+            filas.append({"max_features": parametros["max_features"], "ngramas": parametros["ngram_range"][1],
+                          "C": C, "precision": precision, "segundos": segundos})
+    tabla = (pd.DataFrame(filas)
+             .groupby(["max_features", "ngramas", "C"], as_index=False)
+             .agg(precision_media=("precision", "mean"), precision_std=("precision", "std"),
+                  segundos_ajuste=("segundos", "mean")))
+    return tabla.sort_values("precision_media", ascending=False, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros del modelo de sentimiento")
+    parser.add_argument("--datos", type=str, default=RUTA_CSV, help="Ruta al CSV de Sentiment140")
+    parser.add_argument("--muestra", type=int, default=50000, help="Tweets usados en la búsqueda (0 = todos)")
+    parser.add_argument("--estratificado", action="store_true",
+                        help="Toma el mismo número de tweets positivos y negativos")
+    parser.add_argument("--max_features", type=int, nargs="+", default=[2000, 5000, 20000],
+                        help="Tamaños de vocabulario a probar")
+    parser.add_argument("--ngramas", type=int, nargs="+", default=[1, 2],
+                        help="Longitud máxima de los n-gramas a probar (1 = palabras, 2 = palabras y pares...)")
+    parser.add_argument("--C", type=float, nargs="+", default=[0.1, 1.0, 10.0],
+                        help="Valores de regularización de la Regresión Logística")
+    parser.add_argument("--pliegues", type=int, default=5, help="Pliegues de la validación cruzada")
+    parser.add_argument("--n_jobs", type=int, default=-1, help="Procesos en paralelo (-1 = todos los procesadores)")
+    parser.add_argument("--cache", type=str, default=RUTA_CACHE, help="Carpeta de la caché de la búsqueda")
+    parser.add_argument("--salida", type=str, default=RUTA_AJUSTE,
+                        help="Carpeta para la tabla de resultados, los mejores parámetros y el mejor modelo")
+    args = parser.parse_args()
+
+    try:
+        df = cargar_datos(args.datos, muestra=args.muestra or None, estratificado=args.estratificado)
+    except FileNotFoundError as e:
+        print("Error:", e)
+        exit(1)
+    huella = huella_datos(df)
+    print(f"Tweets: {len(df)} (huella {huella})")
+
+    rejilla = [{"max_features": m, "ngram_range": (1, n)} for m in args.max_features for n in args.ngramas]
+    print(f"Probando {len(rejilla) * len(args.C)} combinaciones con {args.pliegues} pliegues...")
+    inicio = time.perf_counter()
+    tabla = buscar(df, rejilla, args.C, args.pliegues, args.cache, args.n_jobs)
+    print(f"Búsqueda terminada en {time.perf_counter() - inicio:.1f} s\n")
+    print(tabla.to_string(index=False))
+
+    # Guardamos la tabla y reentrenamos la mejor combinación con todos los tweets
+    os.makedirs(args.salida, exist_ok=True)
+    tabla.to_csv(os.path.join(args.salida, 'resultados_ajuste.csv'), index=False)
+    mejor = tabla.iloc[0]
+    parametros = {"max_features": int(mejor["max_features"]), "ngram_range": (1, int(mejor["ngramas"])),
+                  "C": float(mejor["C"])}
+    with open(os.path.join(args.salida, 'mejores_parametros.json'), 'w', encoding='utf-8') as f:
+        json.dump(dict(parametros, precision_media=float(mejor["precision_media"])), f, indent=4)
+
+    # El corpus limpio ya está en la caché desde la búsqueda: no se vuelve a limpiar
+    limpios, etiquetas = joblib.load(corpus_limpio(df, args.cache, huella, args.n_jobs))
+    vectorizador = TfidfVectorizer(max_features=parametros["max_features"], ngram_range=parametros["ngram_range"])
+    X = vectorizador.fit_transform(limpios)
+    modelo = LogisticRegression(C=parametros["C"], max_iter=1000).fit(X, etiquetas)
+    guardar_modelo(modelo, vectorizador, args.salida)
+    print(f"\nMejores parámetros: {parametros}")
+    print(f"Resultados, parámetros y modelo guardados en '{args.salida}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmark_compacto.py
+# Compara el arranque de un proceso de predicción con los .pkl (joblib + scikit-learn)
+# y con el modelo compacto (solo NumPy): tiempo hasta la primera predicción y memoria (RSS) por proceso.
+# También comprueba que las predicciones de ambos caminos coinciden.
+#
+# Uso:
+#     python compacto.py                  # Primero, exportar el modelo compacto
+#     python benchmark_compacto.py --repeticiones 5
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+# Misma carpeta que modelo.RUTA_MODELOS: no importamos modelo.py porque cargaría pandas y
+# scikit-learn en todos los procesos y falsearía la medida del modelo compacto
+RUTA_MODELOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos')
+
+TWEETS_PRUEBA = [
+    "I love this song so much!", "Worst day ever, my car broke down", "Just finished my exams #happy",
+    "@friend thanks for the gift", "I'm so tired of waiting", "Check this out http://bit.ly/abc",
+    "What a beautiful morning", "I miss you already", "", "!!!",
+]
+
+
+def rss_pico_mb():
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def ejecutar_camino(camino, ruta_modelos, ruta_compacto):
+    """
+    Se ejecuta en un proceso hijo recién creado: importa, carga y predice los tweets de prueba.
+    El tiempo incluye las importaciones, que es lo que paga cada proceso al arrancar.
+    """
+    inicio = time.perf_counter()
+    if camino == "pkl":
+        import joblib
+        from preprocesado import preprocesar_lote
+        modelo = joblib.load(os.path.join(ruta_modelos, 'sentiment_model.pkl'))
+        vectorizador = joblib.load(os.path.join(ruta_modelos, 'vectorizador.pkl'))
+        probabilidades = modelo.predict_proba(vectorizador.transform(preprocesar_lote(TWEETS_PRUEBA)))
+    else:
+        from compacto import PuntuadorCompacto
+        probabilidades = PuntuadorCompacto(ruta_compacto).predecir_proba(TWEETS_PRUEBA)
+    return {
+        "camino": camino,
+        "arranque_s": time.perf_counter() - inicio,
+        "rss_pico_mb": rss_pico_mb(),
+        "probabilidades": probabilidades[:, 1].tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque y memoria: modelo .pkl frente a modelo compacto")
+    parser.add_argument("--modelos", type=str, default=RUTA_MODELOS,
+                        help="Carpeta con sentiment_model.pkl y vectorizador.pkl")
+    parser.add_argument("--compacto", type=str, default=None,
+                        help="Carpeta del modelo compacto (por defecto, <modelos>/compacto)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Procesos que se lanzan por camino")
+    parser.add_argument("--un_camino", type=str, default=None, help=argparse.SUPPRESS)  # Uso interno (proceso hijo)
+    args = parser.parse_args()
+
+    compacto = args.compacto or os.path.join(args.modelos, 'compacto')
+    if args.un_camino:
+        print(json.dumps(ejecutar_camino(args.un_camino, args.modelos, compacto)))
+        return
+
+    resultados = {}
+    for camino in ("pkl", "compacto"):
+        medidas = []
+        for _ in range(args.repeticiones):
+            comando = [sys.executable, os.path.abspath(__file__), "--un_camino", camino,
+                       "--modelos", args.modelos, "--compacto", compacto]
+            inicio = time.perf_counter()
+            salida = subprocess.run(comando, capture_output=True, text=True)
+            if salida.returncode != 0:
+                print(f"Error en el camino '{camino}':\n{salida.stderr}")
+                return
+            medida = json.loads(salida.stdout.strip().splitlines()[-1])
+            medida["proceso_s"] = time.perf_counter() - inicio  # Incluye el arranque del intérprete
+            medidas.append(medida)
+        resultados[camino] = medidas
+
+    print(f"{'camino':>10} {'carga + 1ª predicción (s)':>26} {'proceso completo (s)':>21} {'RSS (MB)':>9}")
+    for camino, medidas in resultados.items():
+        carga = sum(m["arranque_s"] for m in medidas) / len(medidas)
+        proceso = sum(m["proceso_s"] for m in medidas) / len(medidas)
+        rss = sum(m["rss_pico_mb"] for m in medidas) / len(medidas)
+        print(f"{camino:>10} {carga:>26.3f} {proceso:>21.3f} {rss:>9.0f}")
+
+    diferencia = max(abs(a - b) for a, b in zip(resultados["pkl"][0]["probabilidades"],
+                                                resultados["compacto"][0]["probabilidades"]))
+    print(f"\nDiferencia máxima de probabilidad entre ambos caminos: {diferencia:.2e}")
+
+
+if __name__ == "__main__":
+    main()
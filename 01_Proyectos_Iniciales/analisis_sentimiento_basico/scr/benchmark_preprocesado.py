@@ -0,0 +1,71 @@
+# benchmark_preprocesado.py
+# Compara la limpieza tweet a tweet (df['tweet'].apply(preprocesado)) con preprocesar_lote()
+# en uno y varios procesos, y comprueba que el resultado es idéntico.
+#
+# Uso:
+#     python benchmark_preprocesado.py
+#     python benchmark_preprocesado.py --datos ruta/al/training.1600000.processed.noemoticon.csv --tamanos 10000 100000 1600000
+#
+# Si el CSV no existe se usan tweets sintéticos con URLs, menciones, hashtags, números y emojis.
+
+import argparse
+import os
+import random
+import time
+
+import pandas as pd
+
+from modelo import RUTA_CSV
+from preprocesado import preprocesado, preprocesar_lote
+
+# Piezas para construir tweets sintéticos parecidos a los de Sentiment140
+PIEZAS = [
+    "I", "love", "this", "so", "much", "hate", "Mondays", "today", "is", "great", "not", "good",
+    "@user", "@jane_doe", "#happy", "#fail", "http://bit.ly/abc123", "www.example.com/x?y=1",
+    "https://t.co/XyZ", "2day", "!!!", "lol", ":)", "&quot;", "can't", "wait", "ñandú", "café", "😀",
+]
+
+
+def tweets_sinteticos(n, semilla=42):
+    aleatorio = random.Random(semilla)
+    return [" ".join(aleatorio.choices(PIEZAS, k=aleatorio.randint(5, 20))) for _ in range(n)]
+
+
+def cargar_tweets(ruta, n):
+    # Lee solo la columna del texto; si hay menos tweets que 'n', se repiten
+    if ruta and os.path.exists(ruta):
+        tweets = pd.read_csv(ruta, encoding="latin-1", header=None, usecols=[5], dtype=str)[5].tolist()
+    else:
+        tweets = tweets_sinteticos(min(n, 200_000))
+    veces = -(-n // len(tweets))  # División redondeando hacia arriba
+    return pd.Series((tweets * veces)[:n], name="tweet")
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la limpieza de tweets")
+    parser.add_argument("--datos", type=str, default=RUTA_CSV, help="CSV de Sentiment140 (opcional)")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_600_000])
+    parser.add_argument("--n_jobs", type=int, default=-1, help="Procesos para la versión paralela (-1 = todos)")
+    args = parser.parse_args()
+
+    origen = args.datos if os.path.exists(args.datos) else "tweets sintéticos"
+    print(f"Datos: {origen}\n")
+    print(f"{'tweets':>10} {'apply (s)':>10} {'lote (s)':>9} {'x':>6} {'paralelo (s)':>13} {'x':>6} {'idéntico':>9}")
+    for n in args.tamanos:
+        serie = cargar_tweets(args.datos, n)
+        referencia, t_apply = medir(lambda: serie.apply(preprocesado))
+        lote, t_lote = medir(lambda: preprocesar_lote(serie))
+        paralelo, t_paralelo = medir(lambda: preprocesar_lote(serie, n_jobs=args.n_jobs))
+        identico = referencia.equals(lote) and referencia.equals(paralelo)
+        print(f"{n:>10} {t_apply:>10.2f} {t_lote:>9.2f} {t_apply / t_lote:>6.1f} "
+              f"{t_paralelo:>13.2f} {t_apply / t_paralelo:>6.1f} {'sí' if identico else 'NO':>9}")
+
+
+if __name__ == "__main__":
+    main()
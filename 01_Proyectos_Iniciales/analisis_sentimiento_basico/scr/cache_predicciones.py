@@ -0,0 +1,159 @@
+# cache_predicciones.py
+# Predictor con caché: muchos tweets (retweets, spam copiado y pegado...) quedan idénticos después
+# de preprocesado(), así que guardamos la predicción de cada texto limpio y, si vuelve a aparecer,
+# nos saltamos la vectorización y el modelo.
+#
+# - La caché está acotada (se descartan los textos usados hace más tiempo, LRU).
+# - Si cambia el archivo de versión que modelo.guardar_modelo() escribe después del modelo y del
+#   vectorizador, el modelo se vuelve a cargar y la caché se vacía automáticamente. Se comprueba
+#   como mucho una vez por intervalo, no en cada predicción.
+# - No depende de pandas, para que el predictor arranque rápido.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+
+from preprocesado import preprocesado, preprocesar_lote
+
+# Misma carpeta que modelo.RUTA_MODELOS (no importamos modelo.py para no cargar pandas)
+RUTA_MODELOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos')
+
+# Número máximo de textos limpios guardados en la caché
+MAXIMO_POR_DEFECTO = 100_000
+
+ARCHIVOS_MODELO = ('sentiment_model.pkl', 'vectorizador.pkl')
+
+# Igual que modelo.ARCHIVO_VERSION: se escribe el último al guardar un modelo
+ARCHIVO_VERSION = 'version.txt'
+
+# Segundos mínimos entre dos comprobaciones del archivo de versión
+INTERVALO_COMPROBACION = 1.0
+
+
+class PredictorCacheado:
+    """
+    Modelo + vectorizador con una caché de predicciones indexada por el texto limpio.
+
+    - predecir(texto) → (sentimiento, probabilidades) de un tweet.
+    - predecir_lote(textos) → (sentimientos, probabilidades) de muchos tweets; solo los textos
+      limpios que no están en la caché (y una sola vez cada uno) pasan por transform y predict_proba.
+    - Con maximo=0 la caché está desactivada y se predice siempre.
+    - estadisticas() devuelve aciertos, fallos y tasa de aciertos.
+    - El archivo de versión se consulta como mucho cada 'intervalo' segundos (0 = en cada predicción).
+    """
+
+    def __init__(self, ruta_modelos=RUTA_MODELOS, maximo=MAXIMO_POR_DEFECTO, intervalo=INTERVALO_COMPROBACION):
+        self.ruta_modelos = ruta_modelos
+        self.maximo = maximo
+        self.intervalo = intervalo
+        self._proxima_comprobacion = 0.0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.recargas = 0
+        self._version = None
+        self._cargado = False
+        self._comprobar_modelo()
+
+    def _leer_version(self):
+        # Contenido del archivo de versión ('' si la carpeta es anterior a él: nunca se recarga)
+        try:
+            with open(os.path.join(self.ruta_modelos, ARCHIVO_VERSION), 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return ''
+
+    def _comprobar_modelo(self):
+        # Carga el modelo la primera vez y lo recarga (vaciando la caché) si la versión ha cambiado
+        ahora = time.monotonic()
+        if self._cargado and ahora < self._proxima_comprobacion:
+            return
+        self._proxima_comprobacion = ahora + self.intervalo
+        version = self._leer_version()
+        if self._cargado and version == self._version:
+            return
+        while True:
+            modelo = joblib.load(os.path.join(self.ruta_modelos, ARCHIVOS_MODELO[0]))
+            vectorizador = joblib.load(os.path.join(self.ruta_modelos, ARCHIVOS_MODELO[1]))
+            # Si se guardó otro modelo mientras cargábamos, la pareja puede estar mezclada: repetimos
+            despues = self._leer_version()
+            if despues == version:
+                break
+            version = despues
+        self.modelo, self.vectorizador = modelo, vectorizador
+        if self._cargado:
+            self.recargas += 1
+        self._cargado = True
+        self._version = version
+        self._cache.clear()
+
+    @property
+    def clases(self):
+        return self.modelo.classes_
+
+    def _predecir_limpios(self, limpios):
+        # Retorna [(sentimiento, probabilidades), ...] para una lista de textos ya limpios
+        with self._lock:
+            self._comprobar_modelo()
+            resultados = [None] * len(limpios)
+            pendientes = {}  # texto limpio → posiciones del lote (los repetidos se predicen una vez)
+            for i, texto in enumerate(limpios):
+                guardado = self._cache.get(texto) if self.maximo else None
+                if guardado is not None:
+                    self._cache.move_to_end(texto)  # Usado recientemente
+                    resultados[i] = guardado
+                else:
+                    pendientes.setdefault(texto, []).append(i)
+            self.aciertos += len(limpios) - len(pendientes)
+            self.fallos += len(pendientes)
+            modelo, vectorizador, version = self.modelo, self.vectorizador, self._version
+
+        if pendientes:
+            textos = list(pendientes)
+            probabilidades = modelo.predict_proba(vectorizador.transform(textos))
+            etiquetas = modelo.classes_[probabilidades.argmax(axis=1)]
+            with self._lock:
+                for texto, etiqueta, fila in zip(textos, etiquetas, probabilidades):
+                    # Copia de la fila: una vista mantendría viva en la caché la matriz de todo el lote
+                    resultado = (etiqueta, fila.copy())
+                    for i in pendientes[texto]:
+                        resultados[i] = resultado
+                    # Si el modelo se recargó mientras predecíamos, no guardamos resultados del anterior
+                    if self.maximo and version == self._version:
+                        self._cache[texto] = resultado
+                        if len(self._cache) > self.maximo:
+                            self._cache.popitem(last=False)  # Descartamos el usado hace más tiempo
+        return resultados
+
+    def predecir(self, texto):
+        return self._predecir_limpios([preprocesado(texto)])[0]
+
+    def predecir_lote(self, textos, n_jobs=1):
+        """
+        Retorna (etiquetas, probabilidades) como puntuar.predecir_lote:
+        probabilidades[i, j] es la probabilidad de la clase self.clases[j].
+        """
+        resultados = self._predecir_limpios(preprocesar_lote(textos, n_jobs=n_jobs))
+        if not resultados:
+            return np.array([], dtype=object), np.empty((0, len(self.clases)))
+        return np.array([r[0] for r in resultados]), np.vstack([r[1] for r in resultados])
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._cache),
+            "maximo": self.maximo,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "recargas_modelo": self.recargas,
+        }
+
+    def limpiar(self):
+        with self._lock:
+            self._cache.clear()
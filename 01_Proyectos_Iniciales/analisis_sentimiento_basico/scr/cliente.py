@@ -0,0 +1,85 @@
+# cliente.py
+# Cliente local del servidor de predicción (servidor.py), sin dependencias externas.
+# Sirve para probar el servidor y para medirlo con muchas peticiones concurrentes.
+#
+# Uso:
+#     python cliente.py "I love this song!"
+#     python cliente.py --concurrencia 32 --peticiones 2000     # Prueba de carga
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import percentil  # Mismo cálculo de percentiles que la ruta /metricas del servidor
+
+# Mismo host y puerto por defecto que servidor.py (no lo importamos para no cargar pandas ni scikit-learn)
+URL_POR_DEFECTO = "http://127.0.0.1:8001"
+
+# Tweets de prueba para la prueba de carga
+TWEETS_POR_DEFECTO = [
+    "I love this song so much!", "Worst day ever, my car broke down", "Just finished my exams #happy",
+    "@friend thanks for the gift", "I'm so tired of waiting", "Check this out http://bit.ly/abc",
+    "What a beautiful morning", "I miss you already",
+]
+
+
+def _peticion(url, datos=None):
+    # GET si no hay datos; POST con cuerpo JSON si los hay
+    cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else None
+    peticion = urllib.request.Request(url, data=cuerpo, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(peticion) as respuesta:
+        return json.loads(respuesta.read().decode("utf-8"))
+
+
+def predecir(tweet, url=URL_POR_DEFECTO):
+    return _peticion(f"{url}/predecir", {"tweet": tweet})
+
+
+def predecir_varios(tweets, url=URL_POR_DEFECTO):
+    return _peticion(f"{url}/predecir", {"tweets": list(tweets)})["predicciones"]
+
+
+def metricas(url=URL_POR_DEFECTO):
+    return _peticion(f"{url}/metricas")
+
+
+def prueba_de_carga(url, peticiones, concurrencia):
+    # Envía 'peticiones' tweets individuales desde 'concurrencia' hilos y mide cada uno
+    def una(i):
+        inicio = time.perf_counter()
+        predecir(TWEETS_POR_DEFECTO[i % len(TWEETS_POR_DEFECTO)], url)
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        latencias = sorted(ejecutor.map(una, range(peticiones)))
+    duracion = time.perf_counter() - inicio
+    print(f"{peticiones} peticiones en {duracion:.2f} s ({peticiones / duracion:.0f} peticiones/s)")
+    print(f"Latencia en el cliente: p50 {percentil(latencias, 50) * 1000:.1f} ms, "
+          f"p95 {percentil(latencias, 95) * 1000:.1f} ms, p99 {percentil(latencias, 99) * 1000:.1f} ms")
+    print("Métricas del servidor:", json.dumps(metricas(url), indent=4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente del servidor de predicción de sentimiento")
+    parser.add_argument("tweets", nargs="*", help="Tweets a predecir (varios = una petición por lotes)")
+    parser.add_argument("--url", type=str, default=URL_POR_DEFECTO)
+    parser.add_argument("--peticiones", type=int, default=0, help="Peticiones de la prueba de carga")
+    parser.add_argument("--concurrencia", type=int, default=16, help="Clientes simultáneos en la prueba de carga")
+    args = parser.parse_args()
+
+    if args.peticiones:
+        prueba_de_carga(args.url, args.peticiones, args.concurrencia)
+    elif len(args.tweets) == 1:
+        print(predecir(args.tweets[0], args.url))
+    elif args.tweets:
+        for tweet, prediccion in zip(args.tweets, predecir_varios(args.tweets, args.url)):
+            print(f"{tweet!r}: {prediccion}")
+    else:
+        print(json.dumps(metricas(args.url), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# compacto.py
+# Versión compacta del modelo para predecir sin scikit-learn ni joblib.
+#
+# exportar_compacto() guarda lo mínimo que necesita la predicción del modelo TF-IDF + Regresión Logística:
+#   - vocabulario.txt: un término por línea, en el orden de las columnas del vectorizador
+#   - idf.npy y pesos.npy: pesos IDF y coeficientes del modelo multiplicados por el IDF (se abren con mmap)
+#   - meta.json: clases, término independiente y ajustes del vectorizador
+# PuntuadorCompacto tokeniza, pondera y hace el producto escalar con NumPy, con las mismas
+# predicciones que el camino de scikit-learn, y arranca más rápido y con menos memoria por proceso.
+#
+# Uso:
+#     python compacto.py                      # Exporta modelos/*.pkl a modelos/compacto/
+#     python compacto.py --modelos otra/carpeta --salida otra/carpeta/compacto
+
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+from preprocesado import preprocesar_lote
+
+# Carpeta por defecto del modelo compacto (dentro de la carpeta 'modelos')
+RUTA_COMPACTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos', 'compacto')
+
+
+def exportar_compacto(modelo, vectorizador, ruta=RUTA_COMPACTO):
+    """
+    Guarda un TfidfVectorizer + LogisticRegression (binaria) en formato compacto.
+    Lanza ValueError si el modelo o el vectorizador usan opciones que el puntuador compacto no reproduce.
+    """
+    if not hasattr(vectorizador, "vocabulary_") or not hasattr(vectorizador, "use_idf"):
+        raise ValueError("Solo se puede exportar un TfidfVectorizer entrenado")
+    if (vectorizador.analyzer != "word" or vectorizador.tokenizer is not None
+            or vectorizador.preprocessor is not None or vectorizador.stop_words is not None
+            or vectorizador.strip_accents is not None or vectorizador.norm not in ("l2", None)):
+        raise ValueError("El vectorizador usa opciones que el puntuador compacto no reproduce")
+    if getattr(modelo, "coef_", None) is None or modelo.coef_.shape[0] != 1:
+        raise ValueError("Solo se puede exportar un modelo lineal binario (coef_ de una fila)")
+
+    os.makedirs(ruta, exist_ok=True)
+    # Términos ordenados por su columna: la línea i del archivo es la columna i
+    terminos = sorted(vectorizador.vocabulary_, key=vectorizador.vocabulary_.get)
+    with open(os.path.join(ruta, 'vocabulario.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(terminos))
+    # Sin use_idf todos los términos pesan lo mismo
+    idf = vectorizador.idf_ if vectorizador.use_idf else np.ones(len(terminos))
+    np.save(os.path.join(ruta, 'idf.npy'), idf.astype(np.float64))
+    # El IDF multiplica al coeficiente de cada término en el producto escalar: lo guardamos ya multiplicado
+    np.save(os.path.join(ruta, 'pesos.npy'), (idf * modelo.coef_[0]).astype(np.float64))
+    meta = {
+        "clases": [str(c) for c in modelo.classes_],
+        "intercepto": float(modelo.intercept_[0]),
+        "token_pattern": vectorizador.token_pattern,
+        "lowercase": vectorizador.lowercase,
+        "ngram_range": list(vectorizador.ngram_range),
+        "binary": vectorizador.binary,
+        "sublinear_tf": vectorizador.sublinear_tf,
+        "norm": vectorizador.norm,
+    }
+    with open(os.path.join(ruta, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+
+
+class PuntuadorCompacto:
+    """
+    Predictor que solo necesita NumPy. Se usa como el par modelo/vectorizador:
+        puntuador = PuntuadorCompacto()
+        puntuador.predecir(["I love it"])        → array(['positivo'])
+        puntuador.predecir_proba(["I love it"])  → probabilidades de cada clase (en el orden de 'clases')
+    Los textos se limpian con preprocesado() antes de tokenizarlos, igual que en main.py.
+    """
+
+    def __init__(self, ruta=RUTA_COMPACTO):
+        with open(os.path.join(ruta, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(os.path.join(ruta, 'vocabulario.txt'), encoding='utf-8') as f:
+            self.vocabulario = {termino: i for i, termino in enumerate(f.read().split("\n"))}
+        # mmap_mode="r": los procesos que cargan el mismo archivo comparten sus páginas en memoria
+        self.idf = np.load(os.path.join(ruta, 'idf.npy'), mmap_mode="r")
+        self.pesos = np.load(os.path.join(ruta, 'pesos.npy'), mmap_mode="r")
+        self.clases = np.array(meta["clases"])
+        self.intercepto = meta["intercepto"]
+        self.patron = re.compile(meta["token_pattern"])
+        self.minusculas = meta["lowercase"]
+        self.ngramas = tuple(meta["ngram_range"])
+        self.binario = meta["binary"]
+        self.sublineal = meta["sublinear_tf"]
+        self.norma = meta["norm"]
+
+    def _indices(self, texto):
+        # Columnas de los términos (y n-gramas) del texto que están en el vocabulario, con repeticiones
+        if self.minusculas:
+            texto = texto.lower()
+        palabras = self.patron.findall(texto)
+        minimo, maximo = self.ngramas
+        vocabulario = self.vocabulario
+        indices = []
+        for n in range(minimo, maximo + 1):
+            for i in range(len(palabras) - n + 1):
+                columna = vocabulario.get(" ".join(palabras[i:i + n]))
+                if columna is not None:
+                    indices.append(columna)
+        return indices
+
+    def puntuaciones(self, textos):
+        """
+        Valor de la función de decisión de cada texto (como modelo.decision_function de scikit-learn).
+        """
+        documentos, columnas = [], []
+        limpios = preprocesar_lote(textos)
+        for d, texto in enumerate(limpios):
+            indices = self._indices(texto)
+            documentos.extend([d] * len(indices))
+            columnas.extend(indices)
+        n = len(limpios)
+        if not columnas:
+            return np.full(n, self.intercepto)
+
+        # Frecuencia de cada par (documento, término): agrupamos las repeticiones
+        claves, frecuencias = np.unique(
+            np.asarray(documentos, dtype=np.int64) * len(self.vocabulario) + np.asarray(columnas, dtype=np.int64),
+            return_counts=True,
+        )
+        documentos, columnas = np.divmod(claves, len(self.vocabulario))
+        tf = frecuencias.astype(np.float64)
+        if self.binario:
+            tf = np.ones_like(tf)
+        elif self.sublineal:
+            tf = np.log(tf) + 1
+        valores = tf * self.idf[columnas]
+
+        producto = np.bincount(documentos, weights=tf * self.pesos[columnas], minlength=n)
+        if self.norma == "l2":
+            normas = np.sqrt(np.bincount(documentos, weights=valores ** 2, minlength=n))
+            producto = np.divide(producto, normas, out=np.zeros(n), where=normas > 0)
+        return producto + self.intercepto
+
+    def predecir_proba(self, textos):
+        # Regresión logística binaria: probabilidad de la segunda clase = sigmoide(puntuación)
+        positiva = 1 / (1 + np.exp(-self.puntuaciones(textos)))
+        return np.column_stack([1 - positiva, positiva])
+
+    def predecir(self, textos):
+        return self.clases[(self.puntuaciones(textos) > 0).astype(int)]
+
+
+def main():
+    from modelo import RUTA_MODELOS, cargar_modelo  # Solo la exportación necesita scikit-learn
+
+    parser = argparse.ArgumentParser(description="Exporta el modelo de sentimiento en formato compacto")
+    parser.add_argument("--modelos", type=str, default=RUTA_MODELOS,
+                        help="Carpeta con sentiment_model.pkl y vectorizador.pkl")
+    parser.add_argument("--salida", type=str, default=None, help="Carpeta del modelo compacto")
+    args = parser.parse_args()
+
+    salida = args.salida or os.path.join(args.modelos, 'compacto')
+    try:
+        modelo, vectorizador = cargar_modelo(args.modelos)
+        exportar_compacto(modelo, vectorizador, salida)
+    except FileNotFoundError as e:
+        print(f"No se encontró el archivo: {e}")
+        exit(1)
+    except ValueError as e:
+        print(f"No se puede exportar el modelo: {e}")
+        exit(1)
+    print(f"Modelo compacto guardado en '{salida}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# entrenar_modelo.py
+# Punto de entrada del entrenamiento: carga el dataset, entrena el modelo y guarda
+# sentiment_model.pkl y vectorizador.pkl en la carpeta 'modelos'.
+#
+# Uso:
+#     python entrenar_modelo.py
+#     python entrenar_modelo.py --datos ruta/al/training.1600000.processed.noemoticon.csv --muestra 100000
+#     python entrenar_modelo.py --incremental --epocas 3   # Todos los tweets, por bloques y con memoria acotada
+
+import argparse
+import sys
+
+import pandas as pd
+
+from modelo import RUTA_CSV, RUTA_MODELOS, cargar_datos, entrenar, entrenar_incremental, guardar_modelo
+
+
+def entrenar_con_muestra(args):
+    # Modo por defecto: TF-IDF + Regresión Logística sobre una muestra del dataset
+
+    # =========================
+    # 1. CARGAR LOS DATOS CON MANEJO DE EXCEPCIONES
+    # =========================
+    try:
+        df = cargar_datos(args.datos, muestra=args.muestra or None, estratificado=args.estratificado)
+    except FileNotFoundError as e:
+        # Sin datos no podemos continuar
+        print("Error:", e)
+        sys.exit(1)
+    except pd.errors.ParserError as e:
+        # El CSV está corrupto o mal formateado
+        print("Error al leer el CSV. Posiblemente está corrupto o mal formateado.")
+        print(e)
+        sys.exit(1)
+    except Exception as e:
+        print("Ocurrió un error inesperado al leer el archivo CSV.")
+        print(e)
+        sys.exit(1)
+
+    print("Primeras filas del dataset:")
+    print(df.head())
+    print("\nNúmero total de registros seleccionados:", len(df))
+
+    # =========================
+    # 2. ENTRENAMIENTO Y EVALUACIÓN
+    # =========================
+    print("\nEntrenando el modelo...")
+    modelo, vectorizador, precision = entrenar(df, max_features=args.max_features, n_jobs=args.n_jobs)
+    print("Precisión del modelo:", precision)
+    return modelo, vectorizador
+
+
+def entrenar_por_bloques(args):
+    # Modo incremental: recorre todo el CSV por bloques; la memoria no depende del tamaño del archivo
+    def informar(epoca, precision):
+        texto = f"{precision:.4f}" if precision is not None else "-"
+        print(f"Época {epoca}/{args.epocas}: precisión en prueba = {texto}")
+
+    print("Entrenando el modelo por bloques con todo el dataset...")
+    try:
+        modelo, vectorizador, _ = entrenar_incremental(
+            args.datos, epocas=args.epocas, n_features=args.n_features, n_jobs=args.n_jobs, informar=informar,
+        )
+    except FileNotFoundError as e:
+        print("Error:", e)
+        sys.exit(1)
+    return modelo, vectorizador
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena el modelo de análisis de sentimiento")
+    parser.add_argument("--datos", type=str, default=RUTA_CSV, help="Ruta al CSV de Sentiment140")
+    parser.add_argument("--muestra", type=int, default=50000,
+                        help="Número de tweets seleccionados al azar para entrenar (0 = todos)")
+    parser.add_argument("--estratificado", action="store_true",
+                        help="Toma el mismo número de tweets positivos y negativos")
+    parser.add_argument("--max_features", type=int, default=5000, help="Tamaño máximo del vocabulario TF-IDF")
+    parser.add_argument("--n_jobs", type=int, default=1,
+                        help="Procesos para limpiar los tweets (-1 = todos los procesadores)")
+    parser.add_argument("--modelos", type=str, default=RUTA_MODELOS,
+                        help="Carpeta donde guardar el modelo y el vectorizador")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Entrena con todos los tweets por bloques (HashingVectorizer + SGDClassifier)")
+    parser.add_argument("--epocas", type=int, default=3, help="Pasadas sobre el dataset en el modo incremental")
+    parser.add_argument("--n_features", type=int, default=2 ** 20,
+                        help="Dimensión de los vectores del HashingVectorizer en el modo incremental")
+    args = parser.parse_args()
+
+    if args.incremental:
+        modelo, vectorizador = entrenar_por_bloques(args)
+    else:
+        modelo, vectorizador = entrenar_con_muestra(args)
+
+    # =========================
+    # GUARDAR MODELO Y VECTORIZADOR
+    # =========================
+    try:
+        guardar_modelo(modelo, vectorizador, args.modelos)
+        print(f"Modelo y vectorizador guardados correctamente en la carpeta '{args.modelos}'.")
+    except Exception as e:
+        print(f"Error al guardar modelo/vectorizador: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
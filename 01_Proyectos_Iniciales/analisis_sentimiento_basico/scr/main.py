@@ -1,7 +1,8 @@
 # main.py
 import os
-import joblib
-from modelo import preprocesado  # Importamos la función de limpieza de tweets
+# El predictor no depende de pandas ni entrena nada: únicamente carga los archivos .pkl.
+# Guarda en caché la predicción de cada tweet ya limpio (retweets y textos repetidos no vuelven a pasar por el modelo)
+from cache_predicciones import PredictorCacheado
 
 # =========================
 # 1. CARGAR MODELO Y VECTORIZADOR DESDE LA CARPETA 'modelos'
@@ -11,11 +12,8 @@ try:
     # Definimos la ruta de la carpeta donde guardamos los modelos
     ruta_modelos = os.path.join(os.path.dirname(__file__), 'modelos')
 
-    # Cargamos el modelo entrenado
-    modelo = joblib.load(os.path.join(ruta_modelos, 'sentiment_model.pkl'))
-
-    # Cargamos el vectorizador
-    vectorizador = joblib.load(os.path.join(ruta_modelos, 'vectorizador.pkl'))
+    # Cargamos el modelo entrenado y el vectorizador (se recargan solos si se reentrena el modelo)
+    predictor = PredictorCacheado(ruta_modelos)
 
     print("Modelo y vectorizador cargados correctamente.")
 
@@ -37,22 +35,37 @@ def predecir_sentimiento(texto):
     Recibe un tweet nuevo, lo limpia y devuelve si su sentimiento es positivo o negativo.
     Pasos:
     1. Limpieza del texto usando la función preprocesado().
-    2. Transformación del texto en vector numérico mediante el vectorizador cargado.
-    3. Predicción usando el modelo cargado.
+    2. Si el texto limpio ya se predijo antes, se devuelve el resultado guardado en la caché.
+    3. Si no, transformación del texto en vector numérico mediante el vectorizador cargado
+       y predicción usando el modelo cargado.
+    """
+    sentimiento, _ = predictor.predecir(texto)
+    return sentimiento
+
+
+def predecir_sentimientos(textos):
+    """
+    Versión por lotes de predecir_sentimiento(): una sola llamada al vectorizador y al modelo
+    para todos los tweets que no están en la caché.
     """
-    texto_limpio = preprocesado(texto)
-    vector = vectorizador.transform([texto_limpio])
-    return modelo.predict(vector)[0]
+    sentimientos, _ = predictor.predecir_lote(textos)
+    return list(sentimientos)
 
 # =========================
 # 3. INTERFAZ POR PANTALLA
 # =========================
 if __name__ == "__main__":
     print("¡Bienvenido! Introduce tweets para analizar su sentimiento. Escribe 'salir' para terminar.")
+    print("Escribe 'cache' para ver la tasa de aciertos de la caché de predicciones.")
     while True:
         tweet_usuario = input("Tweet: ")
         if tweet_usuario.lower() == "salir":
             print("¡Hasta luego!")
             break
+        if tweet_usuario.lower() == "cache":
+            e = predictor.estadisticas()
+            print(f"Caché: {e['entradas']}/{e['maximo']} textos, {e['aciertos']} aciertos, "
+                  f"{e['fallos']} fallos (tasa de aciertos {e['tasa_aciertos']:.1%})\n")
+            continue
         sentimiento = predecir_sentimiento(tweet_usuario)
         print(f"El sentimiento del tweet es: {sentimiento}\n")
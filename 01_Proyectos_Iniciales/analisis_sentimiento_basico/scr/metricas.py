@@ -0,0 +1,27 @@
+# metricas.py
+# Cálculo de percentiles de latencia, compartido por servidor.py (ruta /metricas) y cliente.py
+# (prueba de carga). Solo usa la biblioteca estándar, así el cliente sigue sin dependencias externas.
+
+import math  # Redondeo hacia arriba del rango del percentil
+
+
+def percentil(valores, p):
+    """
+    Percentil por el método del rango más cercano (rango = ceil(p/100 · n)) sobre una lista ya ordenada.
+    Retorna None si la lista está vacía.
+
+    Comprobación (python -m doctest metricas.py):
+    >>> percentil([1, 2], 50)
+    1
+    >>> percentil(list(range(10)), 50)
+    4
+    >>> percentil(list(range(20)), 95)
+    18
+    >>> percentil(list(range(100)), 7), percentil(list(range(100)), 100), percentil([7], 0)
+    (6, 99, 7)
+    """
+    if not valores:
+        return None
+    # p · n se multiplica antes de dividir: p / 100 · n arrastra errores de coma flotante (7 / 100 · 100 = 7.000…01)
+    indice = max(0, min(len(valores) - 1, math.ceil(p * len(valores) / 100) - 1))
+    return valores[indice]
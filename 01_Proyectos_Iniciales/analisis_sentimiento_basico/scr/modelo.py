@@ -1,180 +1,289 @@
 # =========================
 # Importación de librerías
 # =========================
+# Este módulo es una librería: importarlo NO entrena nada.
+# El entrenamiento se lanza explícitamente con entrenar_modelo.py.
 
 import os                          # Para manejar rutas, verificar si archivos existen, etc.
+import tempfile                    # Carpeta temporal para el entrenamiento por bloques
+import time                        # Marca de la versión del modelo guardado
+import numpy as np                 # Generador aleatorio reproducible para el muestreo
 import pandas as pd                # Para manipular datos en forma de tablas (DataFrames)
-import re                          # Para usar expresiones regulares y limpiar texto
 from sklearn.feature_extraction.text import TfidfVectorizer  # Para convertir texto a vectores numéricos
+from sklearn.feature_extraction.text import HashingVectorizer  # Vectorizador sin estado (no necesita ver todos los datos)
 from sklearn.model_selection import train_test_split        # Para dividir los datos en entrenamiento y prueba
 from sklearn.linear_model import LogisticRegression         # Modelo de clasificación lineal
+from sklearn.linear_model import SGDClassifier              # Modelo lineal que se entrena por partes (partial_fit)
 from sklearn.metrics import accuracy_score                  # Para medir la precisión del modelo
 import joblib                      # Para guardar y cargar modelos y objetos de Python
-import sys                         # Para poder salir del script si ocurre un error crítico
 
-# =========================
-# 1. CARGAR LOS DATOS CON MANEJO DE EXCEPCIONES
-# =========================
+from preprocesado import preprocesado, preprocesar_lote  # Limpieza de tweets (se mantiene 'from modelo import preprocesado')
 
-# Ruta del dataset que vamos a usar
-ruta_csv = r"C:\Archivos de trabajo\Python-IA\analisis_sentimiento_basico\Data\training.1600000.processed.noemoticon.csv"
+# Ruta por defecto del dataset (carpeta Data/ del proyecto)
+RUTA_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "Data", "training.1600000.processed.noemoticon.csv",
+)
 
-try:
-    # Verificamos si el archivo existe antes de intentar leerlo
-    if not os.path.exists(ruta_csv):
-        # Si no existe, lanzamos una excepción FileNotFoundError con un mensaje explicativo
-        raise FileNotFoundError(f"No se encontró el archivo: {ruta_csv}")
+# Carpeta donde se guardan el modelo y el vectorizador
+RUTA_MODELOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos')
 
-    # Intentamos leer el archivo CSV
-    # encoding="latin-1" se usa porque algunos tweets antiguos tienen caracteres especiales
-    # header=None porque el CSV no tiene encabezado
-    datos = pd.read_csv(ruta_csv, encoding="latin-1", header=None)
+# Archivo que guardar_modelo() escribe el último, cuando el modelo y el vectorizador ya están
+# en su sitio: si cambia, hay un modelo nuevo y completo (lo usa cache_predicciones.py)
+ARCHIVO_VERSION = 'version.txt'
 
-except FileNotFoundError as e:
-    # Capturamos el error si el archivo no existe
-    print("Error:", e)
-    sys.exit(1)  # Salimos del programa porque sin datos no podemos continuar
+# Etiquetas del dataset: 0 = negativo, 4 = positivo
+ETIQUETAS = {0: "negativo", 4: "positivo"}
 
-except pd.errors.ParserError as e:
-    # Capturamos errores si el CSV está corrupto o mal formateado
-    print("Error al leer el CSV. Posiblemente está corrupto o mal formateado.")
-    print(e)
-    sys.exit(1)
+# Filas que se leen de cada vez del CSV
+TAMANO_BLOQUE = 100_000
 
-except Exception as e:
-    # Capturamos cualquier otro error inesperado
-    print("Ocurrió un error inesperado al leer el archivo CSV.")
-    print(e)
-    sys.exit(1)
 
 # =========================
-# 2. SELECCIÓN DE COLUMNAS Y RENOMBRADO
+# 1. CARGAR LOS DATOS
 # =========================
+def leer_por_bloques(ruta_csv=RUTA_CSV, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Recorre el CSV de Sentiment140 por bloques de 'tamano_bloque' filas.
+    Cada bloque es un DataFrame con las columnas 'sentimiento' (0 o 4) y 'tweet'.
+    - Solo se leen las columnas que necesitamos: 0 (sentimiento) y 5 (texto del tweet).
+    - encoding="latin-1" porque algunos tweets antiguos tienen caracteres especiales.
+    - header=None porque el CSV no tiene encabezado.
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    # Verificamos si el archivo existe antes de intentar leerlo
+    if not os.path.exists(ruta_csv):
+        raise FileNotFoundError(f"No se encontró el archivo: {ruta_csv}")
 
-# El dataset original tiene muchas columnas, pero solo necesitamos:
-# - columna 0: sentimiento (0 = negativo, 4 = positivo)
-# - columna 5: texto del tweet
-df = datos[[0, 5]].copy()  # Hacemos una copia para evitar advertencias de pandas
+    lector = pd.read_csv(
+        ruta_csv, encoding="latin-1", header=None, usecols=[0, 5],
+        dtype={0: "int8", 5: str}, chunksize=tamano_bloque,
+    )
+    for bloque in lector:
+        bloque.columns = ["sentimiento", "tweet"]
+        yield bloque
 
-# Renombramos columnas a nombres más descriptivos
-df.columns = ["sentimiento", "tweet"]
 
-# Convertimos las etiquetas numéricas a texto para mayor legibilidad
-# 0 -> "negative" (negativo)
-# 4 -> "positive" (positivo)
-df['sentimiento'] = df['sentimiento'].map({0: "negativo", 4: "positivo"})
+class _Reserva:
+    """
+    Muestreo por reserva (algoritmo R): mantiene una muestra uniforme de tamaño k
+    de todas las filas vistas, sin saber de antemano cuántas hay.
+    La fila número i (empezando en 0) sustituye a un elemento al azar con probabilidad k / (i + 1).
+    """
 
-# Para acelerar el entrenamiento, seleccionamos aleatoriamente 50.000 registros
-# random_state asegura que la selección sea reproducible
-df = df.sample(50000, random_state=42)
+    def __init__(self, k, generador):
+        self.k = k
+        self.generador = generador
+        self.vistos = 0
+        self.elementos = []  # Pares (sentimiento, tweet)
+
+    def agregar(self, etiquetas, tweets):
+        n = len(tweets)
+        # Mientras la reserva no está llena, se guardan todas las filas
+        libres = max(0, min(n, self.k - len(self.elementos)))
+        self.elementos.extend(zip(etiquetas[:libres], tweets[:libres]))
+        if libres < n:
+            # Para el resto, sorteamos una posición en [0, i] por fila de una sola vez
+            indices = np.arange(self.vistos + libres, self.vistos + n)
+            posiciones = self.generador.integers(0, indices + 1)
+            # Solo se recorren (en orden) las filas que entran en la reserva
+            for fila in np.flatnonzero(posiciones < self.k):
+                self.elementos[posiciones[fila]] = (etiquetas[libres + fila], tweets[libres + fila])
+        self.vistos += n
+
+
+def cargar_datos(ruta_csv=RUTA_CSV, muestra=50000, random_state=42, estratificado=False,
+                 tamano_bloque=TAMANO_BLOQUE):
+    """
+    Lee el CSV de Sentiment140 y devuelve un DataFrame con las columnas 'sentimiento' y 'tweet'.
+    - Si 'muestra' no es None, selecciona aleatoriamente ese número de registros en una sola pasada
+      por bloques (muestreo por reserva, reproducible con random_state). La memoria depende
+      del tamaño de la muestra y del bloque, no del tamaño del archivo.
+    - Con estratificado=True se toma el mismo número de tweets de cada sentimiento.
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    bloques = leer_por_bloques(ruta_csv, tamano_bloque)
+    if muestra is None:
+        df = pd.concat(list(bloques), ignore_index=True)
+    else:
+        generador = np.random.default_rng(random_state)
+        if estratificado:
+            reservas = {etiqueta: _Reserva(muestra // len(ETIQUETAS), generador) for etiqueta in ETIQUETAS}
+        else:
+            reserva = _Reserva(muestra, generador)
+
+        for bloque in bloques:
+            etiquetas, tweets = bloque['sentimiento'].to_numpy(), bloque['tweet'].to_numpy()
+            if estratificado:
+                for etiqueta, r in reservas.items():
+                    filas = etiquetas == etiqueta
+                    r.agregar(etiquetas[filas], tweets[filas])
+            else:
+                reserva.agregar(etiquetas, tweets)
+
+        if estratificado:
+            elementos = [e for r in reservas.values() for e in r.elementos]
+            # Mezclamos para que los sentimientos no queden agrupados
+            elementos = [elementos[i] for i in generador.permutation(len(elementos))]
+        else:
+            elementos = reserva.elementos
+        df = pd.DataFrame(elementos, columns=["sentimiento", "tweet"])
+
+    # Convertimos las etiquetas numéricas a texto para mayor legibilidad
+    df['sentimiento'] = df['sentimiento'].map(ETIQUETAS)
+    return df
 
-# Mostramos las primeras filas para verificar que todo esté correcto
-print("Primeras filas del dataset:")
-print(df.head())
-print("\nNúmero total de registros seleccionados:", len(df))
 
 # =========================
-# 3. PREPROCESAMIENTO DEL TEXTO
+# 2. ENTRENAMIENTO Y EVALUACIÓN
 # =========================
-
-def preprocesado(texto):
+def entrenar(df, max_features=5000, test_size=0.2, random_state=42, n_jobs=1):
     """
-    Función que limpia el texto de cada tweet antes de vectorizarlo.
-    Pasos:
-    1. Verifica que el dato sea una cadena; si no lo es, devuelve un string vacío.
-    2. Convierte todo el texto a minúsculas.
-    3. Elimina URLs (http, https, www).
-    4. Elimina menciones (@usuario).
-    5. Elimina hashtags (#ejemplo).
-    6. Elimina caracteres no alfabéticos (números, signos de puntuación, emojis, etc.).
+    Limpia los tweets, los vectoriza con TF-IDF y entrena una Regresión Logística.
+    n_jobs es el número de procesos para la limpieza (-1 = todos).
+    Retorna (modelo, vectorizador, precision) con la precisión medida en el conjunto de prueba.
     """
-    if not isinstance(texto, str):
-        return ""
-    texto = texto.lower()  # Convertimos todo a minúsculas
-    texto = re.sub(r"http\S+|www\S+|https\S+", '', texto)  # Eliminamos URLs
-    texto = re.sub(r'@\w+', '', texto)                     # Eliminamos menciones
-    texto = re.sub(r'#\w+', '', texto)                     # Eliminamos hashtags
-    texto = re.sub(r'[^a-zA-Z\s]', '', texto)             # Eliminamos caracteres no alfabéticos
-    return texto
-
-# Aplicamos la función de preprocesado a toda la columna 'tweet'
-df['tweet'] = df['tweet'].apply(preprocesado)
-
-# Mostramos los primeros tweets procesados para comprobar resultados
-print("\nPrimeros tweets después de preprocesar:")
-print(df['tweet'].head())
-
-# =========================
-# 4. TRANSFORMACIÓN DE TEXTO A VECTORES
-# =========================
+    # Limpiamos toda la columna 'tweet' de una vez (mismo resultado que aplicar preprocesado a cada tweet)
+    tweets = preprocesar_lote(df['tweet'], n_jobs=n_jobs)
 
-# Los modelos de machine learning no entienden texto directamente, necesitan números
-# TfidfVectorizer convierte cada tweet en un vector numérico basado en la frecuencia de palabras
-# max_features=5000 limita el vocabulario a las 5000 palabras más relevantes
-vectorizador = TfidfVectorizer(max_features=5000)
+    # max_features limita el vocabulario a las palabras más relevantes
+    vectorizador = TfidfVectorizer(max_features=max_features)
+    X = vectorizador.fit_transform(tweets)  # Convertimos los tweets en vectores
+    y = df['sentimiento']                   # Las etiquetas (positivo/negativo)
 
-print("\nTransformando tweets en vectores numéricos...")
-X = vectorizador.fit_transform(df['tweet'])  # Convertimos los tweets en vectores
-y = df['sentimiento']                        # Las etiquetas (positivo/negativo)
+    # 80% para entrenamiento y 20% para prueba
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state
+    )
 
-# =========================
-# 5. DIVISIÓN DE DATOS EN ENTRENAMIENTO Y PRUEBA
-# =========================
-
-# Dividimos los datos en:
-# - 80% para entrenamiento (aprendizaje del modelo)
-# - 20% para prueba (evaluación del modelo)
-print("Dividiendo datos en entrenamiento y prueba...")
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# =========================
-# 6. ENTRENAMIENTO DEL MODELO
-# =========================
+    # Logistic Regression es un modelo simple y efectivo para clasificación binaria de texto
+    modelo = LogisticRegression()
+    modelo.fit(X_train, y_train)
 
-# Logistic Regression es un modelo simple y efectivo para clasificación binaria de texto
-modelo = LogisticRegression()
+    # Precisión (accuracy): porcentaje de predicciones correctas en el conjunto de prueba
+    precision = accuracy_score(y_test, modelo.predict(X_test))
+    return modelo, vectorizador, precision
 
-print("Entrenando el modelo...")
-# Entrenamos el modelo con los datos de entrenamiento
-modelo.fit(X_train, y_train)
 
 # =========================
-# 7. EVALUACIÓN DEL MODELO
+# 3. ENTRENAMIENTO POR BLOQUES CON TODO EL DATASET
 # =========================
+# El CSV de Sentiment140 está ordenado por sentimiento (primero todos los negativos), así que
+# entrenar bloque a bloque en el orden del archivo sesgaría el modelo. Por eso primero se hace
+# una pasada que limpia los tweets y los reparte al azar en "cubetas" (archivos temporales pequeños);
+# en cada época se recorren las cubetas en orden aleatorio, mezclando las filas de cada una.
+# En memoria solo hay un bloque del CSV o una cubeta a la vez.
+
+def _repartir_en_cubetas(ruta_csv, carpeta, generador, fraccion_prueba, filas_por_cubeta, cubetas_por_grupo,
+                         tamano_bloque, n_jobs):
+    """
+    Limpia los tweets del CSV y los escribe, al azar, en cubetas de unas 'filas_por_cubeta' filas
+    y en el conjunto de prueba (una fracción 'fraccion_prueba'). Cada grupo de 'cubetas_por_grupo'
+    cubetas recoge filas_por_cubeta * cubetas_por_grupo filas consecutivas, así que el número de cubetas
+    crece con el archivo y su tamaño no. Retorna la lista de cubetas creadas.
+    """
+    filas_por_grupo = filas_por_cubeta * cubetas_por_grupo
+    cubetas, vistos = set(), 0
+    for bloque in leer_por_bloques(ruta_csv, tamano_bloque):
+        bloque['tweet'] = preprocesar_lote(bloque['tweet'], n_jobs=n_jobs)
+        n = len(bloque)
+        grupos = (vistos + np.arange(n)) // filas_por_grupo
+        destinos = grupos * cubetas_por_grupo + generador.integers(0, cubetas_por_grupo, n)
+        destinos[generador.random(n) < fraccion_prueba] = -1  # -1 = conjunto de prueba
+        for destino, filas in bloque.groupby(destinos):
+            nombre = 'prueba.csv' if destino == -1 else f'cubeta_{destino}.csv'
+            filas.to_csv(os.path.join(carpeta, nombre), mode='a', header=False, index=False)
+            if destino != -1:
+                cubetas.add(int(destino))
+        vistos += n
+    return sorted(cubetas)
+
+
+def _leer_limpios(ruta, tamano_bloque=None):
+    # Lee una cubeta o el conjunto de prueba (tweets ya limpios); keep_default_na=False mantiene los tweets vacíos
+    return pd.read_csv(ruta, header=None, names=['sentimiento', 'tweet'], dtype={'sentimiento': 'int8', 'tweet': str},
+                       keep_default_na=False, chunksize=tamano_bloque)
+
+
+def entrenar_incremental(ruta_csv=RUTA_CSV, epocas=3, n_features=2 ** 20, fraccion_prueba=0.02,
+                         filas_por_cubeta=50_000, cubetas_por_grupo=32, tamano_bloque=TAMANO_BLOQUE,
+                         random_state=42, n_jobs=1, informar=None):
+    """
+    Entrena con TODOS los tweets del CSV sin cargarlos a la vez en memoria:
+    - HashingVectorizer convierte texto en vectores sin necesidad de aprender un vocabulario.
+    - SGDClassifier con pérdida logística (equivalente a una Regresión Logística) se entrena
+      cubeta a cubeta con partial_fit, durante 'epocas' pasadas.
+    - Tras cada época se mide la precisión en el conjunto de prueba y, si se indica,
+      se llama a informar(epoca, precision).
+    Retorna (modelo, vectorizador, historial) donde historial es la precisión de cada época.
+    El modelo y el vectorizador se usan igual que los de entrenar() (predict, predict_proba, transform).
+    """
+    generador = np.random.default_rng(random_state)
+    # alternate_sign=False: todos los valores positivos, como en TF-IDF; se normaliza cada tweet (norma L2)
+    vectorizador = HashingVectorizer(n_features=n_features, alternate_sign=False)
+    modelo = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=random_state)
+    clases = np.array(sorted(ETIQUETAS.values()))
+    historial = []
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        cubetas = _repartir_en_cubetas(ruta_csv, carpeta, generador, fraccion_prueba, filas_por_cubeta,
+                                       cubetas_por_grupo, tamano_bloque, n_jobs)
+        ruta_prueba = os.path.join(carpeta, 'prueba.csv')
+
+        for epoca in range(1, epocas + 1):
+            for cubeta in generador.permutation(cubetas):
+                df = _leer_limpios(os.path.join(carpeta, f'cubeta_{cubeta}.csv'))
+                df = df.iloc[generador.permutation(len(df))]  # Mezclamos las filas de la cubeta
+                modelo.partial_fit(vectorizador.transform(df['tweet']), df['sentimiento'].map(ETIQUETAS),
+                                   classes=clases)
+
+            # Precisión en el conjunto de prueba, leído también por bloques
+            aciertos, total = 0, 0
+            if os.path.exists(ruta_prueba):
+                for bloque in _leer_limpios(ruta_prueba, tamano_bloque):
+                    predicciones = modelo.predict(vectorizador.transform(bloque['tweet']))
+                    aciertos += int((predicciones == bloque['sentimiento'].map(ETIQUETAS).to_numpy()).sum())
+                    total += len(bloque)
+            precision = aciertos / total if total else None
+            historial.append(precision)
+            if informar is not None:
+                informar(epoca, precision)
+
+    return modelo, vectorizador, historial
 
-print("Evaluando el modelo...")
-# Predecimos los sentimientos de los tweets de prueba
-y_pred = modelo.predict(X_test)
-
-# Calculamos la precisión (accuracy) que indica el porcentaje de predicciones correctas
-precision = accuracy_score(y_test, y_pred)
-print("Precisión del modelo:", precision)
 
 # =========================
-# 8. GUARDAR MODELO Y VECTORIZADOR
-# =========================
+# 4. GUARDAR Y CARGAR MODELO Y VECTORIZADOR
 # =========================
-# 8. GUARDAR MODELO Y VECTORIZADOR EN UNA CARPETA DEDICADA
-# =========================
-
-try:
-    # Definimos la carpeta donde queremos guardar los modelos
-    # os.path.dirname(__file__) nos da la ruta del script actual
-    ruta_modelos = os.path.join(os.path.dirname(__file__), 'modelos')
-    
+def _reemplazar_atomico(ruta, escribir):
+    # Escribe en un archivo temporal de la misma carpeta y lo mueve a 'ruta' con os.replace (atómico):
+    # quien lea 'ruta' ve el archivo anterior o el nuevo completo, nunca uno a medio escribir
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def guardar_modelo(modelo, vectorizador, ruta_modelos=RUTA_MODELOS):
     # Creamos la carpeta si no existe. exist_ok=True evita errores si ya existe
     os.makedirs(ruta_modelos, exist_ok=True)
-
-    # Guardamos el modelo entrenado dentro de la carpeta 'modelos'
-    joblib.dump(modelo, os.path.join(ruta_modelos, 'sentiment_model.pkl'))
-
-    # Guardamos el vectorizador dentro de la misma carpeta
-    joblib.dump(vectorizador, os.path.join(ruta_modelos, 'vectorizador.pkl'))
-
-    print("Modelo y vectorizador guardados correctamente en la carpeta 'modelos'.")
-
-except Exception as e:
-    # Capturamos cualquier error al intentar guardar los archivos
-    print(f"Error al guardar modelo/vectorizador: {e}")
+    _reemplazar_atomico(os.path.join(ruta_modelos, 'sentiment_model.pkl'), lambda r: joblib.dump(modelo, r))
+    _reemplazar_atomico(os.path.join(ruta_modelos, 'vectorizador.pkl'), lambda r: joblib.dump(vectorizador, r))
+
+    # La versión se escribe al final: los predictores que vigilan la carpeta solo recargan
+    # cuando los dos archivos anteriores ya son los nuevos
+    def escribir_version(ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(f"{time.time_ns()}-{os.getpid()}\n")
+    _reemplazar_atomico(os.path.join(ruta_modelos, ARCHIVO_VERSION), escribir_version)
+
+
+def cargar_modelo(ruta_modelos=RUTA_MODELOS):
+    # Retorna (modelo, vectorizador) guardados por guardar_modelo()
+    modelo = joblib.load(os.path.join(ruta_modelos, 'sentiment_model.pkl'))
+    vectorizador = joblib.load(os.path.join(ruta_modelos, 'vectorizador.pkl'))
+    return modelo, vectorizador
@@ -0,0 +1,71 @@
+# =========================
+# Limpieza de texto de los tweets
+# =========================
+# Este módulo solo depende de la biblioteca estándar, así que importarlo es inmediato:
+# lo usan tanto el entrenamiento (modelo.py) como el predictor (main.py).
+
+import os   # Para saber cuántos procesadores hay
+import re   # Para usar expresiones regulares y limpiar texto
+from concurrent.futures import ProcessPoolExecutor  # Para repartir bloques de tweets entre procesos
+
+# Las cuatro limpiezas de preprocesado() fusionadas en un único patrón precompilado, que recorre
+# cada tweet una sola vez. El orden de las alternativas reproduce el de las pasadas originales:
+# - Las URLs van primero.
+# - Una mención o un hashtag se corta justo antes de donde empezaría una URL
+#   ("@juanhttp://x" → "@juan" + URL), porque la pasada de URLs se aplicaba antes.
+# - Al final, cualquier carácter que no sea letra o espacio.
+PATRON_LIMPIEZA = re.compile(r"http\S+|www\S+|[@#](?:(?!http\S|www\S)\w)+|[^a-zA-Z\s]")
+
+# Tweets por bloque al repartir el trabajo entre procesos
+TAMANO_BLOQUE = 50_000
+
+
+def preprocesado(texto):
+    """
+    Función que limpia el texto de cada tweet antes de vectorizarlo.
+    Pasos:
+    1. Verifica que el dato sea una cadena; si no lo es, devuelve un string vacío.
+    2. Convierte todo el texto a minúsculas.
+    3. Elimina URLs (http, https, www).
+    4. Elimina menciones (@usuario).
+    5. Elimina hashtags (#ejemplo).
+    6. Elimina caracteres no alfabéticos (números, signos de puntuación, emojis, etc.).
+    """
+    if not isinstance(texto, str):
+        return ""
+    texto = texto.lower()  # Convertimos todo a minúsculas
+    texto = re.sub(r"http\S+|www\S+|https\S+", '', texto)  # Eliminamos URLs
+    texto = re.sub(r'@\w+', '', texto)                     # Eliminamos menciones
+    texto = re.sub(r'#\w+', '', texto)                     # Eliminamos hashtags
+    texto = re.sub(r'[^a-zA-Z\s]', '', texto)             # Eliminamos caracteres no alfabéticos
+    return texto
+
+
+def _limpiar_bloque(textos):
+    # Versión rápida de preprocesado() para una lista de tweets (se ejecuta también en los procesos hijo)
+    sub = PATRON_LIMPIEZA.sub
+    return [sub("", t.lower()) if isinstance(t, str) else "" for t in textos]
+
+
+def preprocesar_lote(textos, n_jobs=1, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Limpia muchos tweets a la vez. El resultado es idéntico a aplicar preprocesado() a cada uno,
+    pero con un único patrón precompilado en lugar de cuatro re.sub por tweet.
+    - textos: lista, iterable o Serie de pandas. Si es una Serie, se devuelve una Serie con el mismo índice.
+    - n_jobs: procesos que se reparten los bloques de 'tamano_bloque' tweets (-1 = todos los procesadores).
+      Solo compensa con cientos de miles de tweets: cada bloque se envía y se devuelve entre procesos.
+    """
+    lista = list(textos)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(lista) <= tamano_bloque:
+        limpios = _limpiar_bloque(lista)
+    else:
+        bloques = [lista[i:i + tamano_bloque] for i in range(0, len(lista), tamano_bloque)]
+        with ProcessPoolExecutor(max_workers=n_jobs) as ejecutor:
+            limpios = [t for bloque in ejecutor.map(_limpiar_bloque, bloques) for t in bloque]
+
+    if hasattr(textos, "str") and hasattr(textos, "index"):
+        # Serie de pandas: conservamos índice y nombre para poder asignarla a una columna
+        return type(textos)(limpios, index=textos.index, name=textos.name)
+    return limpios
@@ -0,0 +1,190 @@
+# puntuar.py
+# Predicción masiva: lee un archivo CSV o JSONL por bloques, limpia, vectoriza y predice cada bloque
+# de una sola vez y escribe las predicciones (con sus probabilidades) a medida que se calculan.
+# La memoria depende del tamaño del bloque, no del tamaño del archivo.
+#
+# Uso:
+#     python puntuar.py tweets.csv predicciones.csv --columna tweet
+#     python puntuar.py training.1600000.processed.noemoticon.csv salida.jsonl --sin_encabezado --columna 5 --n_jobs 4
+#     python puntuar.py tweets.jsonl salida.jsonl --columna texto
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cache_predicciones import MAXIMO_POR_DEFECTO, PredictorCacheado
+from modelo import RUTA_MODELOS
+from preprocesado import preprocesar_lote
+
+# Tweets que se leen y predicen de cada vez
+TAMANO_BLOQUE = 50_000
+
+
+def predecir_lote(textos, modelo, vectorizador):
+    """
+    Predice el sentimiento de muchos tweets a la vez (una sola llamada a transform y a predict_proba).
+    Retorna (etiquetas, probabilidades): probabilidades[i, j] es la probabilidad de la clase modelo.classes_[j].
+    """
+    X = vectorizador.transform(preprocesar_lote(textos))
+    probabilidades = modelo.predict_proba(X)
+    return modelo.classes_[probabilidades.argmax(axis=1)], probabilidades
+
+
+def leer_textos(ruta, columna, tamano_bloque=TAMANO_BLOQUE, sin_encabezado=False):
+    """
+    Recorre un archivo CSV o JSONL por bloques y devuelve, para cada uno, una Serie con los textos
+    de 'columna' (nombre del campo, o número de columna si el CSV no tiene encabezado).
+    El índice de la Serie es el número de fila dentro del archivo.
+    """
+    if ruta.endswith(".jsonl"):
+        lector = pd.read_json(ruta, lines=True, chunksize=tamano_bloque, dtype=False)
+    else:
+        # encoding="latin-1" para poder leer directamente el CSV de Sentiment140
+        lector = pd.read_csv(
+            ruta, encoding="latin-1", header=None if sin_encabezado else "infer",
+            usecols=[columna], dtype={columna: str}, chunksize=tamano_bloque,
+        )
+    inicio = 0
+    for bloque in lector:
+        textos = bloque[columna]
+        textos.index = range(inicio, inicio + len(textos))
+        inicio += len(textos)
+        yield textos
+
+
+def _resultado(textos, etiquetas, probabilidades, clases):
+    # DataFrame de salida: fila del archivo original, sentimiento predicho y probabilidad de cada clase
+    resultado = pd.DataFrame({"fila": textos.index, "sentimiento": etiquetas})
+    for j, clase in enumerate(clases):
+        resultado[f"prob_{clase}"] = probabilidades[:, j]
+    return resultado
+
+
+def _puntuar(predictor, textos):
+    # Los tweets cuyo texto limpio ya está en la caché del predictor no pasan por el modelo
+    etiquetas, probabilidades = predictor.predecir_lote(textos)
+    return _resultado(textos, etiquetas, probabilidades, predictor.clases)
+
+
+# Predictor de cada proceso hijo (se carga una sola vez por proceso, con su propia caché)
+_predictor_proceso = None
+
+
+def _iniciar_proceso(ruta_modelos, cache_maximo):
+    global _predictor_proceso
+    _predictor_proceso = PredictorCacheado(ruta_modelos, cache_maximo)
+
+
+def _puntuar_en_proceso(textos):
+    resultado = _puntuar(_predictor_proceso, textos)
+    e = _predictor_proceso.estadisticas()
+    return resultado, (os.getpid(), e["aciertos"], e["fallos"])
+
+
+def puntuar_bloques(bloques, ruta_modelos=RUTA_MODELOS, n_jobs=1, cache_maximo=MAXIMO_POR_DEFECTO,
+                    estadisticas=None):
+    """
+    Predice una secuencia de bloques de textos (Series) y devuelve, en el mismo orden,
+    un DataFrame de resultados por bloque.
+    Con n_jobs > 1 los bloques se reparten entre procesos; como mucho hay 2 * n_jobs bloques
+    en vuelo a la vez, así que la memoria sigue acotada aunque el archivo sea enorme.
+    cache_maximo es el tamaño de la caché de predicciones de cada proceso (0 = sin caché).
+    Si se pasa un diccionario 'estadisticas', se actualiza con los aciertos y fallos de la caché.
+    """
+    if estadisticas is None:
+        estadisticas = {}
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1:
+        predictor = PredictorCacheado(ruta_modelos, cache_maximo)
+        for textos in bloques:
+            yield _puntuar(predictor, textos)
+            e = predictor.estadisticas()
+            estadisticas.update(aciertos=e["aciertos"], fallos=e["fallos"])
+        return
+
+    por_proceso = {}  # pid → (aciertos, fallos) acumulados de ese proceso
+
+    def recibir(futuro):
+        resultado, (pid, aciertos, fallos) = futuro.result()
+        por_proceso[pid] = (aciertos, fallos)
+        estadisticas.update(aciertos=sum(a for a, _ in por_proceso.values()),
+                            fallos=sum(f for _, f in por_proceso.values()))
+        return resultado
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_iniciar_proceso,
+                             initargs=(ruta_modelos, cache_maximo)) as ejecutor:
+        pendientes = deque()
+        for textos in bloques:
+            pendientes.append(ejecutor.submit(_puntuar_en_proceso, textos))
+            if len(pendientes) >= 2 * n_jobs:
+                yield recibir(pendientes.popleft())
+        while pendientes:
+            yield recibir(pendientes.popleft())
+
+
+def puntuar_archivo(entrada, salida, columna, ruta_modelos=RUTA_MODELOS, tamano_bloque=TAMANO_BLOQUE,
+                    sin_encabezado=False, n_jobs=1, informar=None, cache_maximo=MAXIMO_POR_DEFECTO,
+                    estadisticas=None):
+    """
+    Puntúa todos los tweets de 'entrada' y escribe los resultados en 'salida' (CSV o .jsonl)
+    bloque a bloque. Si se indica, llama a informar(filas, segundos) tras cada bloque.
+    Retorna (filas, segundos).
+    """
+    inicio = time.perf_counter()
+    filas = 0
+    bloques = leer_textos(entrada, columna, tamano_bloque, sin_encabezado)
+    with open(salida, "w", encoding="utf-8", newline="") as f:
+        for i, resultado in enumerate(puntuar_bloques(bloques, ruta_modelos, n_jobs, cache_maximo, estadisticas)):
+            if salida.endswith(".jsonl"):
+                resultado.to_json(f, orient="records", lines=True, force_ascii=False, double_precision=15)
+            else:
+                resultado.to_csv(f, header=(i == 0), index=False)
+            filas += len(resultado)
+            if informar is not None:
+                informar(filas, time.perf_counter() - inicio)
+    return filas, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predicción de sentimiento para archivos CSV o JSONL")
+    parser.add_argument("entrada", type=str, help="Archivo CSV o .jsonl con los tweets")
+    parser.add_argument("salida", type=str, help="Archivo CSV o .jsonl donde escribir las predicciones")
+    parser.add_argument("--columna", type=str, default="tweet",
+                        help="Campo con el texto (número de columna si se usa --sin_encabezado)")
+    parser.add_argument("--sin_encabezado", action="store_true", help="El CSV no tiene fila de encabezado")
+    parser.add_argument("--tamano_bloque", type=int, default=TAMANO_BLOQUE, help="Tweets por bloque")
+    parser.add_argument("--n_jobs", type=int, default=1, help="Procesos de predicción (-1 = todos los procesadores)")
+    parser.add_argument("--modelos", type=str, default=RUTA_MODELOS,
+                        help="Carpeta con sentiment_model.pkl y vectorizador.pkl")
+    parser.add_argument("--cache_maximo", type=int, default=MAXIMO_POR_DEFECTO,
+                        help="Textos limpios en la caché de predicciones de cada proceso (0 = sin caché)")
+    args = parser.parse_args()
+
+    columna = int(args.columna) if args.sin_encabezado else args.columna
+
+    def informar(filas, segundos):
+        print(f"\r{filas} tweets ({filas / segundos:.0f} tweets/s)", end="", flush=True)
+
+    estadisticas = {}
+    try:
+        filas, segundos = puntuar_archivo(
+            args.entrada, args.salida, columna, args.modelos, args.tamano_bloque,
+            args.sin_encabezado, args.n_jobs, informar, args.cache_maximo, estadisticas,
+        )
+    except FileNotFoundError as e:
+        print(f"No se encontró el archivo: {e}")
+        exit(1)
+
+    print(f"\nPredicciones guardadas en {args.salida}: {filas} tweets en {segundos:.1f} s "
+          f"({filas / max(segundos, 1e-9):.0f} tweets/s)")
+    if args.cache_maximo and filas:
+        print(f"Caché de predicciones: {estadisticas.get('aciertos', 0) / filas:.1%} de aciertos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# servidor.py
+# Servidor HTTP local para predecir el sentimiento de tweets.
+# El modelo y el vectorizador se cargan una sola vez. Las peticiones de un solo tweet que llegan
+# casi a la vez se agrupan en un micro-lote y se predicen con una única llamada a
+# vectorizador.transform + modelo.predict_proba, mucho más eficiente que una llamada por tweet.
+# La parte HTTP la resuelve la librería estándar (http.server): cada conexión se atiende en su hilo
+# y un hilo trabajador forma los lotes.
+#
+# Uso:
+#     python servidor.py --puerto 8001 --lote_maximo 64 --espera_ms 5
+#
+# Rutas:
+#     POST /predecir  {"tweet": "..."}         → {"sentimiento": "...", "probabilidades": {...}}
+#     POST /predecir  {"tweets": ["...", ...]} → {"predicciones": [{...}, ...]}
+#     GET  /metricas                           → latencia p50/p95/p99, tamaño medio de lote, tweets/s
+
+import argparse
+import json       # Cuerpo de las peticiones y respuestas en JSON
+import queue      # Cola de tweets pendientes de predecir
+import threading  # Hilo trabajador que forma los lotes
+import time       # Para medir la ventana de espera de cada lote y las latencias
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metricas import percentil  # Mismo cálculo de percentiles que la prueba de carga del cliente
+from modelo import RUTA_MODELOS, cargar_modelo
+from puntuar import predecir_lote
+
+# Valores por defecto del servidor
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8001
+LOTE_MAXIMO = 64         # Número máximo de tweets individuales que se predicen juntos
+ESPERA_MAXIMA_MS = 5     # Tiempo máximo que esperamos a que se llene un lote (milisegundos)
+LATENCIAS_MAXIMAS = 10_000  # Últimas latencias que se guardan para calcular percentiles
+
+
+class ServidorPrediccion:
+    """
+    Agrupa las peticiones concurrentes de un solo tweet en micro-lotes y las predice juntas.
+
+    - Cada tweet se encola junto a un 'Future' donde se dejará su predicción.
+    - Un único hilo trabajador saca el primer tweet de la cola y espera como mucho
+      'espera_maxima_ms' a que lleguen más, hasta un máximo de 'lote_maximo'.
+    - Las peticiones que ya traen una lista de tweets se predicen directamente como un lote.
+    """
+
+    def __init__(self, modelo, vectorizador, lote_maximo=LOTE_MAXIMO, espera_maxima_ms=ESPERA_MAXIMA_MS):
+        self.modelo = modelo
+        self.vectorizador = vectorizador
+        self.lote_maximo = lote_maximo
+        self.espera_maxima = espera_maxima_ms / 1000
+        self.cola = queue.Queue()
+        self._trabajador = None
+        self._metricas_lock = threading.Lock()
+        # Métricas
+        self.inicio = time.monotonic()
+        self.peticiones = 0
+        self.lotes_procesados = 0
+        self.tweets_procesados = 0
+        self.latencias = deque(maxlen=LATENCIAS_MAXIMAS)
+
+    def iniciar(self):
+        self._trabajador = threading.Thread(target=self._procesar_lotes, daemon=True)
+        self._trabajador.start()
+
+    def detener(self):
+        if self._trabajador is not None:
+            self.cola.put(None)  # Marca de fin para el trabajador
+            self._trabajador.join()
+            self._trabajador = None
+
+    def predecir_varios(self, tweets):
+        # Una sola llamada a transform y a predict_proba para todo el lote
+        if not tweets:
+            return []  # Un lote vacío no pasa por el modelo
+        etiquetas, probabilidades = predecir_lote(tweets, self.modelo, self.vectorizador)
+        clases = [str(c) for c in self.modelo.classes_]
+        with self._metricas_lock:
+            self.lotes_procesados += 1
+            self.tweets_procesados += len(tweets)
+        return [
+            {"sentimiento": str(etiqueta), "probabilidades": dict(zip(clases, map(float, fila)))}
+            for etiqueta, fila in zip(etiquetas, probabilidades)
+        ]
+
+    def predecir(self, tweet):
+        # Encola un tweet y espera a que el trabajador devuelva su predicción
+        futuro = Future()
+        self.cola.put((tweet, futuro))
+        return futuro.result()
+
+    def _recoger_lote(self):
+        # Esperamos (sin límite) al primer tweet del lote; None indica que hay que terminar
+        primero = self.cola.get()
+        if primero is None:
+            return None
+        lote = [primero]
+        limite = time.monotonic() + self.espera_maxima
+        # Después recogemos más tweets hasta llenar el lote o agotar la ventana de espera
+        while len(lote) < self.lote_maximo:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                siguiente = self.cola.get(timeout=restante)
+            except queue.Empty:
+                break
+            if siguiente is None:
+                self.cola.put(None)  # Terminamos después de este lote
+                break
+            lote.append(siguiente)
+        return lote
+
+    def _procesar_lotes(self):
+        while True:
+            lote = self._recoger_lote()
+            if lote is None:
+                return
+            try:
+                predicciones = self.predecir_varios([t for t, _ in lote])
+            except Exception as e:
+                for _, futuro in lote:
+                    futuro.set_exception(e)
+                continue
+            for (_, futuro), prediccion in zip(lote, predicciones):
+                futuro.set_result(prediccion)
+
+    def registrar_latencia(self, segundos):
+        with self._metricas_lock:
+            self.peticiones += 1
+            self.latencias.append(segundos)
+
+    def metricas(self):
+        with self._metricas_lock:
+            latencias = sorted(self.latencias)
+        activo = time.monotonic() - self.inicio
+        return {
+            "peticiones": self.peticiones,
+            "lotes": self.lotes_procesados,
+            "tweets": self.tweets_procesados,
+            "lote_medio": self.tweets_procesados / max(1, self.lotes_procesados),
+            "tweets_por_segundo": self.tweets_procesados / activo if activo else 0.0,
+            "latencia_ms": {
+                f"p{p}": percentil(latencias, p) * 1000 if latencias else None for p in (50, 95, 99)
+            },
+            "segundos_activo": activo,
+        }
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    # Un hilo por conexión; la cola de conexiones pendientes por defecto (5) se llena en las ráfagas
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def crear_manejador(servidor):
+    """
+    Crea la clase que atiende cada petición HTTP (POST /predecir y GET /metricas).
+    """
+    class Manejador(BaseHTTPRequestHandler):
+        def log_message(self, formato, *argumentos):
+            pass  # Sin una línea en la consola por cada petición
+
+        def _responder(self, estado, datos):
+            # Respuesta con cuerpo JSON
+            cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+            self.send_response(estado)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def do_GET(self):
+            if self.path == "/metricas":
+                self._responder(200, servidor.metricas())
+            else:
+                self._responder(404, {"error": "Usa POST /predecir o GET /metricas"})
+
+        def do_POST(self):
+            inicio = time.perf_counter()
+            if self.path != "/predecir":
+                self._responder(404, {"error": "Usa POST /predecir o GET /metricas"})
+                return
+            try:
+                longitud = int(self.headers.get("Content-Length", 0))
+                datos = json.loads(self.rfile.read(longitud) or b"{}")
+                if "tweets" in datos:
+                    tweets = datos["tweets"]
+                    if not isinstance(tweets, list) or not all(isinstance(t, str) for t in tweets):
+                        raise TypeError
+                else:
+                    tweet = datos["tweet"]
+                    if not isinstance(tweet, str):
+                        raise TypeError
+            except (ValueError, KeyError, TypeError):
+                self._responder(400, {"error": "Se esperaba {\"tweet\": \"...\"} o {\"tweets\": [...]}"})
+                return
+            try:
+                if "tweets" in datos:
+                    resultado = {"predicciones": servidor.predecir_varios(tweets)}
+                else:
+                    resultado = servidor.predecir(tweet)
+            except Exception as e:
+                self._responder(500, {"error": str(e)})
+                return
+            self._responder(200, resultado)
+            servidor.registrar_latencia(time.perf_counter() - inicio)
+
+    return Manejador
+
+
+def ejecutar_servidor(host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, ruta_modelos=RUTA_MODELOS,
+                      lote_maximo=LOTE_MAXIMO, espera_maxima_ms=ESPERA_MAXIMA_MS):
+    # Cargamos el modelo y el vectorizador una sola vez, antes de aceptar peticiones
+    modelo, vectorizador = cargar_modelo(ruta_modelos)
+    servidor = ServidorPrediccion(modelo, vectorizador, lote_maximo, espera_maxima_ms)
+    servidor.iniciar()
+
+    red = _ServidorHTTP((host, puerto), crear_manejador(servidor))
+    print(f"Servidor escuchando en http://{host}:{puerto}/predecir")
+    print(f"Lotes de hasta {lote_maximo} tweets, espera máxima {espera_maxima_ms} ms")
+    try:
+        red.serve_forever()
+    finally:
+        red.server_close()
+        servidor.detener()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP de predicción de sentimiento con micro-lotes")
+    parser.add_argument("--host", type=str, default=HOST_POR_DEFECTO)
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument("--lote_maximo", type=int, default=LOTE_MAXIMO, help="Tweets individuales por lote")
+    parser.add_argument("--espera_ms", type=float, default=ESPERA_MAXIMA_MS,
+                        help="Espera máxima para completar un lote (ms)")
+    parser.add_argument("--modelos", type=str, default=RUTA_MODELOS,
+                        help="Carpeta con sentiment_model.pkl y vectorizador.pkl")
+    args = parser.parse_args()
+
+    try:
+        ejecutar_servidor(args.host, args.puerto, args.modelos, args.lote_maximo, args.espera_ms)
+    except FileNotFoundError as e:
+        print(f"No se encontró el archivo: {e}")
+        exit(1)
+    except KeyboardInterrupt:
+        print("\nServidor detenido.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# almacen.py
+# Este archivo guarda el historial de conversaciones en un registro JSONL de solo-añadir (append-only).
+# Cada turno se añade al final del archivo en cuanto ocurre, en lugar de reescribir todo el historial
+# en cada guardado. El archivo solo se lee cuando hace falta (carga perezosa) y por páginas.
+
+import json       # Cada línea del archivo es un objeto JSON
+import os         # Tamaño del archivo, truncado y reemplazo atómico
+import threading  # Bloqueo compartido y compactación en segundo plano
+
+# Archivo donde guardamos el historial (una conversación por línea)
+ARCHIVO_HISTORIAL = "conversaciones.jsonl"
+
+# Línea especial que marca un "borrar": todo lo anterior deja de formar parte del historial
+MARCA_BORRADO = b'{"borrado": true}'
+
+# Número de turnos por página al mostrar el historial
+TAMANO_PAGINA = 20
+
+
+class AlmacenConversaciones:
+    """
+    Historial de conversaciones en formato JSONL, de solo-añadir.
+
+    - agregar() escribe una línea al final del archivo (coste proporcional al turno, no al historial).
+    - borrar() añade una marca de borrado en lugar de reescribir el archivo.
+    - compactar() elimina del archivo lo que quedó antes de la última marca; puede ejecutarse
+      en segundo plano con compactar_en_segundo_plano().
+    - El índice de posiciones (offsets) de cada turno se construye la primera vez que se necesita,
+      de modo que leer una página no obliga a decodificar todo el historial.
+    """
+
+    def __init__(self, ruta=ARCHIVO_HISTORIAL):
+        self.ruta = ruta
+        self._offsets = None          # Posición en bytes de cada turno vivo (None = sin construir)
+        self._inicio_sesion = None    # Posición desde la que empiezan los turnos de esta sesión
+        self._bytes_muertos = 0       # Bytes anteriores a la última marca de borrado
+        self._lock = threading.RLock()
+        self._hilo_compactacion = None
+        # Índice de búsqueda opcional (ver buscador.py) que se mantiene al día con cada cambio
+        self.indice = None
+
+    # ------------------------------------------------------------
+    # Índice perezoso de turnos
+    # ------------------------------------------------------------
+    def _tamano(self):
+        try:
+            return os.path.getsize(self.ruta)
+        except FileNotFoundError:
+            return 0
+
+    def _indice(self):
+        # Recorremos el archivo una sola vez guardando dónde empieza cada línea (sin decodificar JSON)
+        if self._offsets is None:
+            offsets = []
+            self._bytes_muertos = 0
+            try:
+                with open(self.ruta, "rb") as f:
+                    posicion = 0
+                    for linea in f:
+                        contenido = linea.strip()
+                        if contenido == MARCA_BORRADO:
+                            offsets = []
+                            self._bytes_muertos = posicion + len(linea)
+                        elif contenido:
+                            offsets.append(posicion)
+                        posicion += len(linea)
+            except FileNotFoundError:
+                pass
+            self._offsets = offsets
+        return self._offsets
+
+    def iniciar_sesion(self):
+        """
+        Marca el punto del archivo donde empieza la sesión actual.
+        descartar_sesion() vuelve a este punto si el usuario no quiere guardar la conversación.
+        """
+        with self._lock:
+            self._inicio_sesion = self._tamano()
+
+    # ------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------
+    def _escribir(self, lineas):
+        # Añade líneas al final del archivo y actualiza el índice si ya estaba construido
+        with open(self.ruta, "ab") as f:
+            posicion = f.tell()
+            for linea in lineas:
+                contenido = linea.strip()
+                if self._offsets is not None and contenido and contenido != MARCA_BORRADO:
+                    self._offsets.append(posicion)
+                f.write(linea)
+                posicion += len(linea)
+            f.flush()
+        return posicion
+
+    def _reparar_final(self):
+        # Si el programa se cortó a mitad de una escritura, la última línea puede no tener salto de línea
+        tamano = self._tamano()
+        if tamano:
+            with open(self.ruta, "rb") as f:
+                f.seek(tamano - 1)
+                if f.read(1) != b"\n":
+                    self._escribir([b"\n"])
+
+    def agregar(self, turno):
+        """
+        Añade un turno ({'usuario': ..., 'bot': ...}) al final del historial.
+        """
+        linea = json.dumps(turno, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._lock:
+            numero = len(self._indice()) + 1  # Número del turno, igual que en 'ver'
+            self._reparar_final()
+            self._escribir([linea])
+            if self.indice is not None:
+                self.indice.agregar(numero, turno)
+
+    def agregar_varios(self, turnos):
+        # Igual que agregar(), pero con una única apertura del archivo para muchos turnos
+        lineas = [json.dumps(t, ensure_ascii=False).encode("utf-8") + b"\n" for t in turnos]
+        with self._lock:
+            numero = len(self._indice()) + 1
+            self._reparar_final()
+            self._escribir(lineas)
+            if self.indice is not None:
+                self.indice.agregar_varios(numero, turnos)
+
+    def borrar(self):
+        """
+        Borra el historial añadiendo una marca de borrado (no reescribe el archivo).
+        La compactación posterior libera el espacio ocupado por los turnos antiguos.
+        """
+        with self._lock:
+            self._reparar_final()
+            final = self._escribir([MARCA_BORRADO + b"\n"])
+            self._offsets = []
+            self._bytes_muertos = final
+            # Lo borrado no se recupera aunque luego se descarte la sesión
+            if self._inicio_sesion is not None:
+                self._inicio_sesion = final
+            if self.indice is not None:
+                self.indice.limpiar()
+        self.compactar_en_segundo_plano()
+
+    def descartar_sesion(self):
+        """
+        Elimina los turnos añadidos desde iniciar_sesion() truncando el archivo.
+        """
+        with self._lock:
+            if self._inicio_sesion is None or self._inicio_sesion > self._tamano():
+                return
+            with open(self.ruta, "r+b") as f:
+                f.truncate(self._inicio_sesion)
+            self._offsets = None  # El índice se reconstruirá la próxima vez que se lea
+            if self.indice is not None:
+                self.indice.borrar_desde(self.contar() + 1)
+
+    def reemplazar(self, turnos):
+        """
+        Reescribe el historial completo con la lista indicada (operación O(historial)).
+        """
+        with self._lock:
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "wb") as f:
+                for turno in turnos:
+                    f.write(json.dumps(turno, ensure_ascii=False).encode("utf-8") + b"\n")
+            os.replace(temporal, self.ruta)  # Reemplazo atómico: nunca queda un archivo a medias
+            self._offsets = None
+            self._bytes_muertos = 0
+            if self._inicio_sesion is not None:
+                self._inicio_sesion = self._tamano()
+            if self.indice is not None:
+                self.indice.limpiar()
+                self.indice.agregar_varios(1, turnos)
+
+    # ------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------
+    def contar(self):
+        # Número de turnos del historial
+        with self._lock:
+            return len(self._indice())
+
+    def leer(self, inicio=0, fin=None):
+        """
+        Devuelve los turnos en el rango [inicio, fin), leyendo solo esas líneas del archivo.
+        Las líneas corruptas se ignoran.
+        """
+        with self._lock:
+            offsets = self._indice()[inicio:fin]
+            turnos = []
+            if not offsets:
+                return turnos
+            with open(self.ruta, "rb") as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    linea = f.readline()
+                    try:
+                        turnos.append(json.loads(linea))
+                    except json.JSONDecodeError:
+                        continue
+            return turnos
+
+    def leer_todo(self):
+        return self.leer(0, None)
+
+    def paginas(self, tamano=TAMANO_PAGINA):
+        # Número total de páginas (al menos 1, aunque el historial esté vacío)
+        return max(1, -(-self.contar() // tamano))
+
+    def leer_pagina(self, pagina, tamano=TAMANO_PAGINA):
+        """
+        Devuelve (numero_del_primer_turno, turnos) de la página indicada (empezando en 1).
+        """
+        inicio = (pagina - 1) * tamano
+        return inicio + 1, self.leer(inicio, inicio + tamano)
+
+    # ------------------------------------------------------------
+    # Compactación y migración
+    # ------------------------------------------------------------
+    def compactar(self):
+        """
+        Elimina del archivo todo lo anterior a la última marca de borrado.
+        Se copia el resto a un archivo temporal y se reemplaza de forma atómica.
+        """
+        with self._lock:
+            self._indice()
+            muertos = self._bytes_muertos
+            if not muertos:
+                return 0
+            temporal = self.ruta + ".tmp"
+            with open(self.ruta, "rb") as origen, open(temporal, "wb") as destino:
+                origen.seek(muertos)
+                while True:
+                    bloque = origen.read(1 << 20)
+                    if not bloque:
+                        break
+                    destino.write(bloque)
+            os.replace(temporal, self.ruta)
+            # Todas las posiciones se desplazan hacia atrás lo mismo que hemos eliminado
+            self._offsets = [o - muertos for o in self._offsets]
+            if self._inicio_sesion is not None:
+                self._inicio_sesion = max(0, self._inicio_sesion - muertos)
+            self._bytes_muertos = 0
+            return muertos
+
+    def compactar_en_segundo_plano(self):
+        # Lanza compactar() en un hilo para no bloquear el chat
+        if self._hilo_compactacion is not None and self._hilo_compactacion.is_alive():
+            return self._hilo_compactacion
+        self._hilo_compactacion = threading.Thread(target=self.compactar, daemon=True)
+        self._hilo_compactacion.start()
+        return self._hilo_compactacion
+
+    def importar_json(self, ruta_json):
+        """
+        Migra un historial antiguo (lista JSON guardada con json.dump) al formato JSONL.
+        Solo importa si el archivo JSONL todavía no existe (así un 'borrar' no vuelve a importar
+        el JSON antiguo). Retorna el número de turnos importados.
+        """
+        with self._lock:
+            if os.path.exists(self.ruta):
+                return 0
+            try:
+                with open(ruta_json, "r", encoding="utf-8") as f:
+                    turnos = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return 0
+            if not isinstance(turnos, list) or not turnos:
+                return 0
+            self.agregar_varios(turnos)
+            return len(turnos)
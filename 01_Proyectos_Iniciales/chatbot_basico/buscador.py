@@ -0,0 +1,116 @@
+# buscador.py
+# Este archivo mantiene un índice de texto completo (SQLite FTS5) sobre el historial de conversaciones.
+# El índice se actualiza con cada turno añadido, así 'buscar <texto>' devuelve resultados ordenados
+# por relevancia y por páginas en milisegundos, sin recorrer todo el historial.
+
+import re         # Para separar la consulta del usuario en palabras
+import sqlite3    # SQLite incluye FTS5, un índice invertido con ranking BM25
+import threading  # El índice puede usarse desde varios hilos
+
+# Archivo donde se guarda el índice (se puede reconstruir en cualquier momento desde el historial)
+ARCHIVO_INDICE = "conversaciones_indice.sqlite"
+
+# Resultados por página al mostrar una búsqueda
+RESULTADOS_POR_PAGINA = 10
+
+
+def _consulta_fts(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura:
+    cada palabra entre comillas (para que los signos no rompan la sintaxis) y como prefijo,
+    de modo que "pel" encuentra "película". Todas las palabras deben aparecer.
+    """
+    palabras = re.findall(r"\w+", texto.lower())
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+class IndiceConversaciones:
+    """
+    Índice de búsqueda sobre los campos 'usuario' y 'bot' del historial.
+
+    - El número de cada turno (rowid) coincide con el que muestra el comando 'ver' (empezando en 1).
+    - agregar() indexa un turno nuevo; borrar_desde() y limpiar() siguen a 'descartar' y 'borrar'.
+    - sincronizar() reconstruye el índice si no coincide con el historial (primer uso o cambios externos).
+    """
+
+    def __init__(self, ruta=ARCHIVO_INDICE):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        # check_same_thread=False: el acceso se protege con self._lock
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        # remove_diacritics 2: "cancion" encuentra "canción"
+        self._conexion.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS turnos USING fts5("
+            "usuario, bot, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self._conexion.commit()
+
+    def agregar(self, numero, turno):
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO turnos (rowid, usuario, bot) VALUES (?, ?, ?)",
+                (numero, turno.get("usuario", ""), turno.get("bot", "")),
+            )
+            self._conexion.commit()
+
+    def agregar_varios(self, primer_numero, turnos):
+        # Una sola transacción para muchos turnos (migración o reconstrucción)
+        with self._lock:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO turnos (rowid, usuario, bot) VALUES (?, ?, ?)",
+                [(primer_numero + i, t.get("usuario", ""), t.get("bot", "")) for i, t in enumerate(turnos)],
+            )
+            self._conexion.commit()
+
+    def borrar_desde(self, numero):
+        # Elimina los turnos con número >= 'numero' (por ejemplo, al descartar una sesión)
+        with self._lock:
+            self._conexion.execute("DELETE FROM turnos WHERE rowid >= ?", (numero,))
+            self._conexion.commit()
+
+    def limpiar(self):
+        with self._lock:
+            self._conexion.execute("DELETE FROM turnos")
+            self._conexion.commit()
+
+    def contar(self):
+        with self._lock:
+            return self._conexion.execute("SELECT count(*) FROM turnos").fetchone()[0]
+
+    def sincronizar(self, almacen):
+        """
+        Comprueba que el índice corresponde al historial y, si no, lo reconstruye leyendo el historial una vez.
+        Retorna True si hubo que reconstruirlo.
+        """
+        total = almacen.contar()
+        with self._lock:
+            n, maximo = self._conexion.execute("SELECT count(*), max(rowid) FROM turnos").fetchone()
+        if n == total and (maximo or 0) == total:
+            return False
+        self.limpiar()
+        self.agregar_varios(1, almacen.leer_todo())
+        return True
+
+    def buscar(self, texto, pagina=1, tamano=RESULTADOS_POR_PAGINA):
+        """
+        Busca el texto en los mensajes del usuario y del bot.
+        Retorna (total_de_resultados, [(numero, turno, puntuacion), ...]) de la página pedida,
+        ordenados por relevancia (BM25: menor puntuación = más relevante).
+        """
+        consulta = _consulta_fts(texto)
+        if not consulta:
+            return 0, []
+        with self._lock:
+            total = self._conexion.execute(
+                "SELECT count(*) FROM turnos WHERE turnos MATCH ?", (consulta,)
+            ).fetchone()[0]
+            filas = self._conexion.execute(
+                "SELECT rowid, usuario, bot, bm25(turnos) FROM turnos WHERE turnos MATCH ? "
+                "ORDER BY bm25(turnos) LIMIT ? OFFSET ?",
+                (consulta, tamano, (pagina - 1) * tamano),
+            ).fetchall()
+        return total, [(fila[0], {"usuario": fila[1], "bot": fila[2]}, fila[3]) for fila in filas]
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
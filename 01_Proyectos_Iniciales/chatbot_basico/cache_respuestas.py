@@ -0,0 +1,112 @@
+# cache_respuestas.py
+# Este archivo implementa una caché de respuestas del modelo para mensajes repetidos ("hola", "gracias"...).
+# Si un mensaje ya se respondió con el mismo modelo y los mismos ajustes de generación,
+# devolvemos la respuesta guardada y nos ahorramos la llamada a modelo.generate.
+
+import json       # Para construir la clave con los ajustes de generación
+import sqlite3    # Nivel opcional en disco que sobrevive a reinicios
+import threading  # La caché se comparte entre hilos (servidor)
+from collections import OrderedDict  # Diccionario ordenado para la política LRU
+
+# Número máximo de respuestas que se guardan en memoria
+MAXIMO_POR_DEFECTO = 1024
+
+
+def normalizar_entrada(texto):
+    """
+    Normaliza el mensaje del usuario para que variaciones triviales compartan entrada en la caché:
+    minúsculas y espacios repetidos colapsados ("  Hola   " → "hola").
+    """
+    return " ".join(texto.casefold().split())
+
+
+class CacheRespuestas:
+    """
+    Caché LRU acotada de respuestas del modelo, con un nivel opcional en disco (SQLite).
+
+    - La clave combina el mensaje normalizado, el nombre del modelo y los ajustes de generación.
+    - Se guardan las respuestas SIN filtrar: el filtro se aplica siempre al devolverlas,
+      así un cambio en la lista de palabras prohibidas afecta también a lo ya cacheado.
+    - aciertos / fallos cuentan cuántas consultas se resolvieron desde la caché.
+    """
+
+    def __init__(self, maximo=MAXIMO_POR_DEFECTO, ruta_disco=None):
+        self.maximo = maximo
+        self.aciertos = 0
+        self.fallos = 0
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._disco = None
+        if ruta_disco:
+            # check_same_thread=False: el acceso se protege con self._lock
+            self._disco = sqlite3.connect(ruta_disco, check_same_thread=False)
+            self._disco.execute(
+                "CREATE TABLE IF NOT EXISTS respuestas (clave TEXT PRIMARY KEY, respuesta TEXT NOT NULL)"
+            )
+            self._disco.commit()
+
+    @staticmethod
+    def clave(entrada, modelo="", ajustes=None):
+        # Los ajustes se serializan ordenados para que el mismo dict produzca siempre la misma clave
+        return json.dumps([normalizar_entrada(entrada), modelo, ajustes or {}], sort_keys=True, ensure_ascii=False)
+
+    def obtener(self, clave):
+        """
+        Devuelve la respuesta guardada para la clave, o None si no está.
+        Primero se busca en memoria y después en disco (subiéndola a memoria si se encuentra).
+        """
+        with self._lock:
+            respuesta = self._memoria.get(clave)
+            if respuesta is not None:
+                self._memoria.move_to_end(clave)  # Marcamos la entrada como usada recientemente
+            elif self._disco is not None:
+                fila = self._disco.execute("SELECT respuesta FROM respuestas WHERE clave = ?", (clave,)).fetchone()
+                if fila is not None:
+                    respuesta = fila[0]
+                    self._guardar_en_memoria(clave, respuesta)
+            if respuesta is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+            return respuesta
+
+    def guardar(self, clave, respuesta):
+        # Guarda la respuesta en memoria y, si está activado, también en disco
+        with self._lock:
+            self._guardar_en_memoria(clave, respuesta)
+            if self._disco is not None:
+                self._disco.execute(
+                    "INSERT OR REPLACE INTO respuestas (clave, respuesta) VALUES (?, ?)", (clave, respuesta)
+                )
+                self._disco.commit()
+
+    def _guardar_en_memoria(self, clave, respuesta):
+        self._memoria[clave] = respuesta
+        self._memoria.move_to_end(clave)
+        # Si superamos el máximo, expulsamos la entrada usada hace más tiempo
+        while len(self._memoria) > self.maximo:
+            self._memoria.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._memoria.clear()
+            if self._disco is not None:
+                self._disco.execute("DELETE FROM respuestas")
+                self._disco.commit()
+
+    def estadisticas(self):
+        # Resumen de uso de la caché
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "en_memoria": len(self._memoria),
+            "maximo": self.maximo,
+            "disco": self._disco is not None,
+        }
+
+    def cerrar(self):
+        if self._disco is not None:
+            self._disco.close()
+            self._disco = None
@@ -1,54 +1,205 @@
 # chatbot.py
-# Este archivo maneja el chatbot usando Transformers y la gestión de conversaciones en JSON.
+# Este archivo maneja el chatbot usando Transformers y la gestión de conversaciones en JSONL.
 
-import json  # Librería para manejar archivos JSON (guardar y cargar conversaciones)
-from transformers import BlenderbotTokenizer, BlenderbotForConditionalGeneration
-# Importamos el tokenizer y el modelo BlenderBot de Hugging Face Transformers
+import threading  # Evento para cortar la generación en streaming
+from almacen import AlmacenConversaciones, ARCHIVO_HISTORIAL
+# Historial de conversaciones en JSONL de solo-añadir (ver almacen.py)
+from buscador import IndiceConversaciones, ARCHIVO_INDICE, RESULTADOS_POR_PAGINA
+# Índice de búsqueda de texto completo sobre el historial (ver buscador.py)
+from cache_respuestas import CacheRespuestas
+# Caché de respuestas para mensajes repetidos (ver cache_respuestas.py)
+from contexto import ContextoConversacion
+# Memoria de la conversación con presupuesto de tokens (ver contexto.py)
+from instrumentacion import Instrumentacion, TURNO_NULO
+# Medición de tiempos por etapa y tokens/s de cada turno (ver instrumentacion.py)
+from moderacion import Moderador, RevisorIncremental
+# Motor de moderación compilado una sola vez (ver moderacion.py)
+from modelo_chat import cargador, MODELO_NOMBRE
+# El modelo BlenderBot (preentrenado, seguro y coherente) ya no se carga al importar este archivo:
+# 'cargador' lo carga la primera vez que hace falta, o en segundo plano con precargar()
 
-# Cargar el modelo BlenderBot (preentrenado, seguro y coherente)
-modelo_nombre = "facebook/blenderbot-400M-distill"  # Nombre del modelo preentrenado de Hugging Face
-tokenizer = BlenderbotTokenizer.from_pretrained(modelo_nombre)  
-# Tokenizer: convierte texto en tensores que el modelo puede entender
-modelo = BlenderbotForConditionalGeneration.from_pretrained(modelo_nombre)
-# Modelo: BlenderBot listo para generar respuestas
+modelo_nombre = MODELO_NOMBRE  # Nombre del modelo preentrenado de Hugging Face
 
-# Archivo donde guardaremos las conversaciones
+
+def __getattr__(nombre):
+    # Compatibilidad: 'chatbot.tokenizer' y 'chatbot.modelo' siguen existiendo,
+    # pero solo cargan el modelo cuando alguien accede a ellos
+    if nombre == "tokenizer":
+        return cargador.tokenizer
+    if nombre == "modelo":
+        return cargador.modelo
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+# Archivo JSON antiguo: se importa una sola vez al historial JSONL (migración)
 ARCHIVO_CONVERSACIONES = "conversaciones.json"
 
-# Función para cargar conversaciones anteriores desde un archivo JSON
+# Historial de solo-añadir: cada turno se escribe al final de 'conversaciones.jsonl' en cuanto ocurre
+almacen = AlmacenConversaciones(ARCHIVO_HISTORIAL)
+
+# Función para abrir el historial, migrando el JSON antiguo si todavía no se ha hecho
+def abrir_historial():
+    if almacen.indice is None:
+        # Abrimos el índice de búsqueda para que cada turno nuevo se indexe al añadirse
+        almacen.indice = IndiceConversaciones(ARCHIVO_INDICE)
+    importados = almacen.importar_json(ARCHIVO_CONVERSACIONES)
+    if importados:
+        print(f"Importadas {importados} conversaciones de {ARCHIVO_CONVERSACIONES}.")
+    return almacen
+
+# Función para cargar conversaciones anteriores (lista completa, solo para quien la necesite entera)
 def cargar_conversaciones():
-    try:
-        # Intentamos abrir el archivo y cargar la lista de conversaciones
-        with open(ARCHIVO_CONVERSACIONES, "r", encoding="utf-8") as f:
-            return json.load(f)  # Devolver la lista de conversaciones
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Si el archivo no existe o está vacío/corrupto, devolvemos una lista vacía
-        return []
-
-# Función para guardar conversaciones en JSON
+    return abrir_historial().leer_todo()
+
+# Función para guardar una lista completa de conversaciones (reescribe todo el historial)
 def guardar_conversaciones(conversaciones):
-    # Abre el archivo en modo escritura y guarda la lista de conversaciones
-    with open(ARCHIVO_CONVERSACIONES, "w", encoding="utf-8") as f:
-        json.dump(conversaciones, f, ensure_ascii=False, indent=4)
-        # ensure_ascii=False mantiene acentos y caracteres especiales
-        # indent=4 formatea el JSON de forma legible
+    # El chat ya no la usa en cada guardado: los turnos se añaden uno a uno con almacen.agregar()
+    abrir_historial().reemplazar(conversaciones)
+
+# Función para mostrar una página del historial (por defecto la última, la más reciente)
+def mostrar_historial(pagina=None):
+    total_paginas = almacen.paginas()
+    if pagina is None:
+        pagina = total_paginas
+    pagina = min(max(1, pagina), total_paginas)
+    primero, turnos = almacen.leer_pagina(pagina)
+    if not turnos:
+        print("No hay historial previo.\n")
+        return
+    print(f"\nHistorial de conversaciones (página {pagina} de {total_paginas}):")
+    for i, c in enumerate(turnos, primero):
+        print(f"{i}. Tú: {c['usuario']} → Bot: {c['bot']}")
+    print("")  # Línea en blanco para separar
+
+# Función para buscar texto en el historial y mostrar una página de resultados ordenados por relevancia
+def buscar_en_historial(texto, pagina=1):
+    indice = abrir_historial().indice
+    indice.sincronizar(almacen)  # Solo reconstruye el índice si no coincide con el historial
+    total, resultados = indice.buscar(texto, pagina)
+    if not resultados:
+        print("No se encontraron resultados.\n" if pagina == 1 else "No hay más resultados.\n")
+        return False
+    paginas = -(-total // RESULTADOS_POR_PAGINA)
+    print(f"\n{total} resultados para '{texto}' (página {pagina} de {paginas}):")
+    for numero, c, _ in resultados:
+        print(f"{numero}. Tú: {c['usuario']} → Bot: {c['bot']}")
+    print("")  # Línea en blanco para separar
+    return True
+
+# Caché de respuestas del modelo (None = desactivada)
+cache = CacheRespuestas()
+
+# Función para activar/desactivar la caché y, opcionalmente, guardar también en disco
+def configurar_cache(activa=True, maximo=1024, ruta_disco=None):
+    global cache
+    if cache is not None:
+        cache.cerrar()
+    cache = CacheRespuestas(maximo=maximo, ruta_disco=ruta_disco) if activa else None
+    return cache
+
+# Función para buscar en la caché la respuesta (sin filtrar) a un mensaje; None si no está
+def respuesta_cacheada(entrada, usar_cache=True):
+    if cache is None or not usar_cache:
+        return None
+    return cache.obtener(cache.clave(entrada, cargador.identificador, cargador.opciones_generacion))
+
+# Función para guardar en la caché la respuesta (sin filtrar) del modelo a un mensaje
+def guardar_en_cache(entrada, respuesta, usar_cache=True):
+    if cache is not None and usar_cache:
+        cache.guardar(cache.clave(entrada, cargador.identificador, cargador.opciones_generacion), respuesta)
+
+# Función que responde a un mensaje usando la caché si es posible y filtrando siempre el resultado
+def generar_respuesta(entrada, usar_cache=True, entrada_modelo=None, turno=TURNO_NULO):
+    """
+    'entrada_modelo' permite generar a partir de otra entrada (por ejemplo, los IDs del contexto);
+    la caché sigue usando 'entrada' como clave.
+    Retorna (respuesta_filtrada, ids_respuesta); ids_respuesta es None si la respuesta salió de la caché.
+    """
+    with turno.etapa("cache"):
+        respuesta = respuesta_cacheada(entrada, usar_cache)
+    ids_respuesta = None
+    if respuesta is None:
+        # Tokenizar la entrada y generar respuesta usando BlenderBot
+        respuesta, ids_respuesta = cargador.generar_ids(entrada if entrada_modelo is None else entrada_modelo, turno)
+        guardar_en_cache(entrada, respuesta, usar_cache)
+    # Filtrar respuestas inapropiadas
+    with turno.etapa("filtrado"):
+        return filtrar_respuesta(respuesta), ids_respuesta
+
+# Respuesta segura que sustituye a cualquier respuesta con palabras prohibidas
+RESPUESTA_SEGURA = "Lo siento, no puedo responder eso."
+
+# Moderador con las palabras prohibidas de 'palabras_prohibidas.txt', compilado al arrancar
+moderador = Moderador.desde_archivo()
+
+# Medición de cada turno del chat (comando 'stats' y traza JSONL opcional)
+instrumentacion = Instrumentacion()
+
+# Función para activar la traza JSONL de turnos (un turno por línea con sus tiempos y tokens)
+def configurar_instrumentacion(ruta_traza=None):
+    global instrumentacion
+    instrumentacion.cerrar()
+    instrumentacion = Instrumentacion(ruta_traza=ruta_traza)
+    return instrumentacion
 
 # Función para filtrar respuestas inapropiadas
 def filtrar_respuesta(texto):
-    palabras_prohibidas = ["f***", "n***", "ur mum"]  # Lista de palabras que no queremos en las respuestas
-    for palabra in palabras_prohibidas:
-        if palabra.lower() in texto.lower():  # Comprobamos ignorando mayúsculas/minúsculas
-            return "Lo siento, no puedo responder eso."  # Respuesta segura si hay palabra prohibida
+    # Una sola pasada sobre el texto, sin importar cuántas palabras prohibidas haya
+    if moderador.revisar(texto) is not None:
+        return RESPUESTA_SEGURA  # Respuesta segura si hay palabra prohibida
     return texto  # Si no hay palabras prohibidas, devolvemos la respuesta tal cual
 
+# Función que responde en streaming: llama a emitir(fragmento) con cada trozo de texto ya moderado
+def responder_en_streaming(entrada, emitir, usar_cache=True, entrada_modelo=None, turno=TURNO_NULO):
+    """
+    'entrada_modelo' permite generar a partir de otra entrada (por ejemplo, los IDs del contexto);
+    la caché sigue usando 'entrada' como clave.
+    Retorna (respuesta_final, cortada). Si se detecta un término prohibido a mitad de la
+    generación, se corta el modelo y la respuesta final es la respuesta segura.
+    """
+    with turno.etapa("cache"):
+        respuesta = respuesta_cacheada(entrada, usar_cache)
+    if respuesta is not None:
+        # Respuesta ya conocida: se entrega de una vez, filtrada como siempre
+        respuesta = filtrar_respuesta(respuesta)
+        emitir(respuesta)
+        return respuesta, respuesta == RESPUESTA_SEGURA
+
+    revisor = RevisorIncremental(moderador)
+    detener = threading.Event()
+    modelo_entrada = entrada if entrada_modelo is None else entrada_modelo
+    for fragmento in cargador.generar_streaming(modelo_entrada, detener=detener, turno=turno):
+        seguro, coincidencia = revisor.agregar(fragmento)
+        if coincidencia is not None:
+            detener.set()  # Cortamos la generación: no hace falta seguir gastando CPU
+            return RESPUESTA_SEGURA, True
+        if seguro:
+            emitir(seguro)
+    seguro, coincidencia = revisor.terminar()
+    if coincidencia is not None:
+        return RESPUESTA_SEGURA, True
+    if seguro:
+        emitir(seguro)
+    guardar_en_cache(entrada, revisor.texto, usar_cache)  # Solo cacheamos respuestas completas
+    return revisor.texto, False
+
 # Función principal del chat
-def iniciar_chat():
-    conversaciones = cargar_conversaciones()  # Cargamos historial previo al iniciar el chat
+def iniciar_chat(streaming=False, presupuesto_contexto=0):
+    cargador.precargar()  # Empezamos a cargar el modelo en segundo plano mientras el usuario escribe
+    historial = abrir_historial()  # Abrimos el historial previo (se lee solo cuando hace falta)
+    historial.iniciar_sesion()  # Recordamos dónde empieza esta sesión por si se descarta
+    historial.compactar_en_segundo_plano()  # Limpiamos restos de 'borrar' anteriores sin bloquear el chat
+    carga_informada = False  # Para informar del tiempo de carga del modelo una sola vez
+    # Memoria de la conversación (solo si presupuesto_contexto > 0); se crea al cargar el tokenizer
+    contexto = None
+    busqueda = None  # Última búsqueda (texto, página) para el comando 'mas'
 
     # Mensajes de ayuda al usuario
     print("Escribe 'salir' para terminar la conversación.")
     print("Escribe 'borrar' para eliminar el historial anterior.")
-    print("Escribe 'ver' para ver el historial anterior.\n")
+    print("Escribe 'ver' para ver el historial anterior ('ver 2' muestra la página 2).")
+    print("Escribe 'buscar <texto>' para buscar en el historial ('mas' muestra más resultados).")
+    print("Escribe 'cache' para ver el uso de la caché de respuestas.")
+    print("Escribe 'stats' para ver los tiempos por etapa (p50/p95/p99) y tokens/s.\n")
 
     while True:
         entrada = input("Tú: ").strip()  # Leemos entrada del usuario y eliminamos espacios extra
@@ -57,43 +208,106 @@ def iniciar_chat():
         if entrada.lower() == "salir":
             opcion_guardar = input("¿Quieres guardar esta conversación? (s/n): ").strip().lower()
             if opcion_guardar == "s":
-                guardar_conversaciones(conversaciones)  # Guardamos la conversación
+                # Los turnos ya se fueron añadiendo al historial: no hay que reescribir nada
                 print("Conversación guardada.")
             else:
+                historial.descartar_sesion()  # Quitamos del historial los turnos de esta sesión
                 print("Conversación descartada.")  # No se guarda la conversación
             break  # Salimos del bucle y terminamos el chat
 
         # Opción de borrar historial anterior
         if entrada.lower() == "borrar":
-            conversaciones = []  # Reiniciamos la lista de conversaciones
-            guardar_conversaciones(conversaciones)  # Sobrescribimos el archivo JSON
+            historial.borrar()  # Añadimos una marca de borrado; el archivo se compacta en segundo plano
+            if contexto is not None:
+                contexto.limpiar()  # El bot también olvida los turnos anteriores
             print("Historial eliminado.")
             continue  # Volvemos al inicio del bucle
 
         # Opción de ver historial anterior
-        if entrada.lower() == "ver":
-            if conversaciones:
-                print("\nHistorial de conversaciones:")
-                for i, c in enumerate(conversaciones, 1):
-                    print(f"{i}. Tú: {c['usuario']} → Bot: {c['bot']}")
-                print("")  # Línea en blanco para separar
+        partes = entrada.lower().split()
+        if partes and partes[0] == "ver" and (len(partes) == 1 or (len(partes) == 2 and partes[1].isdigit())):
+            # Solo leemos del archivo los turnos de la página pedida
+            mostrar_historial(int(partes[1]) if len(partes) == 2 else None)
+            continue  # Volvemos al inicio del bucle
+
+        # Opción de buscar en el historial (y 'mas' para la siguiente página de la última búsqueda)
+        if partes and partes[0] == "buscar" and len(partes) > 1:
+            busqueda = (entrada.split(None, 1)[1], 1)
+            buscar_en_historial(*busqueda)
+            continue  # Volvemos al inicio del bucle
+        if entrada.lower() in ("mas", "más") and busqueda is not None:
+            # Solo avanzamos de página si la siguiente tiene resultados: tras la última, 'mas'
+            # sigue en ella (y un nuevo resultado añadido al historial aparece en la siguiente)
+            if buscar_en_historial(busqueda[0], busqueda[1] + 1):
+                busqueda = (busqueda[0], busqueda[1] + 1)
+            continue  # Volvemos al inicio del bucle
+
+        # Opción de ver el uso de la caché de respuestas
+        if entrada.lower() == "cache":
+            if cache is None:
+                print("La caché de respuestas está desactivada.\n")
             else:
-                print("No hay historial previo.\n")
+                e = cache.estadisticas()
+                print(f"Caché: {e['aciertos']} aciertos, {e['fallos']} fallos "
+                      f"({e['tasa_aciertos']:.0%}), {e['en_memoria']}/{e['maximo']} en memoria\n")
             continue  # Volvemos al inicio del bucle
 
-        # Tokenizar la entrada y generar respuesta usando BlenderBot
-        entradas_ids = tokenizer(entrada, return_tensors="pt")
-        # Convertimos la entrada del usuario a tensores PyTorch (formato que el modelo entiende)
-        salida_ids = modelo.generate(**entradas_ids)
-        # Generamos la respuesta del modelo
-        respuesta = tokenizer.decode(salida_ids[0], skip_special_tokens=True)
-        # Convertimos los IDs de salida de nuevo a texto, eliminando tokens especiales
-
-        # Filtrar respuestas inapropiadas
-        respuesta = filtrar_respuesta(respuesta)
+        # Opción de ver las medidas de rendimiento de los turnos
+        if entrada.lower() == "stats":
+            print(instrumentacion.resumen() + "\n")
+            continue  # Volvemos al inicio del bucle
+
+        turno = instrumentacion.nuevo_turno()  # Medimos cada etapa de este turno
+
+        # Con memoria de conversación la respuesta depende de los turnos anteriores: en ese caso
+        # no se usa la caché y la entrada del modelo es el contexto ya tokenizado
+        usar_cache = not presupuesto_contexto
 
-        print(f"Bot: {respuesta}")  # Mostramos la respuesta al usuario
+        # Si el modelo aún se está cargando, avisamos: la generación espera a que termine
+        # (si el mensaje está en la caché se responde sin esperar al modelo)
+        if not cargador.cargado:
+            print("Cargando el modelo, un momento...")
 
-        # Guardar en la conversación actual
-        conversaciones.append({"usuario": entrada, "bot": respuesta})
+        entrada_modelo = entrada
+        if presupuesto_contexto:
+            if contexto is None:
+                contexto = ContextoConversacion(cargador.tokenizer, presupuesto_contexto)
+            with turno.etapa("tokenizacion"):
+                contexto.agregar_usuario(entrada)  # Solo se tokeniza el mensaje nuevo
+            entrada_modelo = contexto.ids_entrada()
+
+        ids_respuesta = None
+        if streaming:
+            # Modo streaming: mostramos el texto a medida que se genera
+            print("Bot: ", end="", flush=True)
+            respuesta, cortada = responder_en_streaming(
+                entrada, lambda f: print(f, end="", flush=True), usar_cache, entrada_modelo, turno
+            )
+            if cortada:
+                print(f" [...]\nBot: {respuesta}")  # Avisamos de que la respuesta se ha cortado
+            else:
+                print("")
+                if contexto is not None:
+                    contexto.agregar_bot(texto=respuesta)
+        else:
+            # Caché (si el mensaje ya se respondió antes), generación y filtrado
+            respuesta, ids_respuesta = generar_respuesta(entrada, usar_cache, entrada_modelo, turno)
+            print(f"Bot: {respuesta}")  # Mostramos la respuesta al usuario
+
+        # La primera vez que se usa el modelo ya cargado informamos de cuánto tardó en cargarse
+        if not carga_informada and cargador.cargado:
+            print(f"(Modelo cargado en {cargador.tiempo_carga:.1f} s)")
+            carga_informada = True
+
+        if not streaming:
+            # La respuesta entra en el contexto con los IDs que ya generó el modelo (sin re-tokenizar),
+            # salvo que se haya filtrado: no queremos que el modelo continúe una respuesta prohibida
+            if contexto is not None and ids_respuesta is not None and respuesta != RESPUESTA_SEGURA:
+                contexto.agregar_bot(ids=ids_respuesta)
+
+        # Guardar en el historial en cuanto ocurre (una línea añadida al final del archivo)
+        with turno.etapa("persistencia"):
+            historial.agregar({"usuario": entrada, "bot": respuesta})
         # Cada interacción se guarda como un diccionario con 'usuario' y 'bot'
+
+        instrumentacion.registrar(turno)  # Guardamos las medidas del turno (y la traza, si está activa)
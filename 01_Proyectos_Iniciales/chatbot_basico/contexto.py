@@ -0,0 +1,72 @@
+# contexto.py
+# Este archivo gestiona la memoria de la conversación (contexto multi-turno) del chatbot.
+# Cada turno se tokeniza UNA sola vez y se guarda ya convertido en IDs; en cada nuevo turno
+# solo se tokeniza el texto nuevo, y los turnos más antiguos se descartan para no superar
+# el presupuesto de tokens (así el coste de generate queda acotado).
+
+from collections import deque  # Cola eficiente para descartar los turnos más antiguos
+
+# Límite de seguridad si el tokenizer no declara una longitud máxima razonable
+LONGITUD_MAXIMA_POR_DEFECTO = 128
+
+
+class ContextoConversacion:
+    """
+    Historial de turnos tokenizados con un presupuesto máximo de tokens.
+
+    - agregar_usuario(texto): tokeniza solo el mensaje nuevo y lo añade.
+    - agregar_bot(ids=..., texto=...): añade la respuesta del bot reutilizando los IDs que
+      generó el modelo (sin volver a tokenizar) o, si solo hay texto, tokenizándolo una vez.
+    - ids_entrada(): IDs de entrada para el modelo, con los turnos que caben en el presupuesto.
+    """
+
+    def __init__(self, tokenizer, presupuesto=None):
+        self.tokenizer = tokenizer
+        maximo = getattr(tokenizer, "model_max_length", LONGITUD_MAXIMA_POR_DEFECTO)
+        if not maximo or maximo > 100_000:  # Algunos tokenizers declaran un valor "infinito"
+            maximo = LONGITUD_MAXIMA_POR_DEFECTO
+        # Reservamos una posición para el token de fin que se añade al final de la entrada
+        self.presupuesto = min(presupuesto or maximo, maximo) - 1
+        self.turnos = deque()
+        self.total = 0  # Tokens acumulados en self.turnos (se actualiza sin recorrer la cola)
+        self._especiales = set(tokenizer.all_special_ids)
+
+    def __len__(self):
+        return len(self.turnos)
+
+    def limpiar(self):
+        self.turnos.clear()
+        self.total = 0
+
+    def _agregar(self, ids):
+        self.turnos.append(ids)
+        self.total += len(ids)
+        self._recortar()
+
+    def _recortar(self):
+        # Descartamos turnos completos, empezando por el más antiguo, hasta caber en el presupuesto
+        while self.total > self.presupuesto and len(self.turnos) > 1:
+            self.total -= len(self.turnos.popleft())
+        # Si el único turno que queda ya es demasiado largo, nos quedamos con su final
+        if self.total > self.presupuesto:
+            ultimo = self.turnos.pop()[-self.presupuesto:]
+            self.turnos.append(ultimo)
+            self.total = len(ultimo)
+
+    def agregar_usuario(self, texto):
+        # BlenderBot separa los turnos con espacios: los mensajes del usuario empiezan por " "
+        self._agregar(self.tokenizer.encode(" " + texto, add_special_tokens=False))
+
+    def agregar_bot(self, ids=None, texto=None):
+        if ids is not None:
+            # Reutilizamos los IDs generados por el modelo quitando los tokens especiales (inicio, fin, relleno)
+            self._agregar([int(i) for i in ids if int(i) not in self._especiales])
+        elif texto is not None:
+            self._agregar(self.tokenizer.encode(texto, add_special_tokens=False))
+
+    def ids_entrada(self):
+        # Concatenamos los turnos (como máximo 'presupuesto' tokens) y cerramos con el token de fin
+        ids = [i for turno in self.turnos for i in turno]
+        if self.tokenizer.eos_token_id is not None:
+            ids.append(self.tokenizer.eos_token_id)
+        return ids
@@ -0,0 +1,158 @@
+# instrumentacion.py
+# Este archivo mide dónde se va el tiempo en cada turno del chat: tokenización, generate,
+# decodificación, filtrado y guardado en el historial. También cuenta los tokens de entrada
+# y salida para calcular tokens/s, y puede escribir una traza JSONL con un turno por línea.
+
+import json       # Para la traza JSONL
+import math       # Redondeo hacia arriba del rango del percentil
+import threading  # La instrumentación puede compartirse entre hilos (servidor)
+import time       # Reloj de alta resolución para medir cada etapa
+from collections import deque
+from contextlib import contextmanager
+
+# Número máximo de turnos que se conservan en memoria para calcular percentiles
+TURNOS_MAXIMOS = 10_000
+
+# Orden en el que se muestran las etapas en el comando 'stats'
+ETAPAS = ("cache", "tokenizacion", "generacion", "decodificacion", "filtrado", "persistencia")
+
+
+class Turno:
+    """
+    Medidas de un único turno: segundos por etapa y tokens de entrada/salida.
+    Se usa como: with turno.etapa("generacion"): ...
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = {}
+        self.tokens_entrada = 0
+        self.tokens_salida = 0
+        self.total = None
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Si una etapa se repite en el mismo turno, acumulamos su tiempo
+            self.etapas[nombre] = self.etapas.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    @property
+    def tokens_por_segundo(self):
+        generacion = self.etapas.get("generacion")
+        return self.tokens_salida / generacion if generacion else None
+
+    def como_dict(self):
+        return {
+            "total_s": self.total,
+            "etapas_s": self.etapas,
+            "tokens_entrada": self.tokens_entrada,
+            "tokens_salida": self.tokens_salida,
+            "tokens_por_segundo": self.tokens_por_segundo,
+        }
+
+
+class _TurnoNulo:
+    # Turno que no mide nada: se usa cuando no hay instrumentación activa (coste prácticamente nulo)
+    tokens_entrada = 0
+    tokens_salida = 0
+
+    @contextmanager
+    def etapa(self, nombre):
+        yield
+
+    def __setattr__(self, nombre, valor):
+        pass  # Ignoramos los contadores de tokens
+
+
+TURNO_NULO = _TurnoNulo()
+
+
+def percentil(valores, p):
+    """
+    Percentil por el método del rango más cercano (rango = ceil(p/100 · n)) sobre una lista ya ordenada.
+    Retorna None si la lista está vacía.
+
+    Comprobación (python -m doctest instrumentacion.py):
+    >>> percentil([1, 2], 50)
+    1
+    >>> percentil(list(range(10)), 50)
+    4
+    >>> percentil(list(range(20)), 95)
+    18
+    >>> percentil(list(range(100)), 7), percentil(list(range(100)), 100), percentil([7], 0)
+    (6, 99, 7)
+    """
+    if not valores:
+        return None
+    # p · n se multiplica antes de dividir: p / 100 · n arrastra errores de coma flotante (7 / 100 · 100 = 7.000…01)
+    indice = max(0, min(len(valores) - 1, math.ceil(p * len(valores) / 100) - 1))
+    return valores[indice]
+
+
+class Instrumentacion:
+    """
+    Registro de turnos medidos, con percentiles p50/p95/p99 por etapa y traza JSONL opcional.
+    """
+
+    def __init__(self, ruta_traza=None, maximo=TURNOS_MAXIMOS):
+        self.turnos = deque(maxlen=maximo)  # Solo los últimos 'maximo' turnos (memoria acotada)
+        self.ruta_traza = ruta_traza
+        self._traza = open(ruta_traza, "a", encoding="utf-8") if ruta_traza else None
+        self._lock = threading.Lock()
+
+    def nuevo_turno(self):
+        return Turno()
+
+    def registrar(self, turno):
+        # Cierra el turno (tiempo total) y lo añade al registro y, si procede, a la traza
+        turno.total = time.perf_counter() - turno.inicio
+        with self._lock:
+            self.turnos.append(turno)
+            if self._traza is not None:
+                datos = dict(turno.como_dict(), marca_tiempo=time.time())
+                self._traza.write(json.dumps(datos) + "\n")
+                self._traza.flush()
+
+    def percentiles(self):
+        """
+        Devuelve {métrica: {"n", "p50", "p95", "p99"}} para el total, cada etapa y tokens/s.
+        """
+        with self._lock:
+            turnos = list(self.turnos)
+        series = {"total": [t.total for t in turnos]}
+        for nombre in ETAPAS:
+            series[nombre] = [t.etapas[nombre] for t in turnos if nombre in t.etapas]
+        series["tokens_por_segundo"] = [t.tokens_por_segundo for t in turnos if t.tokens_por_segundo]
+        resultado = {}
+        for nombre, valores in series.items():
+            if valores:
+                valores.sort()
+                resultado[nombre] = {
+                    "n": len(valores),
+                    "p50": percentil(valores, 50),
+                    "p95": percentil(valores, 95),
+                    "p99": percentil(valores, 99),
+                }
+        return resultado
+
+    def resumen(self):
+        # Tabla de texto para el comando 'stats'
+        datos = self.percentiles()
+        if not datos:
+            return "Todavía no hay turnos medidos."
+        lineas = [f"{'métrica':<20} {'n':>6} {'p50':>10} {'p95':>10} {'p99':>10}"]
+        for nombre, p in datos.items():
+            if nombre == "tokens_por_segundo":
+                lineas.append(f"{'tokens/s':<20} {p['n']:>6} {p['p50']:>10.1f} {p['p95']:>10.1f} {p['p99']:>10.1f}")
+            else:
+                lineas.append(f"{nombre + ' (ms)':<20} {p['n']:>6} {p['p50'] * 1000:>10.1f} "
+                              f"{p['p95'] * 1000:>10.1f} {p['p99'] * 1000:>10.1f}")
+        return "\n".join(lineas)
+
+    def cerrar(self):
+        if self._traza is not None:
+            self._traza.close()
+            self._traza = None
@@ -1,14 +1,73 @@
 # main.py
 # Este archivo es el punto de entrada del chatbot.
-# Importa la función principal iniciar_chat desde chatbot.py y la ejecuta.
+# Por defecto ejecuta el chat por consola (iniciar_chat de chatbot.py).
+# Con --servidor arranca un servidor HTTP local que atiende muchas sesiones a la vez (servidor.py).
 
-from chatbot import iniciar_chat  
+import argparse
+
+from chatbot import iniciar_chat, configurar_cache, configurar_instrumentacion
+from modelo_chat import cargador, BACKENDS, MODELOS
 # Importamos la función iniciar_chat definida en chatbot.py
 # Esta función maneja todo el flujo del chat: entrada del usuario, generación de respuestas,
 # historial de conversaciones, opciones de ver/borrar/conservar historial, etc.
 
+
+def main():
+    # Argumentos para elegir entre el chat por consola y el modo servidor
+    parser = argparse.ArgumentParser(description="Chatbot con BlenderBot")
+    parser.add_argument("--servidor", action="store_true", help="Arranca el servidor HTTP con generación por lotes")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Dirección en la que escucha el servidor")
+    parser.add_argument("--puerto", type=int, default=8000, help="Puerto en el que escucha el servidor")
+    parser.add_argument("--socket", type=str, default=None, help="Ruta de un socket Unix (sustituye a host/puerto)")
+    parser.add_argument("--lote_maximo", type=int, default=8, help="Mensajes máximos por lote de generación")
+    parser.add_argument("--espera_ms", type=float, default=20, help="Espera máxima para completar un lote (ms)")
+    parser.add_argument("--modelo", type=str, default="400M-distill",
+                        help=f"Variante del modelo: {', '.join(MODELOS)} o un nombre de Hugging Face")
+    parser.add_argument("--sin_conexion", action="store_true",
+                        help="Carga el modelo solo desde la caché local de Hugging Face")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager",
+                        help="Modo de inferencia en CPU: eager (float32), int8 (cuantizado) o compilado")
+    parser.add_argument("--streaming", action="store_true", help="Muestra la respuesta a medida que se genera")
+    parser.add_argument("--contexto", type=int, default=0,
+                        help="Presupuesto de tokens de memoria de la conversación (0 = sin memoria, máx. 128)")
+    parser.add_argument("--traza", type=str, default=None,
+                        help="Archivo JSONL donde guardar los tiempos y tokens de cada turno")
+    parser.add_argument("--sin_cache", action="store_true", help="Desactiva la caché de respuestas")
+    parser.add_argument("--cache_maximo", type=int, default=1024, help="Respuestas máximas en la caché en memoria")
+    parser.add_argument("--cache_disco", type=str, default=None,
+                        help="Archivo SQLite para conservar la caché entre reinicios (p. ej. cache_respuestas.sqlite)")
+    args = parser.parse_args()
+
+    # Variante y modo de inferencia del modelo (se aplican cuando el modelo se carga)
+    cargador.configurar(modelo=args.modelo, backend=args.backend, solo_local=args.sin_conexion)
+
+    # Medición de cada turno (comando 'stats') y traza opcional
+    configurar_instrumentacion(ruta_traza=args.traza)
+
+    # Caché de respuestas compartida por el chat y el servidor
+    configurar_cache(activa=not args.sin_cache, maximo=args.cache_maximo, ruta_disco=args.cache_disco)
+
+    if args.servidor:
+        # Importamos el servidor solo si se usa, así el chat por consola no paga asyncio
+        import asyncio
+        from servidor import ejecutar_servidor
+
+        try:
+            asyncio.run(ejecutar_servidor(
+                host=args.host,
+                puerto=args.puerto,
+                socket_unix=args.socket,
+                lote_maximo=args.lote_maximo,
+                espera_maxima_ms=args.espera_ms,
+            ))
+        except KeyboardInterrupt:
+            print("Servidor detenido.")
+    else:
+        iniciar_chat(streaming=args.streaming, presupuesto_contexto=args.contexto)
+        # Llamamos a la función iniciar_chat para iniciar la interacción con el usuario
+
+
 # Este bloque asegura que el script se ejecute solo si se llama directamente,
 # y no si se importa como módulo en otro script.
 if __name__ == "__main__":
-    iniciar_chat()  
-    # Llamamos a la función iniciar_chat para iniciar la interacción con el usuario
+    main()
@@ -0,0 +1,292 @@
+# modelo_chat.py
+# Este archivo gestiona la carga del modelo BlenderBot de forma perezosa (lazy).
+# El modelo solo se carga la primera vez que se necesita para generar una respuesta,
+# o en segundo plano mediante precargar(), de modo que el chat arranca al instante.
+
+import threading  # Para precargar el modelo en un hilo en segundo plano
+import time       # Para medir el tiempo de carga del modelo
+
+from instrumentacion import TURNO_NULO  # Medición opcional de cada etapa del turno
+
+# Variantes de BlenderBot disponibles (alias corto → nombre en Hugging Face), de menor a mayor
+MODELOS = {
+    "90M": "facebook/blenderbot_small-90M",
+    "400M-distill": "facebook/blenderbot-400M-distill",
+    "1B-distill": "facebook/blenderbot-1B-distill",
+    "3B": "facebook/blenderbot-3B",
+}
+
+# Nombre del modelo preentrenado de Hugging Face que se usa por defecto
+MODELO_NOMBRE = MODELOS["400M-distill"]
+
+# Modos de inferencia en CPU disponibles:
+# - "eager": el modelo tal cual, en float32 (comportamiento original)
+# - "int8": capas lineales cuantizadas dinámicamente a int8 (menos memoria y más rápido en CPU)
+# - "compilado": forward compilado con torch.compile (grafo optimizado tras la primera llamada)
+BACKENDS = ("eager", "int8", "compilado")
+
+
+def aplicar_backend(modelo, backend):
+    """
+    Aplica el modo de inferencia indicado a un modelo ya cargado y lo devuelve.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido '{backend}'. Opciones: {', '.join(BACKENDS)}")
+    import torch
+
+    modelo.eval()  # Desactiva dropout: solo vamos a hacer inferencia
+    if backend == "int8":
+        # Cuantización dinámica: los pesos de nn.Linear se guardan en int8 y las activaciones
+        # se cuantizan al vuelo; la mayor parte del cómputo de BlenderBot está en estas capas
+        modelo = torch.quantization.quantize_dynamic(modelo, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend == "compilado":
+        # dynamic=True evita recompilar en cada paso de generación (la longitud cambia en cada token)
+        modelo.forward = torch.compile(modelo.forward, dynamic=True)
+    return modelo
+
+
+def resolver_modelo(modelo):
+    # Acepta un alias del registro ("90M", "1B-distill"...) o directamente un nombre de Hugging Face
+    return MODELOS.get(modelo, modelo)
+
+
+class CargadorModelo:
+    """
+    Contenedor del tokenizer y del modelo BlenderBot con carga perezosa.
+
+    - La carga se hace una sola vez, aunque la pidan varios hilos a la vez.
+    - precargar() lanza la carga en un hilo en segundo plano.
+    - tiempo_carga guarda los segundos que tardó la carga (None si aún no se ha cargado).
+    - Se usa el tokenizer rápido (implementado en Rust) cuando el modelo lo tiene; si no, el de Python.
+    - solo_local=True carga únicamente desde la caché local de Hugging Face (sin conexión).
+    """
+
+    def __init__(self, nombre=MODELO_NOMBRE, opciones_generacion=None, backend="eager", solo_local=False):
+        self.nombre = resolver_modelo(nombre)
+        self.backend = backend
+        self.solo_local = solo_local
+        self.tokenizer_rapido = None  # True/False una vez cargado el tokenizer
+        # Ajustes que se pasan a modelo.generate (max_new_tokens, num_beams...); vacío = valores del modelo
+        self.opciones_generacion = dict(opciones_generacion or {})
+        self.tiempo_carga = None
+        self._tokenizer = None
+        self._modelo = None
+        self._error = None
+        self._hilo = None
+        self._lock = threading.Lock()  # Evita que dos hilos carguen el modelo a la vez
+
+    def configurar(self, modelo=None, backend=None, opciones_generacion=None, solo_local=None):
+        """
+        Cambia la variante del modelo, el modo de inferencia o los ajustes de generación.
+        Debe llamarse antes de cargar el modelo.
+        """
+        if self.cargado or (self._hilo is not None and self._hilo.is_alive()):
+            raise RuntimeError("El modelo ya se está cargando: configura el cargador antes de usarlo")
+        if modelo is not None:
+            self.nombre = resolver_modelo(modelo)
+        if solo_local is not None:
+            self.solo_local = solo_local
+        if backend is not None:
+            if backend not in BACKENDS:
+                raise ValueError(f"Backend desconocido '{backend}'. Opciones: {', '.join(BACKENDS)}")
+            self.backend = backend
+        if opciones_generacion is not None:
+            self.opciones_generacion = dict(opciones_generacion)
+
+    @property
+    def identificador(self):
+        # Identifica modelo + modo de inferencia (las respuestas int8 pueden diferir de las float32)
+        return f"{self.nombre}:{self.backend}"
+
+    @property
+    def cargado(self):
+        # Indica si el modelo ya está disponible en memoria
+        return self._modelo is not None
+
+    def cargar(self):
+        """
+        Carga el tokenizer y el modelo si todavía no están en memoria.
+        Retorna el tiempo de carga en segundos.
+        """
+        with self._lock:
+            if self._modelo is None:
+                inicio = time.perf_counter()
+                # Importamos transformers aquí: importar la librería ya es costoso,
+                # así que solo lo pagamos cuando realmente necesitamos el modelo
+                # Las clases Auto eligen la arquitectura correcta para cada variante
+                # (BlenderBot o BlenderBot Small)
+                from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+                self._tokenizer = AutoTokenizer.from_pretrained(
+                    self.nombre, use_fast=True, local_files_only=self.solo_local
+                )
+                # Tokenizer: convierte texto en tensores que el modelo puede entender
+                self.tokenizer_rapido = self._tokenizer.is_fast
+                modelo = AutoModelForSeq2SeqLM.from_pretrained(self.nombre, local_files_only=self.solo_local)
+                # Modelo: BlenderBot listo para generar respuestas, en el modo de inferencia elegido
+                self._modelo = aplicar_backend(modelo, self.backend)
+                self.tiempo_carga = time.perf_counter() - inicio
+        return self.tiempo_carga
+
+    def _cargar_en_segundo_plano(self):
+        try:
+            self.cargar()
+        except Exception as e:
+            # Guardamos el error para relanzarlo cuando alguien necesite el modelo
+            self._error = e
+
+    def precargar(self):
+        """
+        Lanza la carga del modelo en un hilo en segundo plano (si no se ha lanzado ya).
+        El hilo es 'daemon' para no impedir que el programa termine.
+        """
+        if self.cargado or (self._hilo is not None and self._hilo.is_alive()):
+            return self._hilo
+        self._hilo = threading.Thread(target=self._cargar_en_segundo_plano, daemon=True)
+        self._hilo.start()
+        return self._hilo
+
+    def esperar(self):
+        """
+        Espera a que el modelo esté cargado (cargándolo si hace falta).
+        Si la precarga en segundo plano falló, relanza el error.
+        """
+        if self._hilo is not None:
+            self._hilo.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        self.cargar()
+
+    @property
+    def tokenizer(self):
+        self.esperar()
+        return self._tokenizer
+
+    @property
+    def modelo(self):
+        self.esperar()
+        return self._modelo
+
+    def _preparar_entrada(self, entrada):
+        """
+        Convierte la entrada en tensores para generate.
+        Acepta un texto o una lista de IDs ya tokenizados (por ejemplo, el contexto de la conversación).
+        """
+        if isinstance(entrada, str):
+            # Convertimos la entrada del usuario a tensores PyTorch (formato que el modelo entiende)
+            return self.tokenizer(entrada, return_tensors="pt")
+        import torch
+
+        ids = torch.tensor([list(entrada)], dtype=torch.long)
+        return {"input_ids": ids, "attention_mask": torch.ones_like(ids)}
+
+    def generar_ids(self, entrada, turno=TURNO_NULO):
+        """
+        Genera la respuesta y devuelve (texto, ids_generados).
+        Los IDs permiten añadir la respuesta al contexto sin volver a tokenizarla.
+        'turno' (ver instrumentacion.py) registra el tiempo de cada etapa y los tokens.
+        """
+        tokenizer = self.tokenizer
+        with turno.etapa("tokenizacion"):
+            entradas_ids = self._preparar_entrada(entrada)
+        with turno.etapa("generacion"):
+            # Generamos la respuesta del modelo
+            salida_ids = self._modelo.generate(**entradas_ids, **self.opciones_generacion)
+        with turno.etapa("decodificacion"):
+            # Convertimos los IDs de salida de nuevo a texto, eliminando tokens especiales
+            texto = tokenizer.decode(salida_ids[0], skip_special_tokens=True)
+        turno.tokens_entrada = int(entradas_ids["input_ids"].shape[-1])
+        turno.tokens_salida = int(salida_ids.shape[-1])
+        return texto, salida_ids[0].tolist()
+
+    def generar(self, entrada, turno=TURNO_NULO):
+        """
+        Genera la respuesta del modelo para un texto de entrada (o una lista de IDs).
+        La primera llamada carga el modelo si todavía no está cargado.
+        """
+        return self.generar_ids(entrada, turno)[0]
+
+    def generar_lote(self, entradas):
+        """
+        Genera las respuestas de varias entradas en una sola llamada a generate.
+        Las entradas se rellenan (padding) hasta la misma longitud para formar un lote.
+
+        Retorna una lista de respuestas en el mismo orden que las entradas.
+        """
+        tokenizer = self.tokenizer
+        # padding=True iguala la longitud de todas las entradas; la attention_mask
+        # indica al modelo qué posiciones son relleno y debe ignorar
+        entradas_ids = tokenizer(list(entradas), return_tensors="pt", padding=True)
+        salida_ids = self._modelo.generate(**entradas_ids, **self.opciones_generacion)
+        return tokenizer.batch_decode(salida_ids, skip_special_tokens=True)
+
+    def generar_streaming(self, entrada, detener=None, turno=TURNO_NULO):
+        """
+        Genera la respuesta fragmento a fragmento, a medida que el modelo produce tokens.
+        Acepta un texto o una lista de IDs, igual que generar().
+        'detener' es un threading.Event opcional: si se activa, la generación se corta en el siguiente token.
+        """
+        from transformers import TextIteratorStreamer
+
+        tokenizer = self.tokenizer
+        with turno.etapa("tokenizacion"):
+            entradas_ids = self._preparar_entrada(entrada)
+        turno.tokens_entrada = int(entradas_ids["input_ids"].shape[-1])
+        # El streamer recibe los tokens desde generate y los entrega ya decodificados como texto
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        detener = detener or threading.Event()
+        criterio = _CriterioDetener(detener)
+        errores = []
+
+        def _generar():
+            try:
+                self._modelo.generate(
+                    **entradas_ids,
+                    **self.opciones_generacion,
+                    streamer=streamer,
+                    stopping_criteria=[criterio],
+                )
+            except Exception as e:
+                errores.append(e)
+                streamer.end()  # Desbloquea al consumidor aunque la generación haya fallado
+
+        # generate se ejecuta en otro hilo; este generador va entregando el texto según llega
+        hilo = threading.Thread(target=_generar, daemon=True)
+        hilo.start()
+        try:
+            # En streaming la decodificación va intercalada con generate: se mide todo como generación.
+            # Solo se cuenta la espera de cada fragmento, no el tiempo que el consumidor pasa con él
+            # tras el yield (imprimirlo, enviarlo por la red...)
+            fragmentos = iter(streamer)
+            while True:
+                with turno.etapa("generacion"):
+                    fragmento = next(fragmentos, None)
+                if fragmento is None:
+                    break
+                if fragmento:
+                    yield fragmento
+        finally:
+            detener.set()  # Si el consumidor deja de leer, cortamos la generación
+            hilo.join()
+            turno.tokens_salida = criterio.longitud
+        if errores:
+            raise errores[0]
+
+
+class _CriterioDetener:
+    # Criterio de parada para generate: termina cuando se activa el evento 'detener'
+    def __init__(self, detener):
+        self.detener = detener
+        self.longitud = 0  # Tokens generados hasta ahora (útil para medir tokens/s)
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        self.longitud = int(input_ids.shape[-1])
+
+        return torch.full((input_ids.shape[0],), self.detener.is_set(), dtype=torch.bool)
+
+
+# Instancia compartida por defecto: todo el proyecto usa el mismo modelo en memoria
+cargador = CargadorModelo()
@@ -0,0 +1,172 @@
+# moderacion.py
+# Este archivo implementa el motor de moderación de respuestas del chatbot.
+# En lugar de recorrer la lista de palabras prohibidas una a una (coste palabras × texto),
+# todas las palabras se compilan UNA sola vez en una expresión regular con forma de árbol (trie),
+# y cada respuesta se revisa en una única pasada.
+
+import os   # Para comprobar si existe el archivo de configuración
+import re   # Motor de expresiones regulares (compilado en C)
+from collections import namedtuple
+
+# Archivo de configuración con una palabra o expresión prohibida por línea ('#' para comentarios)
+ARCHIVO_PALABRAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "palabras_prohibidas.txt")
+
+# Lista por defecto si no existe el archivo de configuración. Los términos son palabras completas,
+# así que las formas flexionadas habituales se incluyen aparte
+PALABRAS_POR_DEFECTO = ["f***", "f***s", "f***ed", "f***er", "f***ing", "n***", "n***s", "ur mum"]
+
+# Resultado de una revisión: qué término (regla) coincidió y en qué posición del texto
+Coincidencia = namedtuple("Coincidencia", ["termino", "inicio", "fin"])
+
+
+def cargar_palabras(ruta=ARCHIVO_PALABRAS):
+    """
+    Lee las palabras prohibidas del archivo de configuración.
+    Ignora líneas vacías y comentarios. Si el archivo no existe, usa la lista por defecto.
+    """
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            palabras = [linea.strip() for linea in f]
+    except FileNotFoundError:
+        return list(PALABRAS_POR_DEFECTO)
+    return [p for p in palabras if p and not p.startswith("#")]
+
+
+def _construir_trie(terminos):
+    # Árbol de prefijos: cada nodo es un dict carácter → nodo; la clave "" marca el final de un término
+    raiz = {}
+    for termino in terminos:
+        nodo = raiz
+        for caracter in termino:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[""] = True
+    return raiz
+
+
+def _trie_a_patron(nodo):
+    """
+    Convierte un nodo del trie en una expresión regular.
+    Los prefijos comunes se escriben una sola vez: ["casa", "caso"] → "cas[ao]".
+    Así, en cada posición del texto el motor solo prueba las ramas que empiezan por ese carácter.
+    """
+    termina_aqui = "" in nodo
+    ramas = []
+    caracteres = []
+    for caracter in sorted(c for c in nodo if c != ""):
+        sub = _trie_a_patron(nodo[caracter])
+        if sub is None:
+            caracteres.append(re.escape(caracter))
+        else:
+            ramas.append(re.escape(caracter) + sub)
+
+    if not ramas and not caracteres:
+        return None  # Hoja: el término termina aquí y no continúa
+
+    solo_caracteres = not ramas
+    if len(caracteres) == 1:
+        ramas.append(caracteres[0])
+    elif caracteres:
+        ramas.append("[" + "".join(caracteres) + "]")
+
+    if len(ramas) == 1:
+        patron = ramas[0]
+        if termina_aqui:
+            # Un único carácter no necesita grupo para hacerse opcional
+            patron = patron + "?" if solo_caracteres else "(?:" + patron + ")?"
+    else:
+        patron = "(?:" + "|".join(ramas) + ")"
+        if termina_aqui:
+            patron += "?"
+    return patron
+
+
+class Moderador:
+    """
+    Revisa textos contra una lista (potencialmente de miles) de términos prohibidos.
+
+    - Se compila una única expresión regular en forma de trie al crear el objeto.
+    - limites_palabra=True exige que el término aparezca como palabra completa
+      ("ur mum" no coincide dentro de "your mum"); con False se buscan subcadenas.
+    - revisar() devuelve la primera Coincidencia o None, en una sola pasada sobre el texto.
+    """
+
+    def __init__(self, terminos, limites_palabra=True):
+        # Normalizamos a minúsculas y eliminamos duplicados; la búsqueda ignora mayúsculas
+        self.terminos = sorted({t.lower() for t in terminos if t})
+        self.limites_palabra = limites_palabra
+        self._patron = None
+        patron = _trie_a_patron(_construir_trie(self.terminos)) if self.terminos else None
+        if patron is not None:
+            if limites_palabra:
+                # Lookarounds en lugar de \b: funcionan también con términos que empiezan
+                # o terminan en símbolos, como "f***"
+                patron = r"(?<!\w)" + patron + r"(?!\w)"
+            self._patron = re.compile(patron, re.IGNORECASE)
+
+    @classmethod
+    def desde_archivo(cls, ruta=ARCHIVO_PALABRAS, limites_palabra=True):
+        return cls(cargar_palabras(ruta), limites_palabra=limites_palabra)
+
+    def revisar(self, texto, inicio=0):
+        """
+        Busca el primer término prohibido en el texto a partir de la posición 'inicio'.
+        Retorna Coincidencia(termino, inicio, fin) o None si el texto es aceptable.
+        """
+        if self._patron is None:
+            return None
+        m = self._patron.search(texto, inicio)
+        if m is None:
+            return None
+        return Coincidencia(m.group().lower(), m.start(), m.end())
+
+    def todas(self, texto):
+        # Todas las coincidencias (sin solapamiento) del texto, útil para informes
+        if self._patron is None:
+            return []
+        return [Coincidencia(m.group().lower(), m.start(), m.end()) for m in self._patron.finditer(texto)]
+
+    def __len__(self):
+        return len(self.terminos)
+
+
+class RevisorIncremental:
+    """
+    Modera un texto que llega por fragmentos (streaming) sin volver a revisarlo entero cada vez.
+
+    - agregar(fragmento) devuelve (texto_seguro, coincidencia): el texto que ya se puede mostrar
+      y la coincidencia si se ha detectado un término prohibido (en ese caso hay que cortar).
+    - Se retienen los últimos caracteres (tantos como el término más largo) hasta saber si forman
+      parte de un término prohibido, así nunca se muestra un término prohibido al usuario.
+    - terminar() revisa y devuelve lo retenido cuando el texto está completo.
+    """
+
+    def __init__(self, moderador):
+        self.moderador = moderador
+        self.texto = ""
+        self.emitido = 0  # Caracteres ya mostrados al usuario
+        self.retener = max((len(t) for t in moderador.terminos), default=0)
+
+    def _revisar(self, final):
+        # Solo buscamos desde lo ya emitido: lo anterior quedó decidido en pasos previos
+        coincidencia = self.moderador.revisar(self.texto, self.emitido)
+        # Una coincidencia que llega justo al final aún puede deshacerse si el texto continúa
+        # la palabra ("ur mum" → "ur mumble"), así que solo es definitiva si hay algo detrás
+        if coincidencia is not None and (final or coincidencia.fin < len(self.texto)):
+            return coincidencia
+        return None
+
+    def agregar(self, fragmento):
+        self.texto += fragmento
+        coincidencia = self._revisar(final=False)
+        if coincidencia is not None:
+            return "", coincidencia
+        hasta = max(self.emitido, len(self.texto) - self.retener)
+        seguro, self.emitido = self.texto[self.emitido:hasta], hasta
+        return seguro, None
+
+    def terminar(self):
+        coincidencia = self._revisar(final=True)
+        if coincidencia is not None:
+            return "", coincidencia
+        seguro, self.emitido = self.texto[self.emitido:], len(self.texto)
+        return seguro, None
@@ -0,0 +1,156 @@
+"""
+Script: benchmark_backends.py
+-----------------------------
+Objetivo: Comparar los modos de inferencia en CPU del chatbot (eager float32, int8 dinámico y compilado).
+
+Uso:
+    python scripts/benchmark_backends.py --backends eager int8 compilado --repeticiones 3
+    python scripts/benchmark_backends.py --prompts mis_prompts.txt --salida resultados_backends.json
+
+Cada backend se ejecuta en un proceso separado para que la memoria pico (RSS) de uno no
+contamine la medida del siguiente. Para cada backend se informa de:
+- Tiempo de carga del modelo (incluida la cuantización o compilación).
+- Latencia media y p95 por respuesta, y tokens generados por segundo.
+- Memoria pico del proceso (RSS).
+- Similitud de las respuestas con las del modo eager (float32), que se toma como referencia.
+
+Para ejecutar sin conexión, usa el modelo ya descargado en la caché local: HF_HUB_OFFLINE=1.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+# Permitimos importar modelo_chat.py al ejecutar el script desde la carpeta del proyecto o desde scripts/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentacion import percentil  # noqa: E402
+from modelo_chat import BACKENDS, MODELO_NOMBRE  # noqa: E402
+
+# Mensajes de prueba por defecto (el modelo está entrenado en inglés)
+PROMPTS_POR_DEFECTO = [
+    "Hello, how are you today?",
+    "What do you like to do in your free time?",
+    "Can you recommend me a good book?",
+    "I just adopted a dog, any advice?",
+    "What is your favourite kind of music?",
+    "Tell me something interesting about space.",
+    "I'm feeling a bit tired after work.",
+    "Do you think it will rain tomorrow?",
+]
+
+
+def rss_pico_mb():
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def ejecutar_backend(backend, nombre, prompts, repeticiones):
+    """
+    Carga el modelo con el backend indicado, genera todas las respuestas y devuelve las medidas.
+    Se ejecuta dentro de un proceso hijo.
+    """
+    import torch
+    from modelo_chat import CargadorModelo
+
+    cargador = CargadorModelo(nombre=nombre, backend=backend)
+    tiempo_carga = cargador.cargar()
+    tokenizer, modelo = cargador.tokenizer, cargador.modelo
+
+    latencias, tokens, respuestas = [], 0, []
+    with torch.inference_mode():
+        # Una generación de calentamiento: en el modo compilado la primera llamada compila el grafo
+        inicio = time.perf_counter()
+        modelo.generate(**tokenizer(prompts[0], return_tensors="pt"), **cargador.opciones_generacion)
+        calentamiento = time.perf_counter() - inicio
+
+        for _ in range(repeticiones):
+            respuestas = []
+            for prompt in prompts:
+                entradas_ids = tokenizer(prompt, return_tensors="pt")
+                inicio = time.perf_counter()
+                salida_ids = modelo.generate(**entradas_ids, **cargador.opciones_generacion)
+                latencias.append(time.perf_counter() - inicio)
+                tokens += int(salida_ids.shape[-1])
+                respuestas.append(tokenizer.decode(salida_ids[0], skip_special_tokens=True))
+
+    return {
+        "backend": backend,
+        "modelo": nombre,
+        "tiempo_carga_s": tiempo_carga,
+        "calentamiento_s": calentamiento,
+        "latencia_media_s": sum(latencias) / len(latencias),
+        "latencia_p95_s": percentil(sorted(latencias), 95),
+        "tokens_por_segundo": tokens / sum(latencias),
+        "rss_pico_mb": rss_pico_mb(),
+        "respuestas": respuestas,
+    }
+
+
+def similitud(respuestas, referencia):
+    # Proporción de respuestas idénticas y similitud media de texto (difflib) frente a la referencia
+    iguales = sum(a == b for a, b in zip(respuestas, referencia)) / len(referencia)
+    parecido = sum(difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(respuestas, referencia))
+    return iguales, parecido / len(referencia)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los modos de inferencia del chatbot")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--modelo", type=str, default=MODELO_NOMBRE, help="Modelo de Hugging Face a evaluar")
+    parser.add_argument("--prompts", type=str, default=None, help="Archivo de texto con un mensaje por línea")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Veces que se repite la lista de mensajes")
+    parser.add_argument("--salida", type=str, default=None, help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--un_backend", type=str, default=None, help=argparse.SUPPRESS)  # Uso interno (proceso hijo)
+    args = parser.parse_args()
+
+    prompts = PROMPTS_POR_DEFECTO
+    if args.prompts:
+        with open(args.prompts, "r", encoding="utf-8") as f:
+            prompts = [linea.strip() for linea in f if linea.strip()]
+
+    if args.un_backend:
+        # Proceso hijo: medimos un solo backend y devolvemos el resultado por la salida estándar
+        print(json.dumps(ejecutar_backend(args.un_backend, args.modelo, prompts, args.repeticiones)))
+        return
+
+    resultados = []
+    for backend in args.backends:
+        print(f"Midiendo backend '{backend}'...")
+        comando = [sys.executable, os.path.abspath(__file__), "--un_backend", backend,
+                   "--modelo", args.modelo, "--repeticiones", str(args.repeticiones)]
+        if args.prompts:
+            comando += ["--prompts", args.prompts]
+        salida = subprocess.run(comando, capture_output=True, text=True)
+        if salida.returncode != 0:
+            print(f"Error en el backend '{backend}':\n{salida.stderr}")
+            continue
+        resultados.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    # La referencia es el modo eager (float32); si no se midió, no se calcula la similitud
+    referencia = next((r["respuestas"] for r in resultados if r["backend"] == "eager"), None)
+    print(f"\n{'backend':>10} {'carga (s)':>10} {'media (s)':>10} {'p95 (s)':>9} {'tokens/s':>9} "
+          f"{'RSS (MB)':>9} {'iguales':>8} {'similitud':>10}")
+    for r in resultados:
+        if referencia is not None:
+            r["respuestas_iguales"], r["similitud_media"] = similitud(r["respuestas"], referencia)
+        iguales = f"{r['respuestas_iguales']:.0%}" if "respuestas_iguales" in r else "-"
+        parecido = f"{r['similitud_media']:.3f}" if "similitud_media" in r else "-"
+        print(f"{r['backend']:>10} {r['tiempo_carga_s']:>10.1f} {r['latencia_media_s']:>10.3f} "
+              f"{r['latencia_p95_s']:>9.3f} {r['tokens_por_segundo']:>9.1f} {r['rss_pico_mb']:>9.0f} "
+              f"{iguales:>8} {parecido:>10}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=4)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
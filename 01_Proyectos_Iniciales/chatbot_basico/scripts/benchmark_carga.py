@@ -0,0 +1,218 @@
+"""
+Script: benchmark_carga.py
+--------------------------
+Objetivo: Medir el chatbot bajo carga reproduciendo un corpus de mensajes reales
+(por defecto, los mensajes del usuario guardados en el historial) contra el motor de chat
+con distintas concurrencias y tamaños de lote.
+
+Uso:
+    python scripts/benchmark_carga.py --concurrencias 1 4 16 --lotes 1 4 8 --salida carga.json
+    python scripts/benchmark_carga.py --corpus prompts.txt --backend int8 --peticiones 200
+    python scripts/benchmark_carga.py --modelo 90M --salida carga_90M.json
+
+Para cada combinación (concurrencia, lote máximo) se informa de:
+- Latencia p50/p95/p99 por petición y rendimiento (peticiones/s).
+- Tamaño medio de lote conseguido por el servidor de micro-lotes.
+- Uso de CPU del proceso (porcentaje del total de la máquina) y memoria (RSS actual y pico).
+
+Los resultados se guardan en JSON junto con la configuración (modelo, backend, hilos de torch...)
+para poder comparar ejecuciones entre variantes de modelo y ajustes.
+El script funciona sin conexión: usa únicamente el modelo ya descargado en la caché local
+y termina antes de empezar si la variante elegida no está descargada.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+# Sin conexión: transformers solo usará los archivos de la caché local
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+# Permitimos importar los módulos del chatbot al ejecutar el script desde la carpeta del proyecto o desde scripts/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chatbot  # noqa: E402
+from almacen import AlmacenConversaciones, ARCHIVO_HISTORIAL  # noqa: E402
+from instrumentacion import percentil  # noqa: E402
+from modelo_chat import BACKENDS, MODELOS, cargador  # noqa: E402
+from servidor import ServidorLotes  # noqa: E402
+
+# Mensajes de respaldo si no hay historial ni archivo de corpus
+CORPUS_POR_DEFECTO = [
+    "Hello!", "How are you?", "What's your favourite movie?", "Do you like cooking?",
+    "Tell me a joke.", "I'm going on holiday next week.", "What should I read next?", "Thanks!",
+]
+
+
+def cargar_corpus(ruta):
+    """
+    Lee los mensajes a reproducir:
+    - .jsonl: historial del chatbot (campo 'usuario' de cada turno)
+    - .json: historial antiguo (lista de turnos)
+    - cualquier otro archivo: un mensaje por línea
+    """
+    if ruta is None:
+        ruta = ARCHIVO_HISTORIAL if os.path.exists(ARCHIVO_HISTORIAL) else None
+    if ruta is None:
+        return list(CORPUS_POR_DEFECTO)
+    if ruta.endswith(".jsonl"):
+        mensajes = [t.get("usuario", "") for t in AlmacenConversaciones(ruta).leer_todo()]
+    elif ruta.endswith(".json"):
+        with open(ruta, "r", encoding="utf-8") as f:
+            mensajes = [t.get("usuario", "") for t in json.load(f)]
+    else:
+        with open(ruta, "r", encoding="utf-8") as f:
+            mensajes = [linea.strip() for linea in f]
+    mensajes = [m for m in mensajes if m]
+    return mensajes or list(CORPUS_POR_DEFECTO)
+
+
+def memoria_mb():
+    # RSS actual (Linux, /proc) y RSS pico del proceso, en MB
+    actual = None
+    try:
+        with open("/proc/self/statm") as f:
+            actual = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pico = pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+    return actual, pico
+
+
+def en_cache_local(nombre):
+    # La variante está descargada si su config.json está en la caché local de Hugging Face
+    from huggingface_hub import try_to_load_from_cache
+
+    return isinstance(try_to_load_from_cache(nombre, "config.json"), str)
+
+
+def tiempo_cpu():
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    return uso.ru_utime + uso.ru_stime
+
+
+async def ejecutar_escenario(corpus, peticiones, concurrencia, lote_maximo, espera_ms, usar_cache):
+    """
+    Lanza 'concurrencia' clientes que envían en total 'peticiones' mensajes del corpus
+    (en orden, repitiendo el corpus si hace falta) y mide cada petición.
+    """
+    servidor = ServidorLotes(lote_maximo=lote_maximo, espera_maxima_ms=espera_ms)
+    servidor.iniciar()
+    siguiente = iter(range(peticiones))
+    latencias = []
+
+    async def cliente():
+        for i in siguiente:  # El iterador es compartido: cada petición la envía un solo cliente
+            inicio = time.perf_counter()
+            await servidor.responder(corpus[i % len(corpus)], usar_cache)
+            latencias.append(time.perf_counter() - inicio)
+
+    cpu_inicio, reloj_inicio = tiempo_cpu(), time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - reloj_inicio
+    cpu = tiempo_cpu() - cpu_inicio
+    await servidor.detener()
+
+    latencias.sort()
+    actual, pico = memoria_mb()
+    return {
+        "concurrencia": concurrencia,
+        "lote_maximo": lote_maximo,
+        "espera_ms": espera_ms,
+        "peticiones": len(latencias),
+        "duracion_s": duracion,
+        "peticiones_por_segundo": len(latencias) / duracion,
+        "latencia_p50_s": percentil(latencias, 50),
+        "latencia_p95_s": percentil(latencias, 95),
+        "latencia_p99_s": percentil(latencias, 99),
+        "lote_medio": servidor.mensajes_procesados / max(1, servidor.lotes_procesados),
+        "cpu_porcentaje": 100 * cpu / duracion / (os.cpu_count() or 1),
+        "rss_mb": actual,
+        "rss_pico_mb": pico,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga del chatbot por reproducción de mensajes")
+    parser.add_argument("--corpus", type=str, default=None,
+                        help="Historial .jsonl/.json o archivo de texto (por defecto, conversaciones.jsonl)")
+    parser.add_argument("--peticiones", type=int, default=64, help="Peticiones por escenario")
+    parser.add_argument("--concurrencias", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 8], help="Tamaños máximos de lote")
+    parser.add_argument("--espera_ms", type=float, default=20, help="Espera máxima para completar un lote (ms)")
+    parser.add_argument("--modelo", choices=list(MODELOS), default="400M-distill",
+                        help="Variante del modelo (debe estar en la caché local)")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Modo de inferencia del modelo")
+    parser.add_argument("--con_cache", action="store_true",
+                        help="Usa la caché de respuestas (por defecto se mide siempre el modelo)")
+    parser.add_argument("--salida", type=str, default=None, help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    # Sin conexión solo sirve una variante ya descargada: lo comprobamos antes de medir nada
+    cargador.configurar(modelo=args.modelo, backend=args.backend, solo_local=True)
+    if not en_cache_local(cargador.nombre):
+        print(f"La variante '{args.modelo}' ({cargador.nombre}) no está en la caché local de Hugging Face. "
+              f"Descárgala antes con conexión, por ejemplo: python main.py --modelo {args.modelo}")
+        sys.exit(1)
+
+    corpus = cargar_corpus(args.corpus)
+    print(f"Corpus: {len(corpus)} mensajes")
+
+    try:
+        tiempo_carga = cargador.cargar()
+    except OSError as e:
+        # Descarga incompleta en la caché (por ejemplo, config.json sin los pesos)
+        print(f"No se pudo cargar la variante '{args.modelo}' desde la caché local: {e}")
+        sys.exit(1)
+    cargador.generar(corpus[0])  # Calentamiento (en el modo compilado incluye la compilación)
+    print(f"Modelo {cargador.identificador} cargado en {tiempo_carga:.1f} s")
+    if not args.con_cache:
+        chatbot.configurar_cache(activa=False)
+
+    import torch
+
+    resultados = {
+        "configuracion": {
+            "modelo": cargador.nombre,
+            "backend": cargador.backend,
+            "opciones_generacion": cargador.opciones_generacion,
+            "cache": args.con_cache,
+            "mensajes_corpus": len(corpus),
+            "hilos_torch": torch.get_num_threads(),
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "tiempo_carga_s": tiempo_carga,
+        "escenarios": [],
+    }
+
+    print(f"\n{'conc.':>6} {'lote':>5} {'pet/s':>8} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} "
+          f"{'lote medio':>10} {'CPU %':>6} {'RSS (MB)':>9}")
+    for lote_maximo in args.lotes:
+        for concurrencia in args.concurrencias:
+            r = asyncio.run(ejecutar_escenario(
+                corpus, args.peticiones, concurrencia, lote_maximo, args.espera_ms, args.con_cache
+            ))
+            resultados["escenarios"].append(r)
+            rss = f"{r['rss_mb']:.0f}" if r["rss_mb"] is not None else "-"
+            print(f"{concurrencia:>6} {lote_maximo:>5} {r['peticiones_por_segundo']:>8.2f} "
+                  f"{r['latencia_p50_s']:>8.3f} {r['latencia_p95_s']:>8.3f} {r['latencia_p99_s']:>8.3f} "
+                  f"{r['lote_medio']:>10.1f} {r['cpu_porcentaje']:>6.0f} {rss:>9}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=4)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Script: benchmark_modelos.py
+----------------------------
+Objetivo: Comparar las variantes de BlenderBot del registro (90M, 400M-distill, 1B-distill, 3B...)
+y elegir la más barata que cumple un objetivo de latencia por turno.
+
+Uso:
+    python scripts/benchmark_modelos.py --modelos 90M 400M-distill 1B-distill --slo_ms 800
+    python scripts/benchmark_modelos.py --backend int8 --prompts mis_prompts.txt --salida modelos.json
+
+Cada variante se ejecuta en un proceso separado (la memoria pico de una no contamina la siguiente)
+y solo desde la caché local de Hugging Face: las variantes que no estén descargadas se omiten.
+Para cada variante se informa de:
+- Tiempo de carga y si se usó el tokenizer rápido (Rust).
+- Latencia por turno p50/p95 (tokenización + generate + decodificación) y tokens/s.
+- Memoria pico del proceso (RSS).
+
+La variante recomendada es la de menor memoria cuya latencia p95 no supera --slo_ms.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Sin conexión: transformers solo usará los archivos de la caché local
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+# Permitimos importar los módulos del chatbot al ejecutar el script desde la carpeta del proyecto o desde scripts/
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_backends import PROMPTS_POR_DEFECTO, rss_pico_mb  # noqa: E402
+from instrumentacion import percentil  # noqa: E402
+from modelo_chat import BACKENDS, MODELOS  # noqa: E402
+
+
+def tamano_mb(modelo):
+    """
+    Tamaño de los pesos del modelo serializados (state_dict). A diferencia de contar .parameters(),
+    incluye las capas Linear cuantizadas en int8, cuyos pesos empaquetados no son parámetros.
+    """
+    import io
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(modelo.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / (1024 * 1024)
+
+
+def ejecutar_modelo(modelo, backend, prompts, repeticiones):
+    """
+    Carga una variante, responde todos los mensajes y devuelve las medidas.
+    Se ejecuta dentro de un proceso hijo.
+    """
+    from instrumentacion import Turno
+    from modelo_chat import CargadorModelo
+
+    cargador = CargadorModelo(nombre=modelo, backend=backend, solo_local=True)
+    tiempo_carga = cargador.cargar()
+    cargador.generar(prompts[0])  # Calentamiento (en el modo compilado incluye la compilación)
+
+    latencias, tokens, generacion = [], 0, 0.0
+    for _ in range(repeticiones):
+        for prompt in prompts:
+            turno = Turno()
+            cargador.generar(prompt, turno=turno)
+            latencias.append(sum(turno.etapas.values()))
+            tokens += turno.tokens_salida
+            generacion += turno.etapas.get("generacion", 0.0)
+
+    return {
+        "modelo": modelo,
+        "nombre": cargador.nombre,
+        "backend": backend,
+        "tokenizer_rapido": cargador.tokenizer_rapido,
+        "tamano_mb": tamano_mb(cargador.modelo),
+        "tiempo_carga_s": tiempo_carga,
+        "latencia_p50_s": percentil(sorted(latencias), 50),
+        "latencia_p95_s": percentil(sorted(latencias), 95),
+        "tokens_por_segundo": tokens / generacion if generacion else None,
+        "rss_pico_mb": rss_pico_mb(),
+    }
+
+
+def recomendar(resultados, slo_ms):
+    # La variante más barata (menor memoria pico) que cumple el objetivo de latencia p95
+    validos = [r for r in resultados if r["latencia_p95_s"] * 1000 <= slo_ms]
+    return min(validos, key=lambda r: r["rss_pico_mb"]) if validos else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las variantes de modelo del chatbot")
+    parser.add_argument("--modelos", nargs="+", default=list(MODELOS),
+                        help="Alias del registro o nombres de Hugging Face a comparar")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Modo de inferencia del modelo")
+    parser.add_argument("--prompts", type=str, default=None, help="Archivo de texto con un mensaje por línea")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Veces que se repite la lista de mensajes")
+    parser.add_argument("--slo_ms", type=float, default=1000, help="Latencia p95 máxima aceptable por turno (ms)")
+    parser.add_argument("--salida", type=str, default=None, help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--un_modelo", type=str, default=None, help=argparse.SUPPRESS)  # Uso interno (proceso hijo)
+    args = parser.parse_args()
+
+    prompts = PROMPTS_POR_DEFECTO
+    if args.prompts:
+        with open(args.prompts, "r", encoding="utf-8") as f:
+            prompts = [linea.strip() for linea in f if linea.strip()]
+
+    if args.un_modelo:
+        # Proceso hijo: medimos una sola variante y devolvemos el resultado por la salida estándar
+        print(json.dumps(ejecutar_modelo(args.un_modelo, args.backend, prompts, args.repeticiones)))
+        return
+
+    resultados = []
+    for modelo in args.modelos:
+        print(f"Midiendo variante '{modelo}'...")
+        comando = [sys.executable, os.path.abspath(__file__), "--un_modelo", modelo,
+                   "--backend", args.backend, "--repeticiones", str(args.repeticiones)]
+        if args.prompts:
+            comando += ["--prompts", args.prompts]
+        salida = subprocess.run(comando, capture_output=True, text=True)
+        if salida.returncode != 0:
+            # Lo más habitual: la variante no está en la caché local
+            ultima = salida.stderr.strip().splitlines()[-1] if salida.stderr.strip() else ""
+            print(f"Se omite '{modelo}': {ultima}")
+            continue
+        resultados.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'modelo':>14} {'pesos (MB)':>10} {'rápido':>7} {'carga (s)':>10} {'p50 (ms)':>9} "
+          f"{'p95 (ms)':>9} {'tokens/s':>9} {'RSS (MB)':>9}")
+    for r in resultados:
+        tps = f"{r['tokens_por_segundo']:.1f}" if r["tokens_por_segundo"] else "-"
+        print(f"{r['modelo']:>14} {r['tamano_mb']:>10.0f} {'sí' if r['tokenizer_rapido'] else 'no':>7} "
+              f"{r['tiempo_carga_s']:>10.1f} {r['latencia_p50_s'] * 1000:>9.0f} "
+              f"{r['latencia_p95_s'] * 1000:>9.0f} {tps:>9} {r['rss_pico_mb']:>9.0f}")
+
+    mejor = recomendar(resultados, args.slo_ms)
+    if mejor is None:
+        print(f"\nNinguna variante cumple p95 <= {args.slo_ms:.0f} ms")
+    else:
+        print(f"\nRecomendada: '{mejor['modelo']}' (p95 {mejor['latencia_p95_s'] * 1000:.0f} ms, "
+              f"{mejor['rss_pico_mb']:.0f} MB). Úsala con: python main.py --modelo {mejor['modelo']}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"slo_ms": args.slo_ms, "recomendada": mejor and mejor["modelo"],
+                       "resultados": resultados}, f, ensure_ascii=False, indent=4)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Script: benchmark_moderacion.py
+-------------------------------
+Objetivo: Comparar el filtro original (un bucle con una búsqueda de subcadena por palabra prohibida)
+con el motor compilado de moderacion.py, usando listas grandes de términos sintéticos.
+
+Uso:
+    python scripts/benchmark_moderacion.py --terminos 1000 10000 50000 --textos 2000
+
+Para cada tamaño de lista se mide:
+- Tiempo de compilación del moderador (se paga una sola vez al arrancar).
+- Tiempo medio por respuesta del bucle original y del moderador compilado.
+- Que ambos métodos bloqueen las mismas respuestas (comprobación de coherencia).
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+# Permitimos importar moderacion.py al ejecutar el script desde la carpeta del proyecto o desde scripts/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moderacion import Moderador  # noqa: E402
+
+
+def generar_terminos(n, semilla=42):
+    # Palabras aleatorias de 4 a 10 letras; algunas son expresiones de dos palabras
+    rng = random.Random(semilla)
+    terminos = set()
+    while len(terminos) < n:
+        palabra = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        if rng.random() < 0.1:
+            palabra += " " + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 6)))
+        terminos.add(palabra)
+    return sorted(terminos)
+
+
+def generar_textos(n, terminos, proporcion_prohibidos=0.05, semilla=7):
+    # Respuestas de 15 a 40 palabras; una pequeña parte incluye un término prohibido
+    rng = random.Random(semilla)
+    vocabulario = ["i", "think", "that", "is", "a", "great", "idea", "do", "you", "like", "music",
+                   "yes", "no", "maybe", "what", "about", "the", "weather", "today", "really"]
+    textos = []
+    for _ in range(n):
+        palabras = rng.choices(vocabulario, k=rng.randint(15, 40))
+        if rng.random() < proporcion_prohibidos:
+            palabras.insert(rng.randrange(len(palabras)), rng.choice(terminos))
+        textos.append(" ".join(palabras).capitalize() + ".")
+    return textos
+
+
+def filtro_original(texto, terminos):
+    # Réplica del filtrar_respuesta original: minúsculas y búsqueda de subcadena por cada palabra
+    for palabra in terminos:
+        if palabra.lower() in texto.lower():
+            return True
+    return False
+
+
+def medir(funcion, textos):
+    inicio = time.perf_counter()
+    resultados = [funcion(t) for t in textos]
+    return (time.perf_counter() - inicio) / len(textos), resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de moderación")
+    parser.add_argument("--terminos", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Tamaños de la lista de términos prohibidos")
+    parser.add_argument("--textos", type=int, default=2000, help="Número de respuestas a revisar")
+    args = parser.parse_args()
+
+    print(f"{'términos':>10} {'compilar (ms)':>14} {'original (µs)':>14} {'compilado (µs)':>15} {'mejora':>8}")
+    for n in args.terminos:
+        terminos = generar_terminos(n)
+        textos = generar_textos(args.textos, terminos)
+
+        inicio = time.perf_counter()
+        # Subcadenas (como el filtro original) para que ambos métodos sean comparables
+        moderador = Moderador(terminos, limites_palabra=False)
+        compilar = time.perf_counter() - inicio
+
+        t_original, r_original = medir(lambda t: filtro_original(t, terminos), textos)
+        t_compilado, r_compilado = medir(lambda t: moderador.revisar(t) is not None, textos)
+
+        if r_original != r_compilado:
+            print(f"Aviso: los resultados no coinciden para {n} términos")
+        print(f"{n:>10} {compilar * 1000:>14.1f} {t_original * 1e6:>14.1f} "
+              f"{t_compilado * 1e6:>15.2f} {t_original / t_compilado:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# servidor.py
+# Este archivo implementa un servidor HTTP local (asyncio) para atender muchas sesiones de chat a la vez.
+# Las peticiones que llegan casi al mismo tiempo se agrupan en un único lote y se generan
+# con una sola llamada a modelo.generate, que en CPU es mucho más eficiente que una llamada por mensaje.
+
+import asyncio  # Servidor y cola de peticiones asíncronos
+import json     # Cuerpo de las peticiones y respuestas en JSON
+import time     # Para medir la ventana de espera de cada lote
+
+import chatbot  # filtrar_respuesta y la caché de respuestas compartida con el chat por consola
+from modelo_chat import cargador       # Modelo BlenderBot compartido (carga perezosa)
+
+# Valores por defecto del servidor
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8000
+LOTE_MAXIMO = 8          # Número máximo de mensajes que se generan juntos
+ESPERA_MAXIMA_MS = 20    # Tiempo máximo que esperamos a que se llene un lote (milisegundos)
+
+
+class ServidorLotes:
+    """
+    Agrupa las peticiones concurrentes en micro-lotes y las genera juntas.
+
+    - Cada petición se encola junto a un 'future' donde se dejará su respuesta.
+    - Un único trabajador saca la primera petición de la cola y espera como mucho
+      'espera_maxima_ms' a que lleguen más, hasta un máximo de 'lote_maximo'.
+    - El lote se genera en un hilo aparte para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, modelo=cargador, lote_maximo=LOTE_MAXIMO, espera_maxima_ms=ESPERA_MAXIMA_MS):
+        self.modelo = modelo
+        self.lote_maximo = lote_maximo
+        self.espera_maxima = espera_maxima_ms / 1000
+        self.cola = None
+        self._trabajador = None
+        # Contadores para conocer el tamaño medio de lote conseguido
+        self.lotes_procesados = 0
+        self.mensajes_procesados = 0
+
+    def iniciar(self):
+        # La cola debe crearse dentro del bucle de eventos que la va a usar
+        self.cola = asyncio.Queue()
+        self._trabajador = asyncio.create_task(self._procesar_lotes())
+
+    async def detener(self):
+        if self._trabajador is not None:
+            self._trabajador.cancel()
+            try:
+                await self._trabajador
+            except asyncio.CancelledError:
+                pass
+
+    async def responder(self, mensaje, usar_cache=True):
+        """
+        Encola un mensaje y espera a que el trabajador devuelva su respuesta ya filtrada.
+        Si la respuesta está en la caché, se devuelve sin pasar por el modelo.
+        La caché puede leer y escribir en SQLite: se consulta en el pool de hilos del bucle
+        para no bloquear al resto de conexiones.
+        """
+        bucle = asyncio.get_running_loop()
+        respuesta = await bucle.run_in_executor(None, chatbot.respuesta_cacheada, mensaje, usar_cache)
+        if respuesta is None:
+            futuro = bucle.create_future()
+            await self.cola.put((mensaje, futuro))
+            respuesta = await futuro
+            await bucle.run_in_executor(None, chatbot.guardar_en_cache, mensaje, respuesta, usar_cache)
+        return chatbot.filtrar_respuesta(respuesta)
+
+    async def _recoger_lote(self):
+        # Esperamos (sin límite) a la primera petición del lote
+        lote = [await self.cola.get()]
+        limite = time.monotonic() + self.espera_maxima
+        # Después recogemos más peticiones hasta llenar el lote o agotar la ventana de espera
+        while len(lote) < self.lote_maximo:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self.cola.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    async def _procesar_lotes(self):
+        bucle = asyncio.get_running_loop()
+        while True:
+            lote = await self._recoger_lote()
+            mensajes = [mensaje for mensaje, _ in lote]
+            self.lotes_procesados += 1
+            self.mensajes_procesados += len(mensajes)
+            try:
+                # generate bloquea la CPU: lo ejecutamos en un hilo para que el servidor
+                # siga aceptando conexiones mientras se genera el lote
+                respuestas = await bucle.run_in_executor(None, self.modelo.generar_lote, mensajes)
+            except Exception as e:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            for (_, futuro), respuesta in zip(lote, respuestas):
+                if not futuro.done():
+                    futuro.set_result(respuesta)  # Sin filtrar: responder() filtra y guarda en caché
+
+
+async def _leer_peticion(lector):
+    """
+    Lee una petición HTTP/1.1 sencilla: línea inicial, cabeceras y cuerpo (Content-Length).
+    Retorna (metodo, ruta, cuerpo) o None si la conexión se cerró sin datos.
+    """
+    linea = await lector.readline()
+    if not linea:
+        return None
+    metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        clave, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[clave.strip().lower()] = valor.strip()
+    longitud = int(cabeceras.get("content-length", 0))
+    cuerpo = await lector.readexactly(longitud) if longitud else b""
+    return metodo, ruta, cuerpo
+
+
+def _respuesta_http(escritor, estado, datos):
+    # Escribimos una respuesta HTTP con cuerpo JSON y cerramos la conexión al terminar
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    cabecera = (
+        f"HTTP/1.1 {estado}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    escritor.write(cabecera.encode("latin-1") + cuerpo)
+
+
+def _escribir_fragmento(escritor, datos):
+    # Un fragmento de una respuesta 'chunked': tamaño en hexadecimal, datos y salto de línea
+    linea = json.dumps(datos, ensure_ascii=False).encode("utf-8") + b"\n"
+    escritor.write(f"{len(linea):X}\r\n".encode("latin-1") + linea + b"\r\n")
+
+
+async def _responder_en_streaming(escritor, mensaje, usar_cache):
+    """
+    Envía la respuesta al cliente a medida que se genera (una línea JSON por fragmento):
+    {"fragmento": "..."} ... y al final {"fin": true, "respuesta": "...", "cortada": false}
+    """
+    bucle = asyncio.get_running_loop()
+    fragmentos = asyncio.Queue()
+    FIN = object()  # Marca de final de la generación
+
+    def emitir(fragmento):
+        # Se llama desde el hilo de generación: pasamos el fragmento al bucle de eventos
+        bucle.call_soon_threadsafe(fragmentos.put_nowait, fragmento)
+
+    def generar():
+        try:
+            return chatbot.responder_en_streaming(mensaje, emitir, usar_cache)
+        finally:
+            bucle.call_soon_threadsafe(fragmentos.put_nowait, FIN)
+
+    escritor.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/x-ndjson; charset=utf-8\r\n"
+        b"Transfer-Encoding: chunked\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+    tarea = bucle.run_in_executor(None, generar)
+    while True:
+        fragmento = await fragmentos.get()
+        if fragmento is FIN:
+            break
+        _escribir_fragmento(escritor, {"fragmento": fragmento})
+        await escritor.drain()
+    try:
+        respuesta, cortada = await tarea
+        _escribir_fragmento(escritor, {"fin": True, "respuesta": respuesta, "cortada": cortada})
+    except Exception as e:
+        _escribir_fragmento(escritor, {"fin": True, "error": str(e)})
+    escritor.write(b"0\r\n\r\n")  # Fragmento vacío: fin de la respuesta
+
+
+def crear_manejador(servidor):
+    """
+    Crea la función que atiende cada conexión.
+    Única ruta: POST /chat con cuerpo {"mensaje": "..."} → {"respuesta": "..."}
+    Con {"mensaje": "...", "cache": false} la petición no usa la caché de respuestas.
+    Con {"mensaje": "...", "stream": true} la respuesta se envía por fragmentos mientras se genera
+    (fuera de los lotes: cada petición en streaming tiene su propia llamada a generate).
+    """
+    async def manejar(lector, escritor):
+        try:
+            try:
+                peticion = await _leer_peticion(lector)
+            except (ValueError, asyncio.IncompleteReadError):
+                peticion = None  # Petición mal formada o conexión cortada: la ignoramos
+            if peticion is None:
+                return
+            metodo, ruta, cuerpo = peticion
+            if metodo != "POST" or ruta != "/chat":
+                _respuesta_http(escritor, "404 Not Found", {"error": "Usa POST /chat"})
+                return
+            try:
+                datos = json.loads(cuerpo or b"{}")
+                mensaje = datos["mensaje"].strip()
+                usar_cache = bool(datos.get("cache", True))
+                streaming = bool(datos.get("stream", False))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                _respuesta_http(escritor, "400 Bad Request", {"error": "Se esperaba {\"mensaje\": \"...\"}"})
+                return
+            if streaming:
+                await _responder_en_streaming(escritor, mensaje, usar_cache)
+                return
+            try:
+                respuesta = await servidor.responder(mensaje, usar_cache)
+            except Exception as e:
+                _respuesta_http(escritor, "500 Internal Server Error", {"error": str(e)})
+                return
+            _respuesta_http(escritor, "200 OK", {"respuesta": respuesta})
+        finally:
+            try:
+                await escritor.drain()
+            except ConnectionError:
+                pass
+            escritor.close()
+
+    return manejar
+
+
+async def ejecutar_servidor(host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, socket_unix=None,
+                            lote_maximo=LOTE_MAXIMO, espera_maxima_ms=ESPERA_MAXIMA_MS):
+    """
+    Arranca el servidor en host:puerto o, si se indica, en un socket Unix local.
+    """
+    servidor = ServidorLotes(lote_maximo=lote_maximo, espera_maxima_ms=espera_maxima_ms)
+    servidor.iniciar()
+    cargador.precargar()  # El modelo se carga en segundo plano mientras el servidor ya escucha
+
+    manejador = crear_manejador(servidor)
+    if socket_unix:
+        red = await asyncio.start_unix_server(manejador, path=socket_unix)
+        print(f"Servidor escuchando en el socket {socket_unix}")
+    else:
+        red = await asyncio.start_server(manejador, host, puerto)
+        print(f"Servidor escuchando en http://{host}:{puerto}/chat")
+    print(f"Lotes de hasta {lote_maximo} mensajes, espera máxima {espera_maxima_ms} ms")
+
+    try:
+        async with red:
+            await red.serve_forever()
+    finally:
+        await servidor.detener()
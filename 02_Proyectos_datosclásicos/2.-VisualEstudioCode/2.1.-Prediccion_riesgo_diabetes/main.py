@@ -8,9 +8,12 @@ Este script integra todas las etapas:
 4. Predicción
 5. Evaluación del rendimiento del modelo
 6. Guardado del modelo entrenado, métricas y parámetros
+7. Informe con las figuras (PNG + HTML), dibujado en segundo plano sin bloquear el flujo
 """
 import os
 import json
+import time
+import shutil
 import logging
 import numpy as np
 import argparse
@@ -22,7 +25,10 @@ from sklearn.preprocessing import StandardScaler
 from src.carga_datos import cargar_datos
 from src.limpiar_datos import limpiar_dataset, revisar_nulos, detectar_outliers
 from src.preprocesamiento import separar_variables, dividir_datos
-from src.evaluacion import evaluar_modelo, mostrar_matriz_confusion, informe_clasificacion, curva_roc
+from src.modelo import entrenar_bosque_adaptativo
+from src.ajuste import buscar_hiperparametros
+from src.evaluacion import evaluar_modelo, informe_clasificacion, curva_roc
+from src.informes import GeneradorInformes
 
 # Configurar logging para salida informativa en consola
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -33,8 +39,33 @@ def main():
     parser = argparse.ArgumentParser(description="Predicción de Riesgo de Diabetes")
     parser.add_argument("--data", type=str, default="data/diabetes.csv", help="Ruta al archivo CSV de datos")
     parser.add_argument("--models_dir", type=str, default="models", help="Carpeta para guardar modelos y resultados")
+    parser.add_argument("--reports_dir", type=str, default=None,
+                        help="Carpeta para las figuras y el informe HTML (por defecto, <models_dir>/informes)")
+    parser.add_argument("--no-plots", dest="no_plots", action="store_true",
+                        help="No genera figuras: el tiempo medido es solo el de cómputo")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Crece el bosque por pasos (warm_start) y se detiene cuando el AUC OOB deja de mejorar")
+    parser.add_argument("--tree_step", type=int, default=25, help="Árboles añadidos en cada paso (modo --adaptive)")
+    parser.add_argument("--max_trees", type=int, default=500, help="Máximo de árboles (modo --adaptive)")
+    parser.add_argument("--oob_tol", type=float, default=0.001,
+                        help="Mejora mínima del AUC OOB para seguir creciendo (modo --adaptive)")
+    parser.add_argument("--patience", type=int, default=3,
+                        help="Pasos seguidos sin mejora antes de detenerse (modo --adaptive)")
+    parser.add_argument("--tune", action="store_true",
+                        help="Busca los hiperparámetros del bosque con validación cruzada antes de entrenar")
+    parser.add_argument("--search", type=str, default="halving", choices=["halving", "aleatoria"],
+                        help="Método de búsqueda (modo --tune): successive halving o búsqueda aleatoria")
+    parser.add_argument("--n_candidates", type=int, default=40, help="Combinaciones a probar (modo --tune)")
+    parser.add_argument("--cv", type=int, default=5, help="Pliegues de la validación cruzada (modo --tune)")
+    parser.add_argument("--keep_cache", action="store_true",
+                        help="Conserva la caché de SMOTE + escalado (<models_dir>/cache_ajuste) al terminar --tune")
     args = parser.parse_args()
 
+    # Las figuras se dibujan en procesos aparte (backend Agg) y se guardan como PNG + HTML
+    informes = GeneradorInformes(args.reports_dir or os.path.join(args.models_dir, "informes"),
+                                 activo=not args.no_plots)
+    inicio = time.perf_counter()
+
     # 1. Cargar datos desde CSV
     logging.info("Cargando datos desde: %s", args.data)
     df = cargar_datos(args.data)
@@ -46,7 +77,9 @@ def main():
     revisar_nulos(df)
 
     logging.info("Detectando outliers en columnas críticas (Glucose, BloodPressure, BMI, Insulin)")
-    detectar_outliers(df, columnas=["Glucose", "BloodPressure", "BMI", "Insulin"], graficar=True)
+    columnas_criticas = ["Glucose", "BloodPressure", "BMI", "Insulin"]
+    detectar_outliers(df, columnas=columnas_criticas)
+    informes.boxplots(df, columnas_criticas)
 
     logging.info("Eliminando o imputando valores faltantes según estrategia definida en limpiar_dataset")
     df = limpiar_dataset(df, columnas_nulos=["Glucose", "BloodPressure", "BMI", "Insulin"])
@@ -79,9 +112,63 @@ def main():
         ("classifier", RandomForestClassifier(**classifier_params))
     ])
 
-    # Entrenar modelo completo con pipeline
-    logging.info("Entrenando pipeline sobre datos de entrenamiento")
-    pipeline.fit(X_train, y_train)
+    if args.tune:
+        # Búsqueda de hiperparámetros con validación cruzada estratificada en todos los procesadores.
+        # SMOTE y el escalado ajustados se guardan en caché por pliegue: solo se reentrena el bosque.
+        logging.info("Buscando hiperparámetros (%s, %d candidatos, %d pliegues)", args.search,
+                     args.n_candidates, args.cv)
+        os.makedirs(args.models_dir, exist_ok=True)
+        carpeta_cache = os.path.join(args.models_dir, "cache_ajuste")
+        try:
+            mejores, auc_cv, tabla, segundos = buscar_hiperparametros(
+                pipeline, X_train, y_train, metodo=args.search, n_candidatos=args.n_candidates, cv=args.cv,
+                max_arboles=classifier_params["n_estimators"], carpeta_cache=carpeta_cache
+            )
+        finally:
+            # La caché solo sirve dentro de la búsqueda: se borra salvo que se pida conservarla
+            if not args.keep_cache:
+                shutil.rmtree(carpeta_cache, ignore_errors=True)
+        logging.info("Búsqueda terminada en %.1f s. Mejores parámetros: %s (AUC CV %.4f)",
+                     segundos, mejores, auc_cv)
+
+        # Clasificación de candidatos y mejores parámetros junto al modelo
+        tabla.to_csv(os.path.join(args.models_dir, "leaderboard_ajuste.csv"), index=False)
+        with open(os.path.join(args.models_dir, "mejores_params.json"), "w") as f:
+            json.dump(dict(mejores, auc_cv=auc_cv, metodo=args.search,
+                           segundos_busqueda=segundos), f, indent=4)
+
+        # El pipeline final se entrena con los mejores parámetros sobre todo el conjunto de entrenamiento
+        classifier_params.update(mejores)
+        pipeline.set_params(classifier=RandomForestClassifier(**classifier_params))
+
+    if args.adaptive:
+        # SMOTE y el escalado se ajustan una sola vez; después el bosque crece sobre los datos ya transformados.
+        # El AUC OOB se mide solo con las filas reales (las primeras len(X_train)), no con las sintéticas.
+        logging.info("Entrenando bosque adaptativo: +%d árboles por paso hasta %d, parada por AUC OOB",
+                     args.tree_step, args.max_trees)
+        smote, scaler = pipeline.named_steps["smote"], pipeline.named_steps["scaler"]
+        X_balanceado, y_balanceado = smote.fit_resample(X_train, y_train)
+        X_escalado = scaler.fit_transform(X_balanceado)
+        bosque, historial = entrenar_bosque_adaptativo(
+            X_escalado, y_balanceado, paso=args.tree_step, max_arboles=args.max_trees,
+            tolerancia=args.oob_tol, paciencia=args.patience, n_reales=len(X_train), **classifier_params
+        )
+        pipeline.steps[-1] = ("classifier", bosque)
+        classifier_params.update(n_estimators=historial["n_arboles"], n_jobs=bosque.n_jobs)
+        classifier_params["crecimiento_adaptativo"] = {
+            "paso": args.tree_step, "max_arboles": args.max_trees,
+            "tolerancia": args.oob_tol, "paciencia": args.patience,
+            "curva_oob": historial["curva_oob"],
+        }
+        logging.info("Bosque detenido con %d árboles (AUC OOB %.4f) en %.2f s", historial["n_arboles"],
+                     historial["curva_oob"][-1]["oob_auc"], historial["tiempo_entrenamiento_s"])
+    else:
+        # Entrenar modelo completo con pipeline
+        logging.info("Entrenando pipeline sobre datos de entrenamiento")
+        inicio_entrenamiento = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        historial = {"n_arboles": classifier_params["n_estimators"],
+                     "tiempo_entrenamiento_s": time.perf_counter() - inicio_entrenamiento}
 
     # 5. Predicciones
     logging.info("Generando predicciones sobre conjunto de prueba")
@@ -96,15 +183,17 @@ def main():
     logging.info("Mostrando informe de clasificación detallado")
     informe_clasificacion(y_test, y_pred)
 
-    logging.info("Mostrando matriz de confusión")
-    mostrar_matriz_confusion(y_test, y_pred)
+    logging.info("Generando matriz de confusión")
+    informes.matriz_confusion(y_test, y_pred)
 
     logging.info("Calculando curva ROC y AUC")
-    auc_score = curva_roc(y_test, y_proba)
+    auc_score = curva_roc(y_test, y_proba, graficar=False)
+    informes.curva_roc(y_test, y_proba)
     logging.info("AUC: %.3f", auc_score)
 
-    # Agregar AUC a métricas
+    # Agregar AUC y datos del entrenamiento (árboles, tiempo y, en modo adaptativo, curva OOB) a métricas
     metricas["auc"] = auc_score
+    metricas.update(historial)
 
     # 7. Guardar modelo y resultados
     logging.info("Comprobando existencia de carpeta para guardar modelos y resultados")
@@ -123,6 +212,12 @@ def main():
         json.dump(classifier_params, f, indent=4)
 
     logging.info("Pipeline, métricas y parámetros guardados correctamente")
+    logging.info("Tiempo de cómputo (sin figuras): %.2f s", time.perf_counter() - inicio)
+
+    # 8. Esperar a las figuras y escribir el informe HTML
+    ruta_informe = informes.cerrar(metricas)
+    if ruta_informe:
+        logging.info("Informe con figuras guardado en: %s", ruta_informe)
     logging.info("Flujo completado con éxito.")
 
 
@@ -0,0 +1,94 @@
+"""
+Script: benchmark_outliers.py
+-----------------------------
+Objetivo: Comparar la detección de outliers por columnas (un bucle con dos llamadas a quantile
+y un DataFrame filtrado por columna, como hacía detectar_outliers) con el cálculo vectorizado
+de calcular_outliers (un solo quantile y una matriz booleana).
+
+Contexto:
+- Se genera un DataFrame sintético con las columnas críticas del dataset de diabetes
+  (Glucose, BloodPressure, BMI, Insulin) y el número de filas indicado.
+- Se comprueba que ambos métodos detectan el mismo número de outliers por columna.
+
+Uso:
+    python scripts/benchmark_outliers.py                       # 1M y 10M filas
+    python scripts/benchmark_outliers.py --filas 100000 --repeticiones 5
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Permitimos importar el paquete src al ejecutar el script desde cualquier carpeta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.limpiar_datos import calcular_outliers  # noqa: E402
+
+COLUMNAS = ["Glucose", "BloodPressure", "BMI", "Insulin"]
+
+
+def generar_datos(n_filas, semilla=42):
+    """
+    DataFrame sintético con distribuciones parecidas a las del dataset de diabetes (con ceros y colas largas).
+    """
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "Glucose": rng.normal(121, 32, n_filas).round(),
+        "BloodPressure": np.where(rng.random(n_filas) < 0.05, 0, rng.normal(69, 19, n_filas).round()),
+        "BMI": rng.normal(32, 8, n_filas).round(1),
+        "Insulin": np.where(rng.random(n_filas) < 0.48, 0, rng.gamma(2, 60, n_filas).round()),
+    })
+
+
+def outliers_por_columna(df, columnas, limite=1.5):
+    """
+    Versión anterior de detectar_outliers (sin impresión ni gráficas), como referencia.
+    """
+    resultados = {}
+    for col in columnas:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        outliers = df[(df[col] < Q1 - limite * IQR) | (df[col] > Q3 + limite * IQR)]
+        resultados[col] = len(outliers)
+    return resultados
+
+
+def medir(funcion, repeticiones):
+    """
+    Retorna (mejor tiempo en segundos, resultado de la última ejecución).
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de detección de outliers (IQR)")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                        help="Tamaños del DataFrame a probar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Ejecuciones por método (se toma la mejor)")
+    args = parser.parse_args()
+
+    print(f"{'filas':>12} {'por columna (s)':>16} {'vectorizado (s)':>16} {'aceleración':>12}")
+    for n_filas in args.filas:
+        df = generar_datos(n_filas)
+        t_bucle, conteos_bucle = medir(lambda: outliers_por_columna(df, COLUMNAS), args.repeticiones)
+        t_vector, resultado = medir(lambda: calcular_outliers(df, COLUMNAS), args.repeticiones)
+
+        # Ambos métodos deben encontrar exactamente los mismos outliers
+        if conteos_bucle != resultado["conteos"]:
+            print(f"Los conteos no coinciden con {n_filas} filas: {conteos_bucle} != {resultado['conteos']}")
+            sys.exit(1)
+        print(f"{n_filas:>12,} {t_bucle:>16.3f} {t_vector:>16.3f} {t_bucle / t_vector:>11.1f}x")
+        del df, resultado
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,15 @@ Ejemplo de uso:
 from .carga_datos import cargar_datos
 
 # Funciones de limpieza y preprocesamiento
-from .limpiar_datos import limpiar_dataset, revisar_nulos, detectar_outliers
+from .limpiar_datos import limpiar_dataset, revisar_nulos, detectar_outliers, calcular_outliers, tratar_outliers
 from .preprocesamiento import separar_variables, dividir_datos, escalar_datos
 
 # Funciones de entrenamiento y predicción
-from .modelo import entrenar_modelo, predecir
+from .modelo import entrenar_modelo, entrenar_bosque_adaptativo, predecir
+from .ajuste import buscar_hiperparametros
 
 # Funciones de evaluación
 from .evaluacion import evaluar_modelo
+
+# Informe con figuras (PNG + HTML) generado en segundo plano
+from .informes import GeneradorInformes
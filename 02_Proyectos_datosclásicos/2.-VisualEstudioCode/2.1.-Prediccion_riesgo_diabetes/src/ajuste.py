@@ -0,0 +1,98 @@
+import time
+import pandas as pd
+from scipy.stats import randint
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (activa HalvingRandomSearchCV)
+from sklearn.model_selection import HalvingRandomSearchCV, RandomizedSearchCV, StratifiedKFold
+
+# Espacio de búsqueda del RandomForestClassifier dentro del pipeline (prefijo "classifier__").
+# En successive halving el número de árboles es el recurso que se va aumentando,
+# por eso solo se incluye en la búsqueda aleatoria.
+ESPACIO_BUSQUEDA = {
+    "classifier__max_depth": [4, 6, 8, 10, None],
+    "classifier__min_samples_split": randint(2, 11),
+    "classifier__min_samples_leaf": randint(1, 6),
+    "classifier__max_features": ["sqrt", "log2", 0.5],
+    "classifier__class_weight": ["balanced", "balanced_subsample", None],
+}
+ARBOLES_BUSQUEDA_ALEATORIA = [100, 200, 300, 500]
+
+
+def buscar_hiperparametros(pipeline, X_train, y_train, metodo="halving", n_candidatos=40, cv=5,
+                           max_arboles=500, carpeta_cache=None, random_state=42, n_jobs=-1):
+    """
+    Busca los hiperparámetros del clasificador con validación cruzada estratificada en paralelo.
+
+    - metodo="halving": successive halving (HalvingRandomSearchCV). Empieza con muchos candidatos
+      y pocos árboles, y en cada ronda se queda con el mejor tercio y triplica los árboles (hasta max_arboles).
+    - metodo="aleatoria": búsqueda aleatoria (RandomizedSearchCV) de n_candidatos combinaciones.
+    - Si se indica carpeta_cache, el pipeline guarda en disco SMOTE y el escalado ya ajustados
+      (Pipeline memory=): en cada pliegue se ajustan una sola vez y solo se reentrena el clasificador.
+
+    Parámetros:
+    - pipeline: ImbPipeline con los pasos "smote", "scaler" y "classifier"
+    - X_train, y_train: datos de entrenamiento
+    - metodo (str): 'halving' o 'aleatoria'
+    - n_candidatos (int): combinaciones que se prueban (en halving, las de la primera ronda)
+    - cv (int): número de pliegues estratificados
+    - max_arboles (int): árboles de la última ronda de halving
+    - carpeta_cache (str): carpeta de la caché de SMOTE + escalado (None = sin caché)
+    - random_state (int): semilla de los pliegues y del muestreo de candidatos
+    - n_jobs (int): procesos en paralelo (-1 = todos los procesadores)
+
+    Retorna:
+    - mejores parámetros del clasificador (dict, sin el prefijo "classifier__")
+    - AUC medio de validación cruzada de esos parámetros
+    - tabla de resultados (DataFrame) ordenada de mejor a peor (en halving, primero la última ronda)
+    - segundos que ha tardado la búsqueda
+    """
+
+    # Copia sin entrenar del pipeline con la caché de los pasos de preprocesamiento
+    estimador = clone(pipeline).set_params(memory=carpeta_cache)
+    pliegues = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+
+    if metodo == "halving":
+        busqueda = HalvingRandomSearchCV(
+            estimador, ESPACIO_BUSQUEDA, n_candidates=n_candidatos, factor=3,
+            resource="classifier__n_estimators", min_resources=max(1, max_arboles // 9),
+            max_resources=max_arboles, scoring="roc_auc", cv=pliegues, refit=False,
+            random_state=random_state, n_jobs=n_jobs
+        )
+    elif metodo == "aleatoria":
+        espacio = dict(ESPACIO_BUSQUEDA, classifier__n_estimators=ARBOLES_BUSQUEDA_ALEATORIA)
+        busqueda = RandomizedSearchCV(
+            estimador, espacio, n_iter=n_candidatos, scoring="roc_auc", cv=pliegues, refit=False,
+            random_state=random_state, n_jobs=n_jobs
+        )
+    else:
+        raise ValueError(f"Método de búsqueda no válido: {metodo}")
+
+    inicio = time.perf_counter()
+    busqueda.fit(X_train, y_train)
+    segundos = time.perf_counter() - inicio
+
+    # Tabla de resultados: parámetros sin prefijo, AUC medio, desviación y tiempo de ajuste
+    resultados = pd.DataFrame(busqueda.cv_results_)
+    parametros = pd.DataFrame(
+        [{k.replace("classifier__", ""): v for k, v in p.items()} for p in resultados["params"]]
+    )
+    columnas = ["rank_test_score", "mean_test_score", "std_test_score", "mean_fit_time"]
+    if metodo == "halving":
+        columnas = ["iter", "n_resources"] + columnas  # Ronda y árboles con los que se evaluó
+    tabla = pd.concat([resultados[columnas], parametros], axis=1).rename(columns={
+        "rank_test_score": "posicion", "mean_test_score": "auc_media", "std_test_score": "auc_std",
+        "mean_fit_time": "segundos_ajuste", "iter": "ronda", "n_resources": "n_arboles",
+    })
+    if metodo == "halving":
+        # En halving el número de árboles ya está en "n_arboles" (el recurso de cada ronda)
+        tabla = tabla.drop(columns="n_estimators")
+        # La posición abarca todas las rondas, pero el ganador es el mejor de la última ronda
+        tabla = tabla.sort_values(["ronda", "posicion"], ascending=[False, True], kind="stable",
+                                  ignore_index=True)
+    else:
+        tabla = tabla.sort_values("posicion", kind="stable", ignore_index=True)
+
+    # Valores de NumPy (p. ej. los de randint) a tipos de Python, para poder guardarlos en JSON
+    mejores = {k.replace("classifier__", ""): v.item() if hasattr(v, "item") else v
+               for k, v in busqueda.best_params_.items()}
+    return mejores, float(busqueda.best_score_), tabla, segundos
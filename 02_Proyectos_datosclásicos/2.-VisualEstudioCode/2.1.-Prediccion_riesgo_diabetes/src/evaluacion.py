@@ -86,13 +86,14 @@ def informe_clasificacion(y_test, y_pred):
     ))
 
 
-def curva_roc(y_test, y_proba):
+def curva_roc(y_test, y_proba, graficar=True):
     """
     Gráfica de la curva ROC y cálculo del AUC.
     
     Parámetros:
     - y_test (array-like): valores reales
     - y_proba (array-like): probabilidades estimadas por el modelo
+    - graficar (bool): si es False, solo calcula el AUC (sin figura ni plt.show())
     
     Retorna:
     - roc_auc (float): área bajo la curva ROC
@@ -104,6 +105,10 @@ def curva_roc(y_test, y_proba):
     # Calculamos el área bajo la curva (AUC)
     roc_auc = auc(fpr, tpr)
 
+    # Sin gráfica (ejecuciones desatendidas o figuras generadas con src/informes.py)
+    if not graficar:
+        return roc_auc
+
     # Configuramos el tamaño de la figura
     plt.figure(figsize=(6,4))
     
@@ -0,0 +1,200 @@
+# Importamos os para crear la carpeta de informes y construir rutas
+import os
+
+# Importamos html para escapar los textos que se escriben en el informe HTML
+import html
+
+# Importamos el pool de procesos para dibujar las figuras en segundo plano
+from concurrent.futures import ProcessPoolExecutor
+
+# Importamos las funciones de scikit-learn que calculan los datos de las figuras
+from sklearn.metrics import confusion_matrix, roc_curve, auc
+
+
+# =========================
+# Funciones de dibujo (se ejecutan en los procesos del pool)
+# =========================
+# Usan Figure + FigureCanvasAgg (backend no interactivo) en lugar de pyplot:
+# no abren ventanas, no dependen del backend configurado y guardan directamente en PNG.
+
+def _nueva_figura(tamano):
+    """
+    Crea una figura de matplotlib asociada al backend Agg (sin ventana).
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figura = Figure(figsize=tamano)
+    FigureCanvasAgg(figura)
+    return figura
+
+
+def _dibujar_boxplot(valores, columna, ruta):
+    """
+    Guarda el boxplot de una columna en un PNG.
+    """
+    import seaborn as sns
+
+    figura = _nueva_figura((6, 4))
+    ejes = figura.add_subplot()
+    sns.boxplot(x=valores, ax=ejes)
+    ejes.set_xlabel(columna)
+    ejes.set_title(f"Boxplot de {columna}")
+    figura.savefig(ruta, bbox_inches="tight")
+    return ruta
+
+
+def _dibujar_matriz_confusion(cm, ruta):
+    """
+    Guarda la matriz de confusión (ya calculada) en un PNG.
+    """
+    import seaborn as sns
+
+    figura = _nueva_figura((6, 4))
+    ejes = figura.add_subplot()
+    sns.heatmap(
+        cm,
+        annot=True,
+        fmt="d",
+        cmap="Blues",
+        xticklabels=["No Diabetes", "Diabetes"],
+        yticklabels=["No Diabetes", "Diabetes"],
+        ax=ejes
+    )
+    ejes.set_xlabel("Predicción")
+    ejes.set_ylabel("Real")
+    ejes.set_title("Matriz de Confusión")
+    figura.savefig(ruta, bbox_inches="tight")
+    return ruta
+
+
+def _dibujar_curva_roc(fpr, tpr, roc_auc, ruta):
+    """
+    Guarda la curva ROC (puntos ya calculados) en un PNG.
+    """
+    figura = _nueva_figura((6, 4))
+    ejes = figura.add_subplot()
+    ejes.plot(fpr, tpr, color="darkorange", lw=2, label=f"AUC = {roc_auc:.2f}")
+    ejes.plot([0, 1], [0, 1], color="navy", lw=2, linestyle="--")  # Línea diagonal de referencia
+    ejes.set_xlabel("False Positive Rate")
+    ejes.set_ylabel("True Positive Rate")
+    ejes.set_title("Curva ROC")
+    ejes.legend(loc="lower right")
+    figura.savefig(ruta, bbox_inches="tight")
+    return ruta
+
+
+# =========================
+# Generador de informes
+# =========================
+
+class GeneradorInformes:
+    """
+    Genera las figuras del flujo (boxplots, matriz de confusión, curva ROC) como PNG
+    y un informe.html que las reúne junto a las métricas.
+
+    - Los datos de cada figura se calculan en el proceso principal (es barato) y el dibujo
+      se encarga a un pool de procesos en segundo plano: el entrenamiento no espera a matplotlib.
+    - Con activo=False (modo --no-plots) no se dibuja nada ni se crea el pool.
+    - cerrar() espera a que terminen todas las figuras y escribe el HTML.
+
+    Parámetros:
+    - carpeta (str): carpeta donde se guardan los PNG y el informe.html
+    - activo (bool): si es False, todas las llamadas se ignoran
+    - n_procesos (int): procesos del pool de dibujo
+    """
+
+    def __init__(self, carpeta, activo=True, n_procesos=2):
+        self.carpeta = carpeta
+        self.activo = activo
+        self.n_procesos = n_procesos
+        self._pool = None
+        self._pendientes = []  # (título, futuro) en el orden en que se pidieron las figuras
+
+    def _enviar(self, titulo, funcion, *argumentos):
+        # Crea el pool la primera vez que hace falta y encarga el dibujo de una figura
+        if self._pool is None:
+            os.makedirs(self.carpeta, exist_ok=True)
+            self._pool = ProcessPoolExecutor(max_workers=self.n_procesos)
+        self._pendientes.append((titulo, self._pool.submit(funcion, *argumentos)))
+
+    def boxplots(self, df, columnas):
+        """
+        Encarga un boxplot por cada columna indicada.
+        """
+        if not self.activo:
+            return
+        for col in columnas:
+            ruta = os.path.join(self.carpeta, f"boxplot_{col}.png")
+            # Solo se envían al proceso los valores de la columna, no el DataFrame completo
+            self._enviar(f"Boxplot de {col}", _dibujar_boxplot, df[col].to_numpy(), col, ruta)
+
+    def matriz_confusion(self, y_test, y_pred):
+        """
+        Calcula la matriz de confusión y encarga su figura.
+        """
+        if not self.activo:
+            return
+        cm = confusion_matrix(y_test, y_pred)
+        ruta = os.path.join(self.carpeta, "matriz_confusion.png")
+        self._enviar("Matriz de Confusión", _dibujar_matriz_confusion, cm, ruta)
+
+    def curva_roc(self, y_test, y_proba):
+        """
+        Calcula los puntos de la curva ROC y encarga su figura.
+        """
+        if not self.activo:
+            return
+        fpr, tpr, _ = roc_curve(y_test, y_proba)
+        ruta = os.path.join(self.carpeta, "curva_roc.png")
+        self._enviar("Curva ROC", _dibujar_curva_roc, fpr, tpr, auc(fpr, tpr), ruta)
+
+    def cerrar(self, metricas=None):
+        """
+        Espera a que terminen todas las figuras y escribe informe.html.
+
+        Parámetros:
+        - metricas (dict): métricas que se muestran en una tabla al principio del informe
+
+        Retorna:
+        - ruta del informe.html (None si no se generó ninguna figura)
+        """
+        if self._pool is None:
+            return None
+        figuras = []
+        try:
+            for titulo, futuro in self._pendientes:
+                figuras.append((titulo, futuro.result()))
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+            self._pendientes = []
+
+        ruta = os.path.join(self.carpeta, "informe.html")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(_html_informe(figuras, metricas or {}))
+        return ruta
+
+
+def _html_informe(figuras, metricas):
+    """
+    Construye un HTML sencillo con la tabla de métricas y las figuras (rutas relativas a la carpeta).
+    """
+    filas = "".join(
+        f"<tr><td>{html.escape(str(nombre))}</td><td>{valor:.4f}</td></tr>"
+        if isinstance(valor, float) else
+        f"<tr><td>{html.escape(str(nombre))}</td><td>{html.escape(str(valor))}</td></tr>"
+        for nombre, valor in metricas.items()
+    )
+    imagenes = "".join(
+        f"<h2>{html.escape(titulo)}</h2><img src=\"{html.escape(os.path.basename(ruta))}\">"
+        for titulo, ruta in figuras
+    )
+    return (
+        "<!DOCTYPE html>\n<html lang=\"es\">\n<head><meta charset=\"utf-8\">"
+        "<title>Predicción de Riesgo de Diabetes</title></head>\n<body>\n"
+        "<h1>Predicción de Riesgo de Diabetes</h1>\n"
+        + (f"<table border=\"1\"><tr><th>Métrica</th><th>Valor</th></tr>{filas}</table>\n" if filas else "")
+        + imagenes
+        + "\n</body>\n</html>\n"
+    )
@@ -58,42 +58,82 @@ def reemplazar_nulos(df, columnas=None, metodo="mediana"):
     # Devolvemos el DataFrame con los valores nulos ya reemplazados
     return df
 
-def detectar_outliers(df, columnas=None, limite=1.5, graficar=False):
+def calcular_outliers(df, columnas=None, limite=1.5):
     """
-    Detecta outliers en un DataFrame usando el método del rango intercuartílico (IQR).
+    Calcula de una sola vez los outliers de varias columnas con el método del rango intercuartílico (IQR).
+    
+    - Todos los cuartiles se obtienen con una única llamada a quantile([0.25, 0.75]).
+    - Se construye una sola matriz booleana (filas x columnas) comparando los valores de cada
+      columna con sus límites, sin copiar ni filtrar filas del DataFrame.
     
     Parámetros:
     - df: DataFrame de entrada
     - columnas: lista de columnas a revisar (si es None, se usan todas las numéricas)
     - limite: multiplicador del IQR (1.5 es el valor estándar)
-    - graficar: si es True, muestra boxplots de las columnas
+    
+    Retorna:
+    - dict con:
+        - "mascara": DataFrame booleano (mismo índice que df), True donde el valor es outlier
+        - "filas": Serie booleana, True en las filas con algún outlier (para eliminarlas)
+        - "conteos": dict con el número de outliers por columna
+        - "limite_inferior" y "limite_superior": Series con los límites de cada columna (para recortar)
     """
     
     # Si no se especifican columnas, se toman todas las columnas numéricas del DataFrame
     if columnas is None:
         columnas = df.select_dtypes(include="number").columns
+    columnas = list(columnas)
+
+    # Primer y tercer cuartil de todas las columnas en una sola llamada
+    cuartiles = df[columnas].quantile([0.25, 0.75])
+    Q1 = cuartiles.loc[0.25]
+    Q3 = cuartiles.loc[0.75]
+    
+    # Rango intercuartílico y límites de cada columna
+    IQR = Q3 - Q1
+    limite_inferior = Q1 - limite * IQR
+    limite_superior = Q3 + limite * IQR
+
+    # Matriz booleana en orden de columnas (order="F"): cada columna se rellena en memoria contigua
+    # y el DataFrame resultante la usa sin copiarla. Los NaN no cuentan como outliers.
+    mascara = np.empty((len(df), len(columnas)), dtype=bool, order="F")
+    for j, col in enumerate(columnas):
+        valores = df[col].to_numpy()
+        np.less(valores, limite_inferior[col], out=mascara[:, j])
+        mascara[:, j] |= valores > limite_superior[col]
+    mascara = pd.DataFrame(mascara, index=df.index, columns=columnas, copy=False)
+
+    # Número de outliers por columna y filas con al menos un outlier
+    conteos = dict(zip(columnas, mascara.to_numpy().sum(axis=0).tolist()))
+    filas = pd.Series(mascara.to_numpy().any(axis=1), index=df.index)
+
+    return {
+        "mascara": mascara,
+        "filas": filas,
+        "conteos": conteos,
+        "limite_inferior": limite_inferior,
+        "limite_superior": limite_superior,
+    }
+
 
-    resultados = {}  # Diccionario para almacenar el número de outliers por columna
+def detectar_outliers(df, columnas=None, limite=1.5, graficar=False):
+    """
+    Detecta outliers en un DataFrame usando el método del rango intercuartílico (IQR).
     
-    # Iteramos por cada columna indicada
-    for col in columnas:
-        # Calculamos el primer cuartil (Q1, 25%) y el tercer cuartil (Q3, 75%)
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        
-        # Calculamos el rango intercuartílico (IQR)
-        IQR = Q3 - Q1
-        
-        # Definimos los límites para detectar outliers
-        limite_inferior = Q1 - limite * IQR
-        limite_superior = Q3 + limite * IQR
-        
-        # Filtramos las filas que están fuera de los límites (son outliers)
-        outliers = df[(df[col] < limite_inferior) | (df[col] > limite_superior)]
-        
-        # Guardamos el número de outliers encontrados en el diccionario
-        resultados[col] = len(outliers)
-        
+    Parámetros:
+    - df: DataFrame de entrada
+    - columnas: lista de columnas a revisar (si es None, se usan todas las numéricas)
+    - limite: multiplicador del IQR (1.5 es el valor estándar)
+    - graficar: si es True, muestra boxplots de las columnas
+    
+    Retorna:
+    - dict con el número de outliers por columna (ver calcular_outliers para la máscara completa)
+    """
+    
+    # Cálculo vectorizado de todas las columnas a la vez
+    resultados = calcular_outliers(df, columnas, limite)["conteos"]
+    
+    for col, n_outliers in resultados.items():
         # Si se indica graficar, mostramos un boxplot de la columna
         if graficar:
             sns.boxplot(x=df[col])
@@ -101,17 +141,55 @@ def detectar_outliers(df, columnas=None, limite=1.5, graficar=False):
             plt.show()
         
         # Mostramos en pantalla el número de outliers detectados en la columna
-        print(f"{col}: {len(outliers)} outliers detectados")
+        print(f"{col}: {n_outliers} outliers detectados")
     
     # Devolvemos el diccionario con el número de outliers por columna
     return resultados
 
 
-def limpiar_dataset(df, columnas_nulos=None, metodo="mediana", columnas_outliers=None):
+def tratar_outliers(df, columnas=None, limite=1.5, metodo="recortar", resultado=None):
+    """
+    Recorta o elimina los outliers detectados con el método IQR.
+    
+    Parámetros:
+    - df: DataFrame de entrada
+    - columnas: lista de columnas a tratar (si es None, se usan todas las numéricas)
+    - limite: multiplicador del IQR (1.5 es el valor estándar)
+    - metodo (str) -> 'recortar' (lleva cada valor a su límite) o 'eliminar' (quita las filas con outliers)
+    - resultado: salida de calcular_outliers() ya calculada, para no repetir el cálculo
+    
+    Retorna:
+    - DataFrame tratado
+    """
+    
+    # Reutilizamos la máscara si ya se calculó (por ejemplo, al detectar los outliers)
+    if resultado is None:
+        resultado = calcular_outliers(df, columnas, limite)
+    
+    if metodo == "eliminar":
+        # Nos quedamos con las filas sin ningún outlier
+        df = df.loc[~resultado["filas"]]
+        print(f"Se eliminaron {int(resultado['filas'].sum())} filas con outliers")
+    elif metodo == "recortar":
+        # Solo se modifican las columnas revisadas; cada una con sus propios límites
+        columnas = list(resultado["conteos"])
+        df = df.copy()
+        df[columnas] = df[columnas].clip(
+            lower=resultado["limite_inferior"], upper=resultado["limite_superior"], axis=1
+        )
+        print(f"Se recortaron {sum(resultado['conteos'].values())} valores atípicos a los límites del IQR")
+    else:
+        raise ValueError(f"Método de tratamiento de outliers no válido: {metodo}")
+    
+    return df
+
+
+def limpiar_dataset(df, columnas_nulos=None, metodo="mediana", columnas_outliers=None, tratamiento_outliers=None):
     """
     Limpia el dataset:
     - Reemplaza valores nulos
-    - Detecta y opcionalmente elimina outliers
+    - Detecta y opcionalmente recorta o elimina outliers
+      (tratamiento_outliers: None, 'recortar' o 'eliminar')
     
     Retorna:
     - df limpio
@@ -127,11 +205,15 @@ def limpiar_dataset(df, columnas_nulos=None, metodo="mediana", columnas_outliers
     if columnas_nulos:
         df = reemplazar_nulos(df, columnas=columnas_nulos, metodo=metodo)
     
-    # Si se han indicado columnas para detectar outliers, se revisan una por una
+    # Si se han indicado columnas para detectar outliers, se revisan todas a la vez
     if columnas_outliers:
-        for col in columnas_outliers:
-            # Detecta outliers y muestra un boxplot para cada columna
-            detectar_outliers(df, col, graficar=True)
+        resultado = calcular_outliers(df, columnas_outliers)
+        for col, n_outliers in resultado["conteos"].items():
+            print(f"{col}: {n_outliers} outliers detectados")
+        
+        # La misma máscara sirve para recortar o eliminar sin volver a calcular los cuartiles
+        if tratamiento_outliers:
+            df = tratar_outliers(df, metodo=tratamiento_outliers, resultado=resultado)
     
     # Mensaje final indicando que el dataset ha sido revisado
     print("Dataset revisado y limpio")
@@ -1,5 +1,9 @@
+import time
+import warnings
 import joblib
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
 
 def entrenar_modelo(X_train, y_train, **kwargs):
     """
@@ -23,6 +27,89 @@ def entrenar_modelo(X_train, y_train, **kwargs):
     return modelo
 
 
+def entrenar_bosque_adaptativo(X_train, y_train, paso=25, max_arboles=500, tolerancia=0.001, paciencia=3,
+                               n_reales=None, **kwargs):
+    """
+    Entrena un RandomForestClassifier añadiendo árboles poco a poco (warm_start) y se detiene
+    cuando el AUC out-of-bag (OOB) deja de mejorar.
+    
+    - En cada paso se añaden 'paso' árboles y se calcula el AUC con las predicciones OOB
+      (cada muestra se evalúa solo con los árboles que no la vieron al entrenar).
+    - Si durante 'paciencia' pasos seguidos el AUC no supera el mejor valor en más de
+      'tolerancia', se deja de crecer. Nunca se superan 'max_arboles' árboles.
+    - Usa todos los procesadores (n_jobs=-1) salvo que se indique otro valor en kwargs.
+    - Si los datos vienen de SMOTE, las filas sintéticas son interpolaciones de filas reales que el
+      árbol sí pudo ver, y su predicción OOB es optimista. Con n_reales solo se usan para el AUC las
+      primeras n_reales filas (SMOTE devuelve las filas originales antes que las sintéticas).
+      Aun así, la estimación puede quedar algo por encima de la real, porque los árboles
+      que evalúan una fila real pueden haber visto filas sintéticas generadas a partir de ella.
+    
+    Parámetros:
+    - X_train: variables predictoras de entrenamiento
+    - y_train: etiquetas de entrenamiento
+    - paso (int): árboles que se añaden en cada paso
+    - max_arboles (int): número máximo de árboles
+    - tolerancia (float): mejora mínima del AUC OOB que se considera significativa
+    - paciencia (int): pasos seguidos sin mejora antes de detenerse
+    - n_reales (int): número de filas originales al principio de X_train (None = todas)
+    - **kwargs: resto de parámetros de RandomForestClassifier (n_estimators se ignora)
+    
+    Retorna:
+    - modelo entrenado
+    - dict con "n_arboles", "tiempo_entrenamiento_s" y "curva_oob" (lista de {"n_arboles", "oob_auc"})
+    """
+    # Sin árboles por paso el bucle no avanzaría, y sin un paso completo no habría curva ni modelo
+    if paso < 1:
+        raise ValueError(f"El número de árboles por paso debe ser al menos 1 (se recibió {paso})")
+    if max_arboles < paso:
+        raise ValueError(f"El máximo de árboles ({max_arboles}) debe ser mayor o igual que el paso ({paso})")
+
+    # El número de árboles lo decide el crecimiento; warm_start y oob_score son necesarios para él
+    kwargs.pop("n_estimators", None)
+    kwargs.setdefault("n_jobs", -1)
+    modelo = RandomForestClassifier(n_estimators=0, warm_start=True, oob_score=True, **kwargs)
+    y = np.asarray(y_train)
+
+    curva = []
+    mejor_auc = -np.inf
+    sin_mejora = 0
+    inicio = time.perf_counter()
+    while modelo.n_estimators < max_arboles:
+        # Añadimos 'paso' árboles a los ya entrenados
+        modelo.set_params(n_estimators=min(modelo.n_estimators + paso, max_arboles))
+        with warnings.catch_warnings():
+            # Con pocos árboles algunas muestras aún no tienen predicción OOB: se excluyen del AUC (abajo)
+            warnings.filterwarnings("ignore", message="Some inputs do not have OOB scores")
+            # class_weight "balanced" con warm_start solo es un problema si los datos cambian entre
+            # llamadas a fit; aquí siempre son los mismos, así que el aviso no aplica
+            warnings.filterwarnings("ignore", message='class_weight presets "balanced"')
+            modelo.fit(X_train, y_train)
+        
+        # AUC con la probabilidad OOB de la clase positiva. Las muestras sin ningún árbol OOB tienen
+        # la fila [0, 0] en oob_decision_function_ y se excluyen, igual que las filas sintéticas
+        evaluables = modelo.oob_decision_function_.sum(axis=1) > 0
+        if n_reales is not None:
+            evaluables[n_reales:] = False
+        oob_auc = float(roc_auc_score(y[evaluables], modelo.oob_decision_function_[evaluables, 1]))
+        curva.append({"n_arboles": modelo.n_estimators, "oob_auc": oob_auc})
+        
+        # Criterio de parada: 'paciencia' pasos seguidos sin mejorar el mejor AUC en más de 'tolerancia'
+        if oob_auc > mejor_auc + tolerancia:
+            mejor_auc = oob_auc
+            sin_mejora = 0
+        else:
+            sin_mejora += 1
+            if sin_mejora >= paciencia:
+                break
+
+    historial = {
+        "n_arboles": modelo.n_estimators,
+        "tiempo_entrenamiento_s": time.perf_counter() - inicio,
+        "curva_oob": curva,
+    }
+    return modelo, historial
+
+
 def predecir(modelo, X_test):
     """
     Realiza predicciones con el modelo entrenado.